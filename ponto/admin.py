@@ -1,8 +1,16 @@
 from django.contrib import admin
+from django.core.paginator import EmptyPage, Paginator
+from django.utils.functional import cached_property
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Mercado, Veiculo, Motorista, RegistroPonto
+from django.contrib import messages
+from . import busca, pacote_fotos, particionamento
+from .models import (
+    Mercado, Veiculo, Motorista, RegistroPonto, TokenTelemetria, LeituraTelemetria, FotoRepetida,
+    EventoSaida,
+)
 
 @admin.register(Mercado)
 class MercadoAdmin(admin.ModelAdmin):
@@ -15,6 +23,9 @@ class MercadoAdmin(admin.ModelAdmin):
         ('Informações Básicas', {
             'fields': ('nome', 'endereco', 'telefone')
         }),
+        ('Cerca', {
+            'fields': ('latitude', 'longitude', 'raio_metros')
+        }),
         ('Status', {
             'fields': ('ativo',)
         }),
@@ -22,15 +33,19 @@ class MercadoAdmin(admin.ModelAdmin):
 
 @admin.register(Veiculo)
 class VeiculoAdmin(admin.ModelAdmin):
-    list_display = ('placa', 'modelo', 'cor', 'ativo', 'data_cadastro')
+    list_display = ('placa', 'modelo', 'cor', 'ultimo_km', 'ultima_leitura_em', 'ativo', 'data_cadastro')
     list_filter = ('ativo', 'cor', 'data_cadastro')
     search_fields = ('placa', 'modelo')
     ordering = ('placa',)
+    readonly_fields = ('ultimo_km', 'ultimo_nivel_combustivel', 'ultima_leitura_em')
     
     fieldsets = (
         ('Informações do Veículo', {
             'fields': ('placa', 'modelo', 'cor')
         }),
+        ('Última Leitura', {
+            'fields': ('ultimo_km', 'ultimo_nivel_combustivel', 'ultima_leitura_em')
+        }),
         ('Status', {
             'fields': ('ativo',)
         }),
@@ -59,14 +74,69 @@ class MotoristaAdmin(admin.ModelAdmin):
         if obj:  # Editando
             return ('user', 'cpf')
         return ()
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Índices de trigramas (ponto.busca) em vez de ILIKE '%...%' em cada campo
+        if not search_term.strip() or not busca.disponivel():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=busca.motoristas(search_term).order_by().values('pk')), False
+
+class PaginadorEstimado(Paginator):
+    """
+    Na listagem sem filtros usa o total estimado pelo PostgreSQL: COUNT(*)
+    em milhões de registros percorre todas as partições a cada página.
+    """
+    LIMIAR = 100_000
+    
+    @cached_property
+    def estimativa(self):
+        """Total estimado em uso (None quando a contagem é exata)"""
+        if not self.object_list.query.has_filters():
+            estimativa = particionamento.linhas_estimadas()
+            if estimativa and estimativa > self.LIMIAR:
+                return estimativa
+        return None
+
+    @cached_property
+    def count(self):
+        return self.estimativa or super().count
+
+    def validate_number(self, number):
+        # A estimativa pode ficar abaixo do total real: páginas além dela
+        # existem, e ``page`` trata as que vierem vazias
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.estimativa is None or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        pagina = super().page(number)
+        if self.estimativa is not None and pagina.number > 1 and not pagina.object_list:
+            # A estimativa passou do total real: conta de verdade (só nesse
+            # caso) e devolve a última página que existe
+            self.__dict__.pop('num_pages', None)
+            self.__dict__['count'] = super().count
+            pagina = super().page(self.num_pages)
+        return pagina
 
 @admin.register(RegistroPonto)
 class RegistroPontoAdmin(admin.ModelAdmin):
     list_display = ('motorista', 'tipo', 'data_hora', 'km_odometro', 'nivel_combustivel', 'ver_fotos')
-    list_filter = ('tipo', 'data_hora', 'motorista__mercado')
+    list_filter = ('tipo', 'motorista__mercado', 'dentro_cerca')
     search_fields = ('motorista__nome_completo', 'motorista__cpf')
     ordering = ('-data_hora',)
-    readonly_fields = ('data_hora', 'ver_fotos_grandes')
+    readonly_fields = ('data_hora', 'ver_fotos_grandes', 'geohash', 'distancia_mercado_metros', 'dentro_cerca')
+    # Tabela grande (particionada por mês): navegação por data no índice de
+    # data_hora, motorista e mercado no mesmo SELECT (__str__ do motorista
+    # usa o mercado) e sem o COUNT(*) da tabela inteira
+    date_hierarchy = 'data_hora'
+    list_select_related = ('motorista__mercado',)
+    show_full_result_count = False
+    paginator = PaginadorEstimado
+    autocomplete_fields = ('motorista',)
+    actions = ('baixar_fotos',)
     
     fieldsets = (
         ('Registro', {
@@ -78,12 +148,19 @@ class RegistroPontoAdmin(admin.ModelAdmin):
         ('Fotos', {
             'fields': ('foto_odometro', 'foto_combustivel', 'ver_fotos_grandes')
         }),
+        ('Localização', {
+            'fields': (
+                'latitude', 'longitude', 'precisao_metros',
+                'geohash', 'distancia_mercado_metros', 'dentro_cerca',
+            )
+        }),
         ('Observações', {
             'fields': ('observacoes',)
         }),
     )
     
     def ver_fotos(self, obj):
+        # Só o link: a listagem não carrega imagens nem consulta o storage
         if obj.foto_odometro and obj.foto_combustivel:
             return format_html(
                 '<a href="{}" target="_blank">Ver Fotos</a>',
@@ -92,14 +169,119 @@ class RegistroPontoAdmin(admin.ModelAdmin):
         return "Sem fotos"
     ver_fotos.short_description = "Fotos"
     
+    def get_search_results(self, request, queryset, search_term):
+        # Nome/CPF do motorista por trigramas e observações por busca textual (ponto.busca)
+        if not search_term.strip() or not busca.disponivel():
+            return super().get_search_results(request, queryset, search_term)
+        return busca.filtrar_registros(queryset, search_term), False
+    
     def ver_fotos_grandes(self, obj):
         html = ""
         if obj.foto_odometro:
-            html += f'<div style="margin-bottom: 10px;"><strong>Odômetro:</strong><br><img src="{obj.foto_odometro.url}" style="max-width: 300px; max-height: 200px;"></div>'
+            html += f'<div style="margin-bottom: 10px;"><strong>Odômetro:</strong><br><img src="{obj.url_foto_odometro}" loading="lazy" decoding="async" style="max-width: 300px; max-height: 200px;"></div>'
         if obj.foto_combustivel:
-            html += f'<div><strong>Combustível:</strong><br><img src="{obj.foto_combustivel.url}" style="max-width: 300px; max-height: 200px;"></div>'
+            html += f'<div><strong>Combustível:</strong><br><img src="{obj.url_foto_combustivel}" loading="lazy" decoding="async" style="max-width: 300px; max-height: 200px;"></div>'
         return mark_safe(html) if html else "Sem fotos"
     ver_fotos_grandes.short_description = "Visualizar Fotos"
+    
+    @admin.action(description="Baixar fotos (ZIP com manifesto)")
+    def baixar_fotos(self, request, queryset):
+        return pacote_fotos.resposta(queryset)
+
+@admin.register(TokenTelemetria)
+class TokenTelemetriaAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'prefixo', 'ativo', 'data_cadastro', 'ultimo_uso')
+    list_filter = ('ativo',)
+    search_fields = ('nome', 'prefixo')
+    readonly_fields = ('prefixo', 'data_cadastro', 'ultimo_uso')
+    
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        # A chave só é exibida agora; no banco fica apenas o hash
+        chave = obj.nova_chave()
+        super().save_model(request, obj, form, change)
+        messages.warning(request, f'Token gerado (copie agora, ele não será exibido de novo): {chave}')
+
+@admin.register(LeituraTelemetria)
+class LeituraTelemetriaAdmin(admin.ModelAdmin):
+    list_display = ('veiculo', 'data_hora', 'km_odometro', 'nivel_combustivel')
+    list_filter = ('veiculo',)
+    search_fields = ('veiculo__placa',)
+    date_hierarchy = 'data_hora'
+    list_select_related = ('veiculo',)
+    show_full_result_count = False
+    
+    # Tabela só de inserção (alimentada pela API de telemetria)
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(FotoRepetida)
+class FotoRepetidaAdmin(admin.ModelAdmin):
+    list_display = ('registro', 'campo', 'original', 'distancia', 'revisada', 'data_cadastro')
+    list_filter = ('revisada', 'campo', 'distancia')
+    list_select_related = ('registro__motorista__mercado', 'original__motorista__mercado')
+    readonly_fields = ('registro', 'campo', 'original', 'campo_original', 'distancia', 'data_cadastro', 'comparar_fotos')
+    fields = readonly_fields[:-2] + ('revisada', 'comparar_fotos')
+    show_full_result_count = False
+    actions = ('marcar_revisadas',)
+    
+    # Criadas pelo índice de hashes (ponto.fotos_repetidas)
+    def has_add_permission(self, request):
+        return False
+    
+    def comparar_fotos(self, obj):
+        html = ""
+        for titulo, registro, campo in (
+            ('Enviada', obj.registro, obj.campo),
+            ('Original', obj.original, obj.campo_original),
+        ):
+            url = registro.url_foto(campo)
+            if url:
+                html += format_html(
+                    '<div style="display: inline-block; margin-right: 10px;"><strong>{} ({}):</strong><br>'
+                    '<img src="{}" loading="lazy" decoding="async" style="max-width: 400px; max-height: 300px;"></div>',
+                    titulo, timezone.localtime(registro.data_hora).strftime('%d/%m/%Y %H:%M'), url,
+                )
+        return mark_safe(html) if html else "Sem fotos"
+    comparar_fotos.short_description = "Comparar Fotos"
+    
+    @admin.action(description="Marcar como revisadas")
+    def marcar_revisadas(self, request, queryset):
+        atualizadas = queryset.update(revisada=True)
+        messages.success(request, f'{atualizadas} foto(s) marcada(s) como revisada(s).')
+
+@admin.register(EventoSaida)
+class EventoSaidaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'registro_id', 'motorista_id', 'criado_em', 'enviado_em', 'tentativas', 'proxima_tentativa')
+    list_filter = (('enviado_em', admin.EmptyFieldListFilter), 'tipo')
+    search_fields = ('=registro_id', '=motorista_id')
+    readonly_fields = (
+        'tipo', 'registro_id', 'motorista_id', 'dados', 'criado_em',
+        'enviado_em', 'tentativas', 'proxima_tentativa', 'ultimo_erro',
+    )
+    show_full_result_count = False
+    actions = ('tentar_agora', 'reenviar')
+    
+    # Gravados junto com os registros (ponto.eventos)
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    @admin.action(description="Tentar entregar agora (pendentes)")
+    def tentar_agora(self, request, queryset):
+        atualizados = queryset.filter(enviado_em__isnull=True).update(proxima_tentativa=None)
+        messages.success(request, f'{atualizados} evento(s) liberado(s) para a próxima entrega.')
+    
+    @admin.action(description="Entregar de novo")
+    def reenviar(self, request, queryset):
+        atualizados = queryset.update(enviado_em=None, proxima_tentativa=None, tentativas=0, ultimo_erro='')
+        messages.success(request, f'{atualizados} evento(s) voltaram para a fila de entrega.')
 
 # Customização do Django Admin
 admin.site.site_header = "Sistema de Ponto - Administração Django"
@@ -0,0 +1,185 @@
+"""
+Detecção de anomalias de odômetro e combustível na frota inteira.
+
+Os registros do período são lidos coluna a coluna (``values_list``, sem
+instanciar modelos) para vetores NumPy ordenados por veículo e horário. Cada
+regra compara um registro com o anterior do mesmo veículo usando operações
+vetoriais sobre ``np.diff``, em uma única passada para todos os veículos:
+
+- ``km_regrediu``: odômetro menor que no registro anterior;
+- ``velocidade_impossivel``: km entre dois registros exige velocidade média
+  acima de ``VELOCIDADE_MAX_KMH``;
+- ``km_fora_do_turno``: o veículo rodou entre uma saída e a entrada seguinte;
+- ``combustivel_subiu``: nível de combustível subiu durante o turno (não há
+  registro de abastecimento, então a subida precisa ser confirmada);
+- ``km_turno_atipico`` / ``consumo_atipico``: km do turno ou consumo por km
+  muito acima do padrão da frota (z-score robusto, mediana e MAD).
+
+O veículo de cada registro é o veículo atual do motorista.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.utils import timezone
+
+from .models import Motorista, RegistroPonto, Veiculo, inicio_do_dia
+from .odometro import VELOCIDADE_MAX_KMH
+
+REGRAS = {
+    'km_regrediu': 'Odômetro menor que no registro anterior',
+    'velocidade_impossivel': 'Velocidade média impossível entre registros',
+    'km_fora_do_turno': 'Veículo rodou fora do turno',
+    'combustivel_subiu': 'Combustível subiu durante o turno',
+    'km_turno_atipico': 'KM do turno muito acima do padrão da frota',
+    'consumo_atipico': 'Consumo por km muito acima do padrão da frota',
+}
+
+KM_FORA_TURNO_MAX = 5
+COMBUSTIVEL_SUBIDA_MAX = 5
+Z_LIMITE = 3.5
+# Turnos mínimos na amostra para as regras estatísticas
+AMOSTRA_MINIMA = 20
+
+COLUNAS = ('id', 'motorista__veiculo_id', 'motorista_id', 'data_hora', 'tipo', 'km_odometro', 'nivel_combustivel')
+
+
+def carregar(data_inicio=None, data_fim=None):
+    """Séries do período em vetores NumPy, ordenadas por veículo e horário"""
+    linhas = list(
+        RegistroPonto.objects.no_periodo(data_inicio, data_fim)
+        .order_by('motorista__veiculo_id', 'data_hora', 'id')
+        .values_list(*COLUNAS)
+        .iterator(chunk_size=5000)
+    )
+    ids, veiculos, motoristas, datas, tipos, km, nivel = zip(*linhas) if linhas else ((),) * 7
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'veiculo': np.array(veiculos, dtype=np.int64),
+        'motorista': np.array(motoristas, dtype=np.int64),
+        'instante': np.fromiter((d.timestamp() for d in datas), dtype=np.float64, count=len(datas)),
+        'entrada': np.array(tipos, dtype=object) == 'entrada',
+        'km': np.array(km, dtype=np.int64),
+        'nivel': np.array(nivel, dtype=np.int64),
+    }
+
+
+def z_robusto(valores):
+    """Z-score modificado (mediana e MAD); zeros quando não há dispersão"""
+    valores = np.asarray(valores, dtype=np.float64)
+    if valores.size == 0:
+        return valores
+    mediana = np.median(valores)
+    desvios = np.abs(valores - mediana)
+    mad = np.median(desvios)
+    if mad > 0:
+        return 0.6745 * (valores - mediana) / mad
+    # Mais da metade dos valores iguais: usa o desvio absoluto médio
+    media = desvios.mean()
+    if media > 0:
+        return (valores - mediana) / (1.253314 * media)
+    return np.zeros_like(valores)
+
+
+def _z_no_subconjunto(valores, mascara):
+    z = np.zeros(valores.shape, dtype=np.float64)
+    if np.count_nonzero(mascara) >= AMOSTRA_MINIMA:
+        z[mascara] = z_robusto(valores[mascara])
+    return z
+
+
+def turnos(dados):
+    """
+    Máscara dos intervalos que são turnos: entrada seguida da saída do mesmo
+    motorista no mesmo veículo. A posição i corresponde aos registros i e i + 1.
+    """
+    mesmo_veiculo = dados['veiculo'][1:] == dados['veiculo'][:-1]
+    mesmo_motorista = mesmo_veiculo & (dados['motorista'][1:] == dados['motorista'][:-1])
+    return mesmo_motorista & dados['entrada'][:-1] & ~dados['entrada'][1:]
+
+
+def detectar(dados):
+    """
+    Aplica as regras e devolve {regra: (índices do registro, valores)}.
+    Os índices apontam o registro que fecha o intervalo (o anterior é i - 1).
+    """
+    if dados['id'].size < 2:
+        return {}
+
+    mesmo_veiculo = dados['veiculo'][1:] == dados['veiculo'][:-1]
+    turno = turnos(dados)
+    fora_do_turno = mesmo_veiculo & ~dados['entrada'][:-1] & dados['entrada'][1:]
+
+    km = np.diff(dados['km'])
+    nivel = np.diff(dados['nivel'])
+    horas = np.diff(dados['instante']) / 3600
+    # Pelo menos um minuto, para registros no mesmo instante não dividirem por zero
+    velocidade = km / np.maximum(horas, 1 / 60)
+
+    turno_valido = turno & (km >= 0)
+    z_km = _z_no_subconjunto(km, turno_valido)
+
+    com_consumo = turno & (km > 0) & (nivel <= 0)
+    consumo = np.zeros(km.shape, dtype=np.float64)
+    consumo[com_consumo] = -nivel[com_consumo] / km[com_consumo]
+    z_consumo = _z_no_subconjunto(consumo, com_consumo)
+
+    regras = {
+        'km_regrediu': (mesmo_veiculo & (km < 0), km),
+        'velocidade_impossivel': (mesmo_veiculo & (velocidade > VELOCIDADE_MAX_KMH), velocidade),
+        'km_fora_do_turno': (fora_do_turno & (km > KM_FORA_TURNO_MAX), km),
+        'combustivel_subiu': (turno & (nivel > COMBUSTIVEL_SUBIDA_MAX), nivel),
+        'km_turno_atipico': (turno_valido & (km > 0) & (z_km > Z_LIMITE), km),
+        'consumo_atipico': (com_consumo & (z_consumo > Z_LIMITE), consumo),
+    }
+    resultado = {}
+    for regra, (mascara, valores) in regras.items():
+        posicoes = np.flatnonzero(mascara)
+        if posicoes.size:
+            resultado[regra] = (posicoes + 1, valores[posicoes])
+    return resultado
+
+
+def relatorio(data_inicio, data_fim, regra=None):
+    """
+    Anomalias cujo registro está no período, mais recentes primeiro.
+    Carrega um dia antes do início para comparar o primeiro registro.
+    """
+    dados = carregar(data_inicio - timedelta(days=1), data_fim)
+    a_partir = inicio_do_dia(data_inicio).timestamp()
+
+    anomalias = []
+    for nome, (indices, valores) in detectar(dados).items():
+        if regra and nome != regra:
+            continue
+        for indice, valor in zip(indices.tolist(), valores.tolist()):
+            if dados['instante'][indice] < a_partir:
+                continue
+            anomalias.append({
+                'regra': nome,
+                'descricao': REGRAS[nome],
+                'valor': round(valor, 3),
+                'registro_id': int(dados['id'][indice]),
+                'anterior_id': int(dados['id'][indice - 1]),
+                'veiculo_id': int(dados['veiculo'][indice]),
+                'motorista_id': int(dados['motorista'][indice]),
+                'data_hora': timezone.localtime(
+                    datetime.fromtimestamp(dados['instante'][indice], tz=dt_timezone.utc)
+                ),
+                'km_anterior': int(dados['km'][indice - 1]),
+                'km': int(dados['km'][indice]),
+                'nivel_anterior': int(dados['nivel'][indice - 1]),
+                'nivel': int(dados['nivel'][indice]),
+            })
+
+    placas = dict(Veiculo.objects.filter(
+        id__in={a['veiculo_id'] for a in anomalias}
+    ).values_list('id', 'placa'))
+    nomes = dict(Motorista.objects.filter(
+        id__in={a['motorista_id'] for a in anomalias}
+    ).values_list('id', 'nome_completo'))
+    for anomalia in anomalias:
+        anomalia['placa'] = placas.get(anomalia['veiculo_id'], '')
+        anomalia['motorista'] = nomes.get(anomalia['motorista_id'], '')
+
+    anomalias.sort(key=lambda a: (a['data_hora'], a['registro_id']), reverse=True)
+    return anomalias
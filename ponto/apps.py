@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PontoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ponto'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import metricas, signals  # noqa: F401
+        # Antes de qualquer conexão abrir: todas contam as consultas da requisição
+        connection_created.connect(metricas.instalar_contador, dispatch_uid='metricas_contador')
@@ -0,0 +1,209 @@
+"""
+Armazenamento das fotos num bucket compatível com S3 (AWS S3, MinIO, Ceph,
+Cloudflare R2...), para vários servidores web compartilharem as mesmas fotos.
+
+Ativado com ``MEDIA_ARMAZENAMENTO=s3`` (ver settings). O cliente boto3 é
+criado uma vez por processo e reaproveita as conexões HTTP (pool de
+``S3_CONEXOES``); arquivos acima de ``S3_PARTE_MB`` são enviados em partes,
+várias ao mesmo tempo (multipart). ``url`` devolve uma URL assinada e com
+validade: ``views.foto_registro`` confere a permissão e redireciona para ela,
+e o navegador baixa a foto direto do bucket, sem passar pelo Django. O envio
+não é direto: a foto passa pelo Django, que a valida e aplica a marca d'água
+antes de gravá-la aqui.
+
+O boto3 é importado só no primeiro acesso ao bucket; com o armazenamento
+local ele nem precisa estar instalado.
+"""
+import mimetypes
+import posixpath
+import tempfile
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+# Arquivos baixados ficam em memória até este tamanho; acima, em disco
+LIMITE_MEMORIA = 10 * 1024 * 1024
+
+MB = 1024 * 1024
+
+
+@deconstructible
+class ArmazenamentoS3(Storage):
+    """Storage do Django sobre um bucket S3, com URLs assinadas"""
+
+    # views.foto_registro redireciona para a URL assinada em vez de servir o arquivo
+    entrega_direta = True
+
+    def __init__(self, bucket='', endpoint_url='', endpoint_publico='', regiao='',
+                 chave_acesso='', chave_secreta='', prefixo='', expiracao_url=3600,
+                 conexoes=20, parte_mb=8, envios_paralelos=4):
+        if not bucket:
+            raise ImproperlyConfigured('ArmazenamentoS3 precisa do nome do bucket (S3_BUCKET).')
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url or None
+        # Endereço do bucket visto pelo navegador, se diferente do usado pelo
+        # servidor (ex.: MinIO na rede interna do docker)
+        self.endpoint_publico = endpoint_publico or self.endpoint_url
+        self.regiao = regiao or None
+        self.chave_acesso = chave_acesso or None
+        self.chave_secreta = chave_secreta or None
+        self.prefixo = prefixo.strip('/')
+        self.expiracao_url = expiracao_url
+        self.conexoes = conexoes
+        self.parte_mb = parte_mb
+        self.envios_paralelos = envios_paralelos
+        self._trava = threading.Lock()
+
+    # =====================
+    # CLIENTE
+    # =====================
+
+    def _criar_cliente(self, endpoint_url):
+        import boto3
+        from botocore.config import Config
+
+        return boto3.session.Session().client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=self.regiao,
+            aws_access_key_id=self.chave_acesso,
+            aws_secret_access_key=self.chave_secreta,
+            config=Config(
+                max_pool_connections=self.conexoes,
+                retries={'max_attempts': 5, 'mode': 'standard'},
+                signature_version='s3v4',
+                # Endereço no caminho (host/bucket/chave): funciona com MinIO e afins
+                s3={'addressing_style': 'path'} if endpoint_url else {},
+            ),
+        )
+
+    @cached_property
+    def cliente(self):
+        # Clientes do boto3 são thread-safe: um por processo, com pool de conexões
+        with self._trava:
+            return self._criar_cliente(self.endpoint_url)
+
+    @cached_property
+    def cliente_publico(self):
+        """Só assina URLs (não faz requisições); usa o endereço público do bucket"""
+        if self.endpoint_publico == self.endpoint_url:
+            return self.cliente
+        with self._trava:
+            return self._criar_cliente(self.endpoint_publico)
+
+    @cached_property
+    def _config_transferencia(self):
+        from boto3.s3.transfer import TransferConfig
+
+        return TransferConfig(
+            multipart_threshold=self.parte_mb * MB,
+            multipart_chunksize=self.parte_mb * MB,
+            max_concurrency=self.envios_paralelos,
+            use_threads=self.envios_paralelos > 1,
+        )
+
+    def _chave(self, name):
+        name = name.replace('\\', '/').lstrip('/')
+        return f'{self.prefixo}/{name}' if self.prefixo else name
+
+    def _nao_encontrado(self, erro):
+        return erro.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def _cabecalho(self, name):
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.cliente.head_object(Bucket=self.bucket, Key=self._chave(name))
+        except ClientError as erro:
+            if self._nao_encontrado(erro):
+                raise FileNotFoundError(name) from erro
+            raise
+
+    # =====================
+    # API DO STORAGE
+    # =====================
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError('ArmazenamentoS3 abre arquivos apenas para leitura.')
+        from botocore.exceptions import ClientError
+
+        arquivo = tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA)
+        try:
+            self.cliente.download_fileobj(
+                self.bucket, self._chave(name), arquivo, Config=self._config_transferencia
+            )
+        except ClientError as erro:
+            arquivo.close()
+            if self._nao_encontrado(erro):
+                raise FileNotFoundError(name) from erro
+            raise
+        arquivo.seek(0)
+        return File(arquivo, name=name)
+
+    def abrir_fluxo(self, name):
+        """Leitura sequencial direto da resposta do bucket, sem cópia local (para repassar o arquivo)"""
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.cliente.get_object(Bucket=self.bucket, Key=self._chave(name))['Body']
+        except ClientError as erro:
+            if self._nao_encontrado(erro):
+                raise FileNotFoundError(name) from erro
+            raise
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        tipo = getattr(content, 'content_type', None) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.cliente.upload_fileobj(
+            content,
+            self.bucket,
+            self._chave(name),
+            ExtraArgs={'ContentType': tipo},
+            Config=self._config_transferencia,
+        )
+        return name
+
+    def delete(self, name):
+        self.cliente.delete_object(Bucket=self.bucket, Key=self._chave(name))
+
+    def exists(self, name):
+        try:
+            self._cabecalho(name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name):
+        return self._cabecalho(name)['ContentLength']
+
+    def get_modified_time(self, name):
+        # Sempre com fuso (UTC), como USE_TZ pede
+        return self._cabecalho(name)['LastModified']
+
+    def listdir(self, path):
+        prefixo = self._chave(path).rstrip('/')
+        prefixo = f'{prefixo}/' if prefixo else ''
+        diretorios, arquivos = [], []
+        paginas = self.cliente.get_paginator('list_objects_v2').paginate(
+            Bucket=self.bucket, Prefix=prefixo, Delimiter='/'
+        )
+        for pagina in paginas:
+            for item in pagina.get('CommonPrefixes', []):
+                diretorios.append(posixpath.basename(item['Prefix'].rstrip('/')))
+            for item in pagina.get('Contents', []):
+                arquivos.append(posixpath.basename(item['Key']))
+        return diretorios, arquivos
+
+    def url(self, name, expiracao=None):
+        """URL assinada para GET direto no bucket, válida por ``expiracao_url`` segundos"""
+        return self.cliente_publico.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': self._chave(name)},
+            ExpiresIn=expiracao or self.expiracao_url,
+        )
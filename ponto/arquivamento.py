@@ -0,0 +1,167 @@
+"""
+Arquivamento de registros antigos em pacotes mensais compactados.
+
+Cada mês arquivado gera em ``ARQUIVO_ROOT``:
+
+- ``registros_AAAA_MM.zip``: os dados de cada registro (JSON, comprimido)
+  e as fotos (armazenadas sem recompressão, pois já são JPEG);
+- ``registros_AAAA_MM.index.json``: índice ``id -> membros do zip`` para
+  localizar um registro sem varrer o pacote (lido uma vez e mantido em
+  memória enquanto o arquivo não muda).
+
+A linha do registro continua no banco como "stub": mantém os valores usados
+nos relatórios, tem ``arquivo`` preenchido e as fotos são lidas do pacote sob
+demanda (``ler_foto``).
+"""
+import json
+import os
+import shutil
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core import serializers
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import RegistroPonto
+
+CAMPOS_FOTO = ('foto_odometro', 'foto_combustivel')
+
+
+def raiz():
+    return Path(settings.ARQUIVO_ROOT)
+
+
+def chave_mes(mes):
+    return f'{mes.year:04d}-{mes.month:02d}'
+
+
+def caminho_pacote(chave):
+    return raiz() / f"registros_{chave.replace('-', '_')}.zip"
+
+
+def caminho_indice(chave):
+    return raiz() / f"registros_{chave.replace('-', '_')}.index.json"
+
+
+def ler_indice(chave):
+    try:
+        with open(caminho_indice(chave), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return {}
+
+
+@lru_cache(maxsize=32)
+def _indice_lido(chave, versao):
+    # ``versao`` (mtime e tamanho) só entra na chave do cache: índice regravado
+    # por ``arquivar`` é lido de novo
+    return ler_indice(chave)
+
+
+def _indice_em_cache(chave):
+    """Índice do pacote para consulta (não alterar), lido uma vez por versão do arquivo"""
+    try:
+        estado = os.stat(caminho_indice(chave))
+    except FileNotFoundError:
+        return {}
+    return _indice_lido(chave, (estado.st_mtime_ns, estado.st_size))
+
+
+def _gravar_indice(chave, indice):
+    destino = caminho_indice(chave)
+    temporario = destino.with_suffix('.tmp')
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(indice, arquivo, ensure_ascii=False, sort_keys=True)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, destino)
+
+
+def arquivar(chave, registros):
+    """
+    Grava ``registros`` (todos do mesmo mês) no pacote ``chave``, marca-os
+    como arquivados e remove as fotos do MEDIA_ROOT. Retorna quantos foram
+    arquivados.
+    """
+    registros = [r for r in registros if not r.arquivo]
+    if not registros:
+        return 0
+
+    raiz().mkdir(parents=True, exist_ok=True)
+    indice = ler_indice(chave)
+
+    with zipfile.ZipFile(caminho_pacote(chave), 'a') as pacote:
+        for registro in registros:
+            if str(registro.pk) in indice:
+                # Já está no pacote (arquivado antes e depois restaurado)
+                continue
+
+            entrada = {'dados': f'dados/{registro.pk}.json'}
+            pacote.writestr(
+                entrada['dados'],
+                serializers.serialize('json', [registro]),
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+            for campo in CAMPOS_FOTO:
+                nome = getattr(registro, campo).name
+                if not nome or not default_storage.exists(nome):
+                    entrada[campo] = None
+                    continue
+                # Com o id: o nome pode se repetir depois que a foto anterior
+                # saiu do MEDIA_ROOT, e o zip só devolve o último membro do nome
+                membro = f'fotos/{registro.pk}/{nome}'
+                with default_storage.open(nome, 'rb') as origem, \
+                        pacote.open(membro, 'w', force_zip64=True) as destino:
+                    shutil.copyfileobj(origem, destino)
+                entrada[campo] = membro
+            indice[str(registro.pk)] = entrada
+
+    # O índice só é gravado depois que o zip foi fechado (diretório central escrito)
+    _gravar_indice(chave, indice)
+
+    ids = [r.pk for r in registros]
+    fotos = [getattr(r, campo).name for r in registros for campo in CAMPOS_FOTO]
+    with transaction.atomic():
+        RegistroPonto.objects.filter(pk__in=ids).update(arquivo=chave)
+        transaction.on_commit(lambda: _remover_fotos(fotos))
+    return len(ids)
+
+
+def _remover_fotos(nomes):
+    for nome in nomes:
+        if nome:
+            default_storage.delete(nome)
+
+
+def ler_foto(registro, campo):
+    """Abre (modo binário) a foto de um registro arquivado, direto do pacote"""
+    entrada = _indice_em_cache(registro.arquivo).get(str(registro.pk), {})
+    membro = entrada.get(campo)
+    if not membro:
+        raise FileNotFoundError(f'{campo} do registro {registro.pk} não está no pacote {registro.arquivo}')
+    with zipfile.ZipFile(caminho_pacote(registro.arquivo)) as pacote:
+        # O membro aberto mantém o arquivo do zip vivo após o ``with``
+        return pacote.open(membro)
+
+
+def restaurar(registro):
+    """Devolve as fotos ao MEDIA_ROOT e reativa o registro como normal"""
+    if not registro.arquivo:
+        return registro
+
+    for campo in CAMPOS_FOTO:
+        arquivo_foto = getattr(registro, campo)
+        try:
+            origem = ler_foto(registro, campo)
+        except FileNotFoundError:
+            continue
+        with origem:
+            arquivo_foto.name = default_storage.save(arquivo_foto.name, File(origem))
+
+    registro.arquivo = ''
+    registro.save(update_fields=['arquivo', *CAMPOS_FOTO])
+    return registro
@@ -0,0 +1,162 @@
+"""
+Busca unificada de motoristas, veículos e observações de registros.
+
+No PostgreSQL usa os índices da migração 0009:
+
+- nomes: trigramas sobre ``ponto_unaccent(lower(nome_completo))``, aceitando
+  trechos e erros de digitação, sem diferenciar acentos;
+- CPF e placa: trigramas sobre os valores só com dígitos/letras, para achar
+  "123456" em "123.456.789-00" e "ABC12" em "ABC-1234";
+- observações: busca textual em português (``ponto_portugues``: radicais e
+  sem acentos), ordenada por ``ts_rank``.
+
+As expressões abaixo reproduzem exatamente as dos índices, senão o
+PostgreSQL volta à varredura sequencial. Em outros bancos a busca cai para
+``icontains`` (CPF e placa também sem pontuação), sem ranking.
+"""
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import CharField, F, Func, Q, Value
+from django.db.models.functions import Lower, Replace
+from django.db.models.lookups import Contains, IContains
+
+from .models import Motorista, RegistroPonto, Veiculo
+
+CONFIGURACAO = 'ponto_portugues'
+TAMANHO_MINIMO = 2
+
+
+class SemAcento(Func):
+    function = 'ponto_unaccent'
+    output_field = CharField()
+
+
+class SoDigitos(Func):
+    function = 'regexp_replace'
+    template = "%(function)s(%(expressions)s, '[^0-9]', '', 'g')"
+    output_field = CharField()
+
+
+class VetorObservacoes(Func):
+    template = f"to_tsvector('{CONFIGURACAO}', COALESCE(%(expressions)s, ''))"
+    output_field = SearchVectorField()
+
+
+def disponivel():
+    return connection.vendor == 'postgresql'
+
+
+def normalizar(termo):
+    """Minúsculas e sem acentos, como ``ponto_unaccent(lower(...))``"""
+    decomposto = unicodedata.normalize('NFKD', termo.strip().lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def _digitos(termo):
+    return re.sub(r'\D', '', termo)
+
+
+def _placa(termo):
+    return termo.upper().replace('-', '').replace(' ', '')
+
+
+def _sem_pontuacao(campo, caracteres):
+    """``campo`` sem os caracteres, com ``REPLACE`` (portável, ao contrário de ``regexp_replace``)"""
+    expressao = F(campo)
+    for caractere in caracteres:
+        expressao = Replace(expressao, Value(caractere), Value(''))
+    return expressao
+
+
+def _nome(termo):
+    """Parte do termo sem dígitos (o restante é tratado como CPF)"""
+    return ' '.join(re.sub(r'[\d.\-/]', ' ', termo).split())
+
+
+def filtro_motoristas(termo):
+    """Q que casa motoristas por nome (aproximado) ou trecho do CPF"""
+    nome, digitos = _nome(termo), _digitos(termo)
+    filtro = Q(pk__in=[])
+    if not disponivel():
+        if nome:
+            filtro |= Q(nome_completo__icontains=nome)
+        if digitos:
+            filtro |= Q(Contains(_sem_pontuacao('cpf', '.-/ '), digitos))
+        return filtro
+
+    if len(nome) >= TAMANHO_MINIMO:
+        nome = normalizar(nome)
+        filtro |= Q(nome_busca__contains=nome) | Q(nome_busca__trigram_word_similar=nome)
+    if len(digitos) >= TAMANHO_MINIMO:
+        filtro |= Q(cpf_busca__contains=digitos)
+    return filtro
+
+
+def motoristas(termo):
+    """Motoristas que casam com o termo, mais relevantes primeiro"""
+    if not disponivel():
+        return Motorista.objects.filter(filtro_motoristas(termo)).order_by('nome_completo')
+
+    return Motorista.objects.alias(
+        nome_busca=SemAcento(Lower('nome_completo')),
+        cpf_busca=SoDigitos('cpf'),
+    ).filter(filtro_motoristas(termo)).annotate(
+        relevancia=TrigramWordSimilarity(Value(normalizar(_nome(termo))), SemAcento(Lower('nome_completo'))),
+    ).order_by('-relevancia', 'nome_completo')
+
+
+def veiculos(termo):
+    """Veículos pelo trecho da placa (com ou sem hífen) ou do modelo"""
+    placa = _placa(termo)
+    if not disponivel():
+        return Veiculo.objects.filter(
+            Q(IContains(_sem_pontuacao('placa', '- '), placa)) | Q(modelo__icontains=termo)
+        ).order_by('placa')
+
+    # Modelo sem índice próprio: a frota é pequena e o ``icontains`` basta
+    return Veiculo.objects.alias(
+        placa_busca=Replace(F('placa'), Value('-'), Value('')),
+    ).filter(Q(placa_busca__contains=placa) | Q(modelo__icontains=termo)).order_by('placa')
+
+
+def registros(termo):
+    """Registros cujas observações contêm as palavras (aceita sintaxe "websearch")"""
+    if not disponivel():
+        return RegistroPonto.objects.filter(observacoes__icontains=termo).order_by('-data_hora')
+
+    consulta = SearchQuery(termo, config=CONFIGURACAO, search_type='websearch')
+    return RegistroPonto.objects.alias(
+        vetor=VetorObservacoes('observacoes'),
+    ).filter(vetor=consulta).annotate(
+        relevancia=SearchRank(F('vetor'), consulta),
+    ).order_by('-relevancia', '-data_hora')
+
+
+def filtrar_registros(queryset, termo):
+    """Registros do queryset de motoristas que casam com o termo ou com o termo nas observações"""
+    if not disponivel():
+        return queryset.filter(
+            Q(motorista__in=Motorista.objects.filter(filtro_motoristas(termo)))
+            | Q(observacoes__icontains=termo)
+        )
+
+    return queryset.alias(vetor=VetorObservacoes('observacoes')).filter(
+        Q(motorista__in=motoristas(termo).order_by().values('pk'))
+        | Q(vetor=SearchQuery(termo, config=CONFIGURACAO, search_type='websearch'))
+    )
+
+
+def buscar(termo, limite=10):
+    """Resultados de cada tipo para a caixa de busca do painel"""
+    termo = (termo or '').strip()
+    if len(termo) < TAMANHO_MINIMO:
+        return {'motoristas': [], 'veiculos': [], 'registros': []}
+
+    return {
+        'motoristas': list(motoristas(termo).select_related('veiculo', 'mercado')[:limite]),
+        'veiculos': list(veiculos(termo)[:limite]),
+        'registros': list(registros(termo).select_related('motorista')[:limite]),
+    }
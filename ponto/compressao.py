@@ -0,0 +1,27 @@
+"""
+Compressão gzip das respostas de texto (HTML, JSON, CSV, JS do service worker).
+
+Igual ao ``GZipMiddleware`` do Django (que já mitiga o BREACH com bytes
+aleatórios), mas só para tipos de texto: fotos, planilhas e ZIPs já são
+comprimidos e gastariam CPU à toa. Arquivos estáticos pré-comprimidos chegam
+com ``Content-Encoding`` e passam direto.
+"""
+from django.middleware.gzip import GZipMiddleware
+
+TIPOS_COMPRIMIVEIS = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/manifest+json',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+class CompressaoMiddleware(GZipMiddleware):
+
+    def process_response(self, request, response):
+        tipo = response.get('Content-Type', '')
+        if not tipo.startswith(TIPOS_COMPRIMIVEIS):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,137 @@
+"""
+Eficiência de combustível por veículo e por motorista.
+
+Cada turno (entrada -> saída do mesmo motorista no mesmo veículo) fornece os
+km rodados e a queda do nível de combustível em pontos percentuais do tanque.
+Os turnos de um mês são somados por veículo e por motorista com operações
+vetoriais (``np.bincount``) sobre as séries carregadas por
+``anomalias.carregar``. Meses fechados ficam em cache sem expiração e são
+invalidados pelos sinais quando um registro daquele mês muda; o mês corrente é
+sempre recalculado.
+
+Métricas (razão das somas do período, não média das razões):
+
+- ``km_por_pct``: km rodados por 1% do tanque;
+- ``consumo_100km``: % do tanque gasto a cada 100 km.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import anomalias, metricas
+from .arquivamento import chave_mes
+from .models import Motorista, Veiculo
+from .particionamento import proximo_mes
+
+PREFIXO = 'eficiencia'
+GRUPOS = ('veiculo', 'motorista')
+
+
+def _chave(mes):
+    return f'{PREFIXO}:{chave_mes(mes)}'
+
+
+def _somar(ids_grupo, km, consumo):
+    """Soma km, consumo e turnos por id, devolvendo {id: (km, consumo, turnos)}"""
+    ids, posicao = np.unique(ids_grupo, return_inverse=True)
+    soma_km = np.bincount(posicao, weights=km, minlength=ids.size)
+    soma_consumo = np.bincount(posicao, weights=consumo, minlength=ids.size)
+    turnos = np.bincount(posicao, minlength=ids.size)
+    return {
+        id_: (km_, consumo_, turnos_)
+        for id_, km_, consumo_, turnos_ in zip(
+            ids.tolist(), soma_km.tolist(), soma_consumo.tolist(), turnos.tolist()
+        )
+    }
+
+
+def calcular_mes(mes):
+    """Totais dos turnos do mês, por veículo e por motorista"""
+    dados = anomalias.carregar(mes, proximo_mes(mes) - timedelta(days=1))
+    if dados['id'].size < 2:
+        return {grupo: {} for grupo in GRUPOS}
+
+    km = np.diff(dados['km'])
+    consumo = -np.diff(dados['nivel'])
+    # Odômetro voltando ou tanque abastecido no turno distorcem a razão (ver anomalias)
+    validos = np.flatnonzero(anomalias.turnos(dados) & (km >= 0) & (consumo >= 0))
+    return {
+        grupo: _somar(dados[grupo][validos + 1], km[validos], consumo[validos])
+        for grupo in GRUPOS
+    }
+
+
+def totais_mensais(meses):
+    """Totais de cada mês da lista; meses fechados vêm do cache"""
+    atual = timezone.localdate().replace(day=1)
+    fechados = [mes for mes in meses if mes < atual]
+    em_cache = cache.get_many([_chave(mes) for mes in fechados])
+    metricas.registrar_cache('eficiencia', len(em_cache), len(fechados))
+
+    totais = {}
+    for mes in meses:
+        chave = _chave(mes)
+        if chave in em_cache:
+            totais[mes] = em_cache[chave]
+            continue
+        totais[mes] = calcular_mes(mes)
+        if mes < atual:
+            cache.set(chave, totais[mes], None)
+    return totais
+
+
+def invalidar_meses(dias):
+    """Descarta o cache dos meses que contêm os dias informados"""
+    cache.delete_many({_chave(dia.replace(day=1)) for dia in dias})
+
+
+def _metricas(km, consumo):
+    return {
+        'km_por_pct': round(km / consumo, 2) if consumo else None,
+        'consumo_100km': round(100 * consumo / km, 2) if km else None,
+    }
+
+
+def analisar(meses=12, ate=None):
+    """
+    Séries mensais e ranking (mais eficientes primeiro) dos últimos ``meses``
+    até o mês de ``ate`` (padrão: hoje), por veículo e por motorista.
+    """
+    ultimo = (ate or timezone.localdate()).replace(day=1)
+    lista = [ultimo]
+    for _ in range(meses - 1):
+        lista.insert(0, (lista[0] - timedelta(days=1)).replace(day=1))
+    totais = totais_mensais(lista)
+
+    nomes = {
+        'veiculo': dict(Veiculo.objects.values_list('id', 'placa')),
+        'motorista': dict(Motorista.objects.values_list('id', 'nome_completo')),
+    }
+
+    resultado = {'meses': [chave_mes(mes) for mes in lista]}
+    for grupo in GRUPOS:
+        linhas = {}
+        for posicao, mes in enumerate(lista):
+            for id_, (km, consumo, turnos) in totais[mes][grupo].items():
+                linha = linhas.get(id_)
+                if linha is None:
+                    linha = linhas[id_] = {
+                        'id': id_,
+                        'nome': nomes[grupo].get(id_, f'#{id_}'),
+                        'km': 0, 'consumo': 0, 'turnos': 0,
+                        'serie': [None] * len(lista),
+                    }
+                linha['km'] += km
+                linha['consumo'] += consumo
+                linha['turnos'] += turnos
+                linha['serie'][posicao] = _metricas(km, consumo)['km_por_pct']
+
+        for linha in linhas.values():
+            linha.update(_metricas(linha['km'], linha['consumo']))
+        resultado[grupo] = sorted(
+            linhas.values(),
+            key=lambda linha: (linha['km_por_pct'] is None, -(linha['km_por_pct'] or 0), linha['nome']),
+        )
+    return resultado
@@ -0,0 +1,101 @@
+"""
+Arquivos estáticos com hash no nome e pré-comprimidos.
+
+``ManifestComprimido`` (STORAGES['staticfiles']) grava, no ``collectstatic``,
+cada arquivo com o hash do conteúdo no nome (``base.3f2a9c1b.css``) e, para os
+formatos de texto, as versões ``.gz`` e ``.br`` ao lado. Como o nome muda
+quando o conteúdo muda, esses arquivos podem ir para o cache do navegador por
+um ano (``CACHE_IMUTAVEL``). O Brotli depende do pacote ``brotli``; sem ele só
+o gzip é gerado.
+
+``arquivo_para`` escolhe a versão a entregar conforme o ``Accept-Encoding``
+(usado por ``views.arquivo_estatico`` quando não há servidor web na frente).
+"""
+import gzip
+import os
+from functools import cache
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - opcional
+    brotli = None
+
+EXTENSOES_TEXTO = ('.css', '.js', '.json', '.webmanifest', '.svg', '.html', '.txt', '.map', '.xml')
+TAMANHO_MINIMO = 256
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_CURTO = 'public, max-age=3600'
+
+
+def _comprimir_gzip(conteudo):
+    # mtime=0: mesmo conteúdo gera sempre o mesmo .gz
+    return gzip.compress(conteudo, compresslevel=9, mtime=0)
+
+
+def _comprimir_brotli(conteudo):
+    return brotli.compress(conteudo, quality=11)
+
+
+COMPRESSORES = [('.gz', _comprimir_gzip)]
+if brotli is not None:
+    COMPRESSORES.append(('.br', _comprimir_brotli))
+
+
+class ManifestComprimido(ManifestStaticFilesStorage):
+    """Manifesto com hash nos nomes + cópias .gz/.br dos arquivos de texto"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        processados = set()
+        for nome, nome_hash, processado in super().post_process(paths, dry_run, **options):
+            if not isinstance(processado, Exception):
+                processados.add(nome)
+                if nome_hash:
+                    processados.add(nome_hash)
+            yield nome, nome_hash, processado
+
+        if dry_run:
+            return
+        for nome in sorted(processados):
+            for nome_comprimido in self.comprimir(nome):
+                yield nome, nome_comprimido, True
+
+    def comprimir(self, nome):
+        """Grava as versões comprimidas do arquivo; retorna os nomes gravados"""
+        if not nome.endswith(EXTENSOES_TEXTO):
+            return []
+        with self.open(nome) as arquivo:
+            conteudo = arquivo.read()
+        if len(conteudo) < TAMANHO_MINIMO:
+            return []
+
+        gravados = []
+        for extensao, comprimir in COMPRESSORES:
+            comprimido = comprimir(conteudo)
+            # Só vale a pena se economizar pelo menos 5%
+            if len(comprimido) >= len(conteudo) * 0.95:
+                continue
+            destino = nome + extensao
+            with open(self.path(destino), 'wb') as saida:
+                saida.write(comprimido)
+            gravados.append(destino)
+        return gravados
+
+
+@cache
+def nomes_com_hash():
+    """Nomes (relativos a STATIC_ROOT) que têm hash do conteúdo"""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def cache_control(nome):
+    return CACHE_IMUTAVEL if nome in nomes_com_hash() else CACHE_CURTO
+
+
+def arquivo_para(caminho, accept_encoding):
+    """(caminho no disco, Content-Encoding) da melhor versão aceita pelo cliente"""
+    aceitas = {parte.split(';')[0].strip() for parte in accept_encoding.split(',')}
+    for codificacao, extensao in (('br', '.br'), ('gzip', '.gz')):
+        if codificacao in aceitas and os.path.isfile(caminho + extensao):
+            return caminho + extensao, codificacao
+    return caminho, None
@@ -0,0 +1,109 @@
+"""
+Estatísticas do dashboard administrativo mantidas em cache.
+
+Depois de cada mudança confirmada (``on_commit`` nos sinais de
+``signals.py``), o contador afetado é recontado no banco e regravado: uma
+contagem indexada (cadastros ativos, ou registros de um dia), sem o
+get+set não atômico do ``incr`` no cache em arquivos, que perdia somas de
+registros simultâneos. Todos são recalculados quando expiram (ou pelo
+comando ``recalcular_estatisticas``).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import metricas
+from .models import Motorista, Veiculo, Mercado, RegistroPonto
+
+PREFIXO = 'dashboard'
+TIMEOUT = getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 300)
+
+# Contadores de cadastros ativos, por modelo
+CONTADORES_ATIVOS = {
+    Motorista: 'total_motoristas',
+    Veiculo: 'total_veiculos',
+    Mercado: 'total_mercados',
+}
+
+
+def _chave(nome, dia=None):
+    if dia is not None:
+        return f'{PREFIXO}:{nome}:{dia.isoformat()}'
+    return f'{PREFIXO}:{nome}'
+
+
+def dia_do_registro(registro):
+    """Data local (TIME_ZONE) em que o registro foi feito"""
+    return timezone.localtime(registro.data_hora).date()
+
+
+def _contar_dia(dia):
+    """{chave: total} de entradas e saídas do dia, numa consulta"""
+    totais = RegistroPonto.objects.do_dia(dia).aggregate(
+        entradas=Count('id', filter=Q(tipo='entrada')),
+        saidas=Count('id', filter=Q(tipo='saida')),
+    )
+    return {_chave(nome, dia): total for nome, total in totais.items()}
+
+
+def recalcular(dia=None):
+    """Recalcula todos os contadores a partir do banco e grava no cache"""
+    dia = dia or timezone.localdate()
+
+    valores = {
+        _chave(nome): model.objects.filter(ativo=True).count()
+        for model, nome in CONTADORES_ATIVOS.items()
+    }
+    valores.update(_contar_dia(dia))
+
+    cache.set_many(valores, TIMEOUT)
+    cache.delete(_chave('ultimos_registros'))
+    return valores
+
+
+def atualizar_ativos(model):
+    """Reconta os cadastros ativos do modelo (depois do commit)"""
+    cache.set(_chave(CONTADORES_ATIVOS[model]), model.objects.filter(ativo=True).count(), TIMEOUT)
+
+
+def atualizar_dia(dia):
+    """Reconta entradas e saídas do dia (depois do commit)"""
+    cache.set_many(_contar_dia(dia), TIMEOUT)
+
+
+def invalidar(nome, dia=None):
+    cache.delete(_chave(nome, dia))
+
+
+def invalidar_ultimos_registros():
+    cache.delete(_chave('ultimos_registros'))
+
+
+def obter_estatisticas():
+    """Retorna o contexto de estatísticas do dashboard, usando o cache"""
+    hoje = timezone.localdate()
+    nomes = list(CONTADORES_ATIVOS.values())
+    chaves = {nome: _chave(nome) for nome in nomes}
+    chaves['entradas_hoje'] = _chave('entradas', hoje)
+    chaves['saidas_hoje'] = _chave('saidas', hoje)
+
+    em_cache = cache.get_many(chaves.values())
+    metricas.registrar_cache('estatisticas', len(em_cache), len(chaves))
+    if len(em_cache) != len(chaves):
+        em_cache = recalcular(hoje)
+
+    estatisticas = {nome: em_cache[chave] for nome, chave in chaves.items()}
+
+    ultimos_registros = cache.get(_chave('ultimos_registros'))
+    metricas.registrar_cache('ultimos_registros', int(ultimos_registros is not None), 1)
+    if ultimos_registros is None:
+        ultimos_registros = list(
+            RegistroPonto.objects.select_related(
+                'motorista', 'motorista__veiculo', 'motorista__mercado'
+            ).order_by('-data_hora')[:10]
+        )
+        cache.set(_chave('ultimos_registros'), ultimos_registros, TIMEOUT)
+    estatisticas['ultimos_registros'] = ultimos_registros
+
+    return estatisticas
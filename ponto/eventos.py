@@ -0,0 +1,219 @@
+"""
+Saída de eventos dos registros de ponto para sistemas externos (folha de
+pagamento, frota), pelo padrão outbox transacional, sem que eles precisem
+consultar os relatórios.
+
+- Cada save/remoção de ``RegistroPonto`` grava um ``EventoSaida`` na mesma
+  transação (signals): o evento existe se, e só se, a mudança foi gravada.
+- O comando ``despachar_eventos`` (um único processo) lê os pendentes em ordem
+  e os entrega em lotes a todos os destinos de ``EVENTOS_DESTINOS``: webhook
+  (POST JSON assinado), arquivo JSON Lines ou fila em diretório (um arquivo
+  por lote).
+- A ordem é a do ``pk``, alocado no INSERT e não no commit: uma transação que
+  ainda não terminou pode ter um ``pk`` menor que o de eventos já visíveis.
+  Por isso só saem os eventos criados há mais de ``EVENTOS_ESPERA_COMMIT``
+  segundos; a ordem vale para as transações que fecham dentro dessa espera
+  (as de ``RegistroPonto`` só gravam; uma mais longa pode ter o evento
+  entregue depois de outros posteriores a ele).
+- Se a entrega falha, o lote volta com espera crescente. Os eventos seguintes
+  dos mesmos motoristas esperam junto (a ordem por motorista se mantém) e os
+  de outros motoristas seguem. A entrega é "pelo menos uma vez": o consumidor
+  descarta repetidos pelo ``id`` do evento.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import urllib.request
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EventoSaida
+
+logger = logging.getLogger(__name__)
+
+# Espera antes de tentar de novo um lote que falhou: dobra a cada tentativa
+ESPERA_INICIAL = timedelta(seconds=5)
+ESPERA_MAXIMA = timedelta(hours=1)
+
+
+# =====================
+# GRAVAÇÃO (na transação do registro)
+# =====================
+
+def dados(registro):
+    """Campos do registro enviados no evento"""
+    motorista = registro.motorista
+    return {
+        'tipo': registro.tipo,
+        'data_hora': registro.data_hora,
+        'motorista_cpf': motorista.cpf,
+        'mercado_id': motorista.mercado_id,
+        'veiculo_id': motorista.veiculo_id,
+        'km_odometro': registro.km_odometro,
+        'nivel_combustivel': registro.nivel_combustivel,
+        'observacoes': registro.observacoes or '',
+        'latitude': registro.latitude,
+        'longitude': registro.longitude,
+        'dentro_cerca': registro.dentro_cerca,
+    }
+
+
+def registrar(registro, tipo):
+    """Grava o evento da mudança no registro (nada, se não há destinos configurados)"""
+    if not settings.EVENTOS_DESTINOS:
+        return None
+    return EventoSaida.objects.create(
+        tipo=tipo,
+        registro_id=registro.pk,
+        motorista_id=registro.motorista_id,
+        dados={} if tipo == 'registro.removido' else dados(registro),
+    )
+
+
+# =====================
+# DESTINOS
+# =====================
+
+def _json(eventos):
+    return json.dumps(eventos, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+class DestinoWebhook:
+    """POST de {"eventos": [...]} na URL; resposta fora de 2xx é falha"""
+
+    def __init__(self, url, segredo='', timeout=10):
+        self.url = url
+        self.segredo = segredo
+        self.timeout = timeout
+
+    def enviar(self, eventos):
+        corpo = _json({'eventos': eventos}).encode()
+        cabecalhos = {'Content-Type': 'application/json'}
+        if self.segredo:
+            # O consumidor confere a origem recalculando o HMAC do corpo
+            assinatura = hmac.new(self.segredo.encode(), corpo, hashlib.sha256).hexdigest()
+            cabecalhos['X-Ponto-Assinatura'] = f'sha256={assinatura}'
+        requisicao = urllib.request.Request(self.url, data=corpo, headers=cabecalhos, method='POST')
+        # urlopen levanta HTTPError para respostas 4xx/5xx
+        with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+            resposta.read()
+
+
+class DestinoArquivo:
+    """Um evento por linha (JSON Lines) no fim do arquivo"""
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+
+    def enviar(self, eventos):
+        linhas = ''.join(_json(evento) + '\n' for evento in eventos)
+        with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(linhas)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+
+class DestinoFila:
+    """
+    Fila local em diretório: um arquivo JSON por lote, que aparece já
+    completo (gravado à parte e renomeado). O consumidor processa os arquivos
+    em ordem de nome e os apaga.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = Path(diretorio)
+
+    def enviar(self, eventos):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        nome = f'{time.time_ns():020d}_{eventos[0]["id"]}.json'
+        # Começa com ponto: consumidores ignoram o arquivo ainda incompleto
+        temporario = self.diretorio / f'.{nome}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(_json({'eventos': eventos}))
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        temporario.replace(self.diretorio / nome)
+
+
+TIPOS_DESTINO = {
+    'webhook': DestinoWebhook,
+    'arquivo': DestinoArquivo,
+    'fila': DestinoFila,
+}
+
+
+def destinos():
+    """Destinos configurados em ``EVENTOS_DESTINOS``"""
+    criados = []
+    for config in settings.EVENTOS_DESTINOS:
+        opcoes = dict(config)
+        tipo = opcoes.pop('tipo', None)
+        if tipo not in TIPOS_DESTINO:
+            raise ImproperlyConfigured(
+                f'Destino de eventos desconhecido: {tipo!r} (use {", ".join(TIPOS_DESTINO)}).'
+            )
+        criados.append(TIPOS_DESTINO[tipo](**opcoes))
+    return criados
+
+
+# =====================
+# DESPACHO
+# =====================
+
+def despachar(destinos, tamanho=100):
+    """
+    Entrega o próximo lote de eventos pendentes a todos os destinos.
+    Retorna quantos foram entregues (0 se não há pendentes ou se falhou).
+    """
+    agora = timezone.now()
+    pendentes = EventoSaida.objects.filter(enviado_em__isnull=True)
+    # Motorista com evento esperando nova tentativa: os seguintes dele esperam junto
+    em_espera = pendentes.filter(proxima_tentativa__gt=agora).values('motorista_id')
+    # Os recentes esperam as transações com pk menor terminarem
+    limite = agora - timedelta(seconds=settings.EVENTOS_ESPERA_COMMIT)
+    lote = list(
+        pendentes.filter(criado_em__lte=limite).exclude(motorista_id__in=em_espera).order_by('pk')[:tamanho]
+    )
+    if not lote:
+        return 0
+
+    ids = [evento.pk for evento in lote]
+    try:
+        envelopes = [evento.envelope() for evento in lote]
+        for destino in destinos:
+            destino.enviar(envelopes)
+    except Exception as erro:
+        tentativas = max(evento.tentativas for evento in lote) + 1
+        espera = min(ESPERA_INICIAL * 2 ** (tentativas - 1), ESPERA_MAXIMA)
+        EventoSaida.objects.filter(pk__in=ids).update(
+            tentativas=F('tentativas') + 1,
+            proxima_tentativa=agora + espera,
+            ultimo_erro=f'{type(erro).__name__}: {erro}'[:1000],
+        )
+        logger.warning('Falha na entrega de eventos', extra={
+            'eventos': len(ids), 'primeiro_id': ids[0], 'tentativas': tentativas,
+            'nova_tentativa_em_s': int(espera.total_seconds()), 'erro': str(erro),
+        })
+        return 0
+
+    EventoSaida.objects.filter(pk__in=ids).update(
+        enviado_em=timezone.now(), proxima_tentativa=None, ultimo_erro='',
+    )
+    logger.info('Eventos entregues', extra={'eventos': len(ids), 'primeiro_id': ids[0], 'ultimo_id': ids[-1]})
+    return len(ids)
+
+
+def limpar(dias):
+    """Apaga os eventos entregues há mais de ``dias`` dias; retorna quantos"""
+    limite = timezone.now() - timedelta(days=dias)
+    removidos, _ = EventoSaida.objects.filter(enviado_em__lt=limite).delete()
+    return removidos
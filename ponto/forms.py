@@ -1,11 +1,37 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from decimal import Decimal
 import re
 
 from .models import RegistroPonto, Motorista, Veiculo, Mercado
+from . import geo, odometro
 
 class RegistroPontoForm(forms.ModelForm):
+    confirmar_leitura = forms.BooleanField(
+        required=False,
+        label='Confirmo que o KM informado está correto',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
+    # Preenchidos pelo navegador (geolocalização), se o motorista permitir
+    latitude = forms.FloatField(required=False, min_value=-90, max_value=90, widget=forms.HiddenInput)
+    longitude = forms.FloatField(required=False, min_value=-180, max_value=180, widget=forms.HiddenInput)
+    precisao_metros = forms.FloatField(required=False, min_value=0, widget=forms.HiddenInput)
+    
+    def __init__(self, *args, veiculo=None, mercado=None, momento=None, **kwargs):
+        """
+        ``veiculo``: confere o KM com a última leitura conhecida do veículo;
+        ``mercado``: confere a localização com a cerca do mercado;
+        ``momento``: quando a leitura foi feita (padrão: agora; app offline)
+        """
+        super().__init__(*args, **kwargs)
+        self.veiculo = veiculo
+        self.mercado = mercado
+        self.momento = momento
+        self.pedir_confirmacao = False
+    
     class Meta:
         model = RegistroPonto
         fields = [
@@ -13,7 +39,10 @@ class RegistroPontoForm(forms.ModelForm):
             'foto_combustivel', 
             'km_odometro', 
             'nivel_combustivel', 
-            'observacoes'
+            'observacoes',
+            'latitude',
+            'longitude',
+            'precisao_metros',
         ]
         widgets = {
             'foto_odometro': forms.FileInput(attrs={
@@ -59,6 +88,44 @@ class RegistroPontoForm(forms.ModelForm):
             if foto.size > 5 * 1024 * 1024:  # 5MB
                 raise ValidationError('A foto não pode ser maior que 5MB.')
         return foto
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        km = cleaned_data.get('km_odometro')
+        
+        if self.veiculo and km is not None and not cleaned_data.get('confirmar_leitura'):
+            avisos = odometro.verificar(self.veiculo, km, self.momento)
+            if avisos:
+                self.pedir_confirmacao = True
+                raise ValidationError(avisos + [
+                    'Confira o odômetro. Se o valor estiver correto, marque a confirmação e envie novamente.'
+                ])
+        
+        self._verificar_localizacao(cleaned_data)
+        return cleaned_data
+    
+    def _verificar_localizacao(self, cleaned_data):
+        """Geohash e cerca do mercado (uma conta de distância por registro)"""
+        latitude, longitude = cleaned_data.get('latitude'), cleaned_data.get('longitude')
+        if latitude is None or longitude is None:
+            cleaned_data['latitude'] = cleaned_data['longitude'] = cleaned_data['precisao_metros'] = None
+            return
+        
+        precisao = cleaned_data.get('precisao_metros')
+        # Mesmas 6 casas do modelo (~10 cm)
+        cleaned_data['latitude'] = Decimal(f'{latitude:.6f}')
+        cleaned_data['longitude'] = Decimal(f'{longitude:.6f}')
+        cleaned_data['precisao_metros'] = round(precisao) if precisao is not None else None
+        
+        distancia, dentro = geo.verificar_cerca(self.mercado, latitude, longitude, precisao)
+        if dentro is False and settings.GEOCERCA_BLOQUEAR:
+            raise ValidationError(
+                f'Você está a {distancia} m do mercado {self.mercado}; '
+                f'o registro só pode ser feito a até {self.mercado.raio_metros} m.'
+            )
+        self.instance.geohash = geo.codificar(latitude, longitude)
+        self.instance.distancia_mercado_metros = distancia
+        self.instance.dentro_cerca = dentro
 
 class MotoristaForm(forms.ModelForm):
     username = forms.CharField(
@@ -207,12 +274,26 @@ class VeiculoForm(forms.ModelForm):
 class MercadoForm(forms.ModelForm):
     class Meta:
         model = Mercado
-        fields = ['nome', 'endereco', 'telefone']
+        fields = ['nome', 'endereco', 'telefone', 'latitude', 'longitude', 'raio_metros']
         widgets = {
             'nome': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'Nome do mercado'
             }),
+            'latitude': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Ex: -23.550520',
+                'step': '0.000001'
+            }),
+            'longitude': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Ex: -46.633308',
+                'step': '0.000001'
+            }),
+            'raio_metros': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': '0'
+            }),
             'endereco': forms.Textarea(attrs={
                 'class': 'form-control',
                 'rows': 3,
@@ -225,6 +306,12 @@ class MercadoForm(forms.ModelForm):
             })
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if (cleaned_data.get('latitude') is None) != (cleaned_data.get('longitude') is None):
+            raise ValidationError('Informe latitude e longitude juntas (ou nenhuma, para não usar a cerca).')
+        return cleaned_data
+
 class RelatorioForm(forms.Form):
     data_inicio = forms.DateField(
         label='Data Início',
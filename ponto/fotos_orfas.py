@@ -0,0 +1,72 @@
+"""
+Fotos órfãs: arquivos em ``registros/AAAA/MM/DD/`` que nenhum registro
+referencia (marca d'água que falhou depois do upload, registros removidos em
+cascata com o motorista, fotos trocadas no admin).
+
+A varredura é feita por diretório de dia, vários ao mesmo tempo (threads:
+o trabalho é listar diretórios e consultar o banco, não CPU). Para cada dia,
+os nomes listados são conferidos no banco em lotes com ``IN`` nos índices de
+``foto_odometro``/``foto_combustivel``, sem carregar todos os nomes da tabela
+na memória. Só é órfã a foto sem referência e mais antiga que a idade mínima,
+para não apagar um upload cujo registro ainda não foi gravado.
+"""
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RegistroPonto
+
+PREFIXO = 'registros'
+
+# Nomes por consulta ao banco
+LOTE_CONSULTA = 1000
+
+
+def dias(storage=default_storage):
+    """Diretórios ``registros/AAAA/MM/DD`` existentes, em ordem"""
+    encontrados = []
+    try:
+        anos, _ = storage.listdir(PREFIXO)
+    except FileNotFoundError:
+        return encontrados
+    for ano in sorted(anos):
+        meses, _ = storage.listdir(f'{PREFIXO}/{ano}')
+        for mes in sorted(meses):
+            dias_do_mes, _ = storage.listdir(f'{PREFIXO}/{ano}/{mes}')
+            encontrados.extend(f'{PREFIXO}/{ano}/{mes}/{dia}' for dia in sorted(dias_do_mes))
+    return encontrados
+
+
+def referenciados(nomes):
+    """Subconjunto de ``nomes`` usado em alguma foto de registro"""
+    usados = set()
+    for inicio in range(0, len(nomes), LOTE_CONSULTA):
+        lote = nomes[inicio:inicio + LOTE_CONSULTA]
+        consulta = RegistroPonto.objects.filter(
+            Q(foto_odometro__in=lote) | Q(foto_combustivel__in=lote)
+        ).values_list('foto_odometro', 'foto_combustivel')
+        for odometro, combustivel in consulta:
+            usados.add(odometro)
+            usados.add(combustivel)
+    return usados & set(nomes)
+
+
+def varrer_dia(diretorio, idade_minima, remover=False, storage=default_storage):
+    """(arquivos no diretório, fotos órfãs) de um dia; com ``remover``, apaga as órfãs"""
+    try:
+        _, arquivos = storage.listdir(diretorio)
+        nomes = [f'{diretorio}/{arquivo}' for arquivo in arquivos]
+        usados = referenciados(nomes)
+        limite = timezone.now() - idade_minima
+        orfas = [
+            nome for nome in nomes
+            if nome not in usados and storage.get_modified_time(nome) < limite
+        ]
+        if remover:
+            for nome in orfas:
+                storage.delete(nome)
+        return len(nomes), orfas
+    finally:
+        # Cada thread abre a própria conexão; fecha ao terminar o dia
+        connections.close_all()
@@ -0,0 +1,190 @@
+"""
+Detecção de fotos de odômetro/combustível reaproveitadas.
+
+A marca d'água registra a hora do envio, não a da captura: reenviar uma foto
+antiga passa despercebido. Cada foto gravada recebe um hash perceptual (dHash
+de 64 bits: gradiente horizontal de uma miniatura 9x8 em tons de cinza), que
+muda pouco com recompressão, redimensionamento e pequenos ajustes de brilho.
+A faixa inferior da imagem, onde fica a marca d'água, fica de fora do cálculo.
+
+Busca por distância de Hamming com multi-index hashing: o hash é dividido em
+``FAIXAS`` pedaços de 16 bits, cada um com índice no banco. Se dois hashes
+diferem em no máximo ``FAIXAS - 1`` bits, ao menos um pedaço é idêntico
+(casa dos pombos), então basta buscar os hashes com alguma faixa igual e
+conferir a distância exata dos poucos candidatos. São consultas de índice
+simples, em milissegundos mesmo com milhões de fotos.
+
+As fotos de um registro novo são indexadas numa thread do worker depois do
+commit (``agendar``), sem somar a leitura das fotos (S3) ao tempo da
+requisição do motorista. Um worker reiniciado perde o que estava na fila; o
+comando ``indexar_fotos`` indexa as fotos que ficaram de fora.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+
+from .models import FotoRepetida, HashFoto
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_FOTO = ('foto_odometro', 'foto_combustivel')
+
+FAIXAS = 4
+BITS_FAIXA = 64 // FAIXAS
+DISTANCIA_MAX = FAIXAS - 1
+
+# Fração inferior da imagem descartada (marca d'água com data/hora)
+CORTE_INFERIOR = 0.15
+
+_fila = None
+_fila_trava = threading.Lock()
+
+
+def calcular_hash(arquivo):
+    """dHash de 64 bits (inteiro sem sinal) da imagem; None se não for possível abrir"""
+    # Pillow só é carregado quando há foto a processar, não no boot do worker
+    from PIL import Image
+
+    try:
+        with Image.open(arquivo) as img:
+            # JPEG: decodifica já reduzido e em tons de cinza (bem mais rápido)
+            img.draft('L', (64, 64))
+            img = img.convert('L')
+            largura, altura = img.size
+            img = img.crop((0, 0, largura, max(int(altura * (1 - CORTE_INFERIOR)), 1)))
+            pixels = list(img.resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    except Exception:
+        # Qualquer falha do Pillow (arquivo corrompido, formato estranho, imagem
+        # gigante) só deixa a foto sem hash
+        logger.warning('Foto ilegível; hash não calculado', extra={'foto': getattr(arquivo, 'name', str(arquivo))})
+        return None
+
+    valor = 0
+    for linha in range(8):
+        for coluna in range(8):
+            esquerda, direita = pixels[linha * 9 + coluna], pixels[linha * 9 + coluna + 1]
+            valor = (valor << 1) | (esquerda > direita)
+    return valor
+
+
+def para_banco(valor):
+    """Hash sem sinal -> BigIntegerField (com sinal)"""
+    return valor - (1 << 64) if valor >= 1 << 63 else valor
+
+
+def faixas(valor):
+    mascara = (1 << BITS_FAIXA) - 1
+    valor &= (1 << 64) - 1
+    return [(valor >> (BITS_FAIXA * i)) & mascara for i in range(FAIXAS)]
+
+
+def distancia(a, b):
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def semelhantes(valor, excluir_registro=None):
+    """HashFoto a até DISTANCIA_MAX bits do hash, mais parecidos primeiro: [(distância, HashFoto)]"""
+    filtro = Q()
+    for i, faixa in enumerate(faixas(valor)):
+        filtro |= Q(**{f'faixa{i}': faixa})
+    candidatos = HashFoto.objects.filter(filtro)
+    if excluir_registro is not None:
+        candidatos = candidatos.exclude(registro_id=excluir_registro)
+
+    encontrados = []
+    for candidato in candidatos.only('registro_id', 'campo', 'hash', 'data_hora'):
+        d = distancia(valor, candidato.hash)
+        if d <= DISTANCIA_MAX:
+            encontrados.append((d, candidato))
+    encontrados.sort(key=lambda item: (item[0], item[1].data_hora))
+    return encontrados
+
+
+def registrar(registro, campo, valor):
+    """Grava o hash da foto e sinaliza se ela repete outra já indexada; retorna a FotoRepetida ou None"""
+    # As duas fotos do mesmo registro (mesmo painel) podem ser parecidas: não contam
+    parecidos = semelhantes(valor, excluir_registro=registro.pk)
+    with transaction.atomic():
+        HashFoto.objects.update_or_create(
+            registro=registro,
+            campo=campo,
+            defaults={
+                'hash': para_banco(valor),
+                'data_hora': registro.data_hora,
+                **{f'faixa{i}': faixa for i, faixa in enumerate(faixas(valor))},
+            },
+        )
+        if not parecidos:
+            return None
+        d, original = parecidos[0]
+        repetida, _ = FotoRepetida.objects.update_or_create(
+            registro=registro,
+            campo=campo,
+            defaults={
+                'original_id': original.registro_id,
+                'campo_original': original.campo,
+                'distancia': d,
+            },
+        )
+    logger.info('Foto repetida sinalizada', extra={
+        'registro_id': registro.pk,
+        'campo': campo,
+        'original_id': original.registro_id,
+        'distancia': d,
+    })
+    return repetida
+
+
+def indexar(registro):
+    """Calcula e registra o hash das fotos do registro (ignora arquivados e fotos ausentes)"""
+    if registro.arquivado:
+        return []
+    sinalizadas = []
+    for campo in CAMPOS_FOTO:
+        foto = getattr(registro, campo)
+        if not foto:
+            continue
+        try:
+            with foto.open('rb') as arquivo:
+                valor = calcular_hash(arquivo)
+        except OSError:
+            logger.warning('Foto ausente no armazenamento', extra={'registro_id': registro.pk, 'campo': campo})
+            continue
+        if valor is None:
+            continue
+        repetida = registrar(registro, campo, valor)
+        if repetida:
+            sinalizadas.append(repetida)
+    return sinalizadas
+
+
+def _indexar_sem_falhar(registro):
+    try:
+        indexar(registro)
+    except Exception:
+        logger.exception('Falha ao indexar as fotos do registro', extra={'registro_id': registro.pk})
+
+
+def _indexar_em_segundo_plano(registro):
+    try:
+        _indexar_sem_falhar(registro)
+    finally:
+        # Conexões desta thread; a próxima tarefa abre uma nova
+        connections.close_all()
+
+
+def agendar(registro):
+    """Indexa as fotos do registro numa thread do worker, fora da requisição"""
+    global _fila
+    if connections[DEFAULT_DB_ALIAS].vendor == 'sqlite':
+        # SQLite (desenvolvimento) trava com duas threads gravando: indexa aqui
+        _indexar_sem_falhar(registro)
+        return
+    with _fila_trava:
+        if _fila is None:
+            # Uma thread: não disputa CPU com as requisições e grava em ordem
+            _fila = ThreadPoolExecutor(max_workers=1, thread_name_prefix='indexar-fotos')
+    _fila.submit(_indexar_em_segundo_plano, registro)
@@ -0,0 +1,106 @@
+"""
+Localização dos registros de ponto e cerca (raio) em volta de cada mercado,
+sem PostGIS.
+
+- A cerca é conferida a cada registro só contra o mercado do motorista: uma
+  conta de distância (haversine), tempo constante.
+- Cada registro com localização guarda o geohash (``PRECISAO`` caracteres,
+  células de ~5 m). Células vizinhas têm o mesmo prefixo, então "registros
+  perto de um ponto" vira ``geohash LIKE 'prefixo%'`` em até 9 prefixos (a
+  célula do ponto e as vizinhas), no índice da coluna, e só os candidatos têm
+  a distância exata calculada. O agrupamento por prefixo dá a grade do mapa.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISAO = 9
+RAIO_TERRA_METROS = 6_371_008.8
+METROS_POR_GRAU = math.pi * RAIO_TERRA_METROS / 180
+
+# Imprecisão do GPS descontada na cerca, no máximo (o resto conta como fora)
+TOLERANCIA_MAXIMA_METROS = 100
+
+
+def codificar(latitude, longitude, precisao=PRECISAO):
+    """Geohash do ponto"""
+    faixa_lat, faixa_lon = [-90.0, 90.0], [-180.0, 180.0]
+    bits, valor, usar_lon, resultado = 0, 0, True, []
+    while len(resultado) < precisao:
+        faixa, coordenada = (faixa_lon, longitude) if usar_lon else (faixa_lat, latitude)
+        meio = (faixa[0] + faixa[1]) / 2
+        if coordenada >= meio:
+            valor = (valor << 1) | 1
+            faixa[0] = meio
+        else:
+            valor <<= 1
+            faixa[1] = meio
+        usar_lon = not usar_lon
+        bits += 1
+        if bits == 5:
+            resultado.append(BASE32[valor])
+            bits, valor = 0, 0
+    return ''.join(resultado)
+
+
+def tamanho_celula(precisao):
+    """(altura, largura) da célula em graus"""
+    bits = 5 * precisao
+    bits_lon = (bits + 1) // 2
+    return 180 / 2 ** (bits - bits_lon), 360 / 2 ** bits_lon
+
+
+def decodificar(geohash):
+    """Centro (latitude, longitude) da célula"""
+    faixa_lat, faixa_lon = [-90.0, 90.0], [-180.0, 180.0]
+    usar_lon = True
+    for caractere in geohash:
+        valor = BASE32.index(caractere)
+        for deslocamento in range(4, -1, -1):
+            faixa = faixa_lon if usar_lon else faixa_lat
+            meio = (faixa[0] + faixa[1]) / 2
+            if valor >> deslocamento & 1:
+                faixa[0] = meio
+            else:
+                faixa[1] = meio
+            usar_lon = not usar_lon
+    return (faixa_lat[0] + faixa_lat[1]) / 2, (faixa_lon[0] + faixa_lon[1]) / 2
+
+
+def distancia_metros(lat1, lon1, lat2, lon2):
+    """Distância (haversine) entre dois pontos"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAIO_TERRA_METROS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def prefixos_na_area(latitude, longitude, raio_metros):
+    """
+    Prefixos de geohash que cobrem o círculo: a maior precisão cuja célula é
+    maior que o raio, com a célula do centro e as 8 vizinhas.
+    """
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    precisao = 1
+    for candidata in range(PRECISAO, 0, -1):
+        altura, largura = tamanho_celula(candidata)
+        if min(altura * METROS_POR_GRAU, largura * METROS_POR_GRAU * cos_lat) >= raio_metros:
+            precisao = candidata
+            break
+    altura, largura = tamanho_celula(precisao)
+    prefixos = set()
+    for dlat in (-altura, 0, altura):
+        for dlon in (-largura, 0, largura):
+            lat = min(max(latitude + dlat, -90.0), 90.0)
+            lon = (longitude + dlon + 180) % 360 - 180
+            prefixos.add(codificar(lat, lon, precisao))
+    return sorted(prefixos)
+
+
+def verificar_cerca(mercado, latitude, longitude, precisao_metros=None):
+    """(distância em metros, dentro da cerca) ou (None, None) se o mercado não tem coordenadas"""
+    if mercado is None or mercado.latitude is None or mercado.longitude is None:
+        return None, None
+    distancia = distancia_metros(float(mercado.latitude), float(mercado.longitude), latitude, longitude)
+    tolerancia = min(precisao_metros or 0, TOLERANCIA_MAXIMA_METROS)
+    return round(distancia), distancia <= mercado.raio_metros + tolerancia
@@ -0,0 +1,26 @@
+"""
+Logs estruturados: uma linha JSON por evento, com os campos passados em
+``extra`` (ex.: ``logger.info('...', extra={'registro': 12, 'duracao_ms': 35})``),
+prontos para o agregador de logs filtrar e somar.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+
+# Atributos que todo LogRecord tem; o resto veio de ``extra``
+_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class FormatoJSON(logging.Formatter):
+
+    def format(self, record):
+        evento = {
+            'data_hora': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+        }
+        evento.update({chave: valor for chave, valor in vars(record).items() if chave not in _PADRAO})
+        if record.exc_info:
+            evento['excecao'] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ponto import arquivamento, particionamento
+from ponto.models import RegistroPonto, inicio_do_dia
+
+
+class Command(BaseCommand):
+    help = (
+        'Move registros mais antigos que a retenção (ARQUIVO_RETENCAO_DIAS) para '
+        'pacotes mensais em ARQUIVO_ROOT, deixando apenas stubs no banco'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--antes-de', type=date.fromisoformat,
+            help='Data de corte AAAA-MM-DD (padrão: hoje - ARQUIVO_RETENCAO_DIAS). '
+                 'Só meses inteiros anteriores ao corte são arquivados.',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=500,
+            help='Quantidade de registros gravados por vez (padrão: 500)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas mostra quantos registros seriam arquivados por mês',
+        )
+        parser.add_argument(
+            '--restaurar', type=int, metavar='ID',
+            help='Restaura um registro arquivado (fotos de volta ao MEDIA_ROOT)',
+        )
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            return self.restaurar(options['restaurar'])
+
+        corte = options['antes_de'] or (
+            timezone.localdate() - timedelta(days=settings.ARQUIVO_RETENCAO_DIAS)
+        )
+        # Arquiva só meses completos, para cada pacote mensal ficar fechado
+        corte = corte.replace(day=1)
+
+        pendentes = RegistroPonto.objects.filter(
+            arquivo='', data_hora__lt=inicio_do_dia(corte)
+        )
+        primeiro = pendentes.order_by('data_hora').values_list('data_hora', flat=True).first()
+        if primeiro is None:
+            self.stdout.write('Nenhum registro a arquivar.')
+            return
+
+        total = 0
+        mes = particionamento.mes_local(primeiro)
+        while mes < corte:
+            proximo = particionamento.proximo_mes(mes)
+            chave = arquivamento.chave_mes(mes)
+            do_mes = pendentes.no_periodo(mes, proximo - timedelta(days=1)).order_by('pk')
+
+            if options['dry_run']:
+                quantidade = do_mes.count()
+                if quantidade:
+                    self.stdout.write(f'{chave}: {quantidade} registro(s)')
+                total += quantidade
+            else:
+                arquivados = 0
+                while True:
+                    lote = list(do_mes[:options['lote']])
+                    if not lote:
+                        break
+                    arquivados += arquivamento.arquivar(chave, lote)
+                if arquivados:
+                    self.stdout.write(f'{chave}: {arquivados} registro(s) arquivado(s)')
+                total += arquivados
+            mes = proximo
+
+        acao = 'seriam arquivados' if options['dry_run'] else 'arquivados'
+        self.stdout.write(self.style.SUCCESS(f'Total: {total} registro(s) {acao}.'))
+
+    def restaurar(self, registro_id):
+        try:
+            registro = RegistroPonto.objects.get(pk=registro_id)
+        except RegistroPonto.DoesNotExist:
+            raise CommandError(f'Registro {registro_id} não encontrado.')
+
+        if not registro.arquivado:
+            raise CommandError(f'Registro {registro_id} não está arquivado.')
+
+        chave = registro.arquivo
+        arquivamento.restaurar(registro)
+        self.stdout.write(self.style.SUCCESS(
+            f'Registro {registro_id} restaurado do pacote {chave}.'
+        ))
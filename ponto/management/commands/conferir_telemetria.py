@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ponto import telemetria
+
+
+class Command(BaseCommand):
+    help = 'Lista registros de ponto cujo KM digitado diverge da telemetria do veículo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data-inicio', type=date.fromisoformat, help='AAAA-MM-DD (padrão: 7 dias atrás)')
+        parser.add_argument('--data-fim', type=date.fromisoformat, help='AAAA-MM-DD (padrão: hoje)')
+        parser.add_argument(
+            '--tolerancia-km', type=int, default=20,
+            help='Diferença máxima aceita em km (padrão: 20)',
+        )
+        parser.add_argument(
+            '--janela', type=int, default=30,
+            help='Minutos em torno do registro para buscar a leitura (padrão: 30)',
+        )
+
+    def handle(self, *args, **options):
+        data_fim = options['data_fim'] or timezone.localdate()
+        data_inicio = options['data_inicio'] or data_fim - timedelta(days=7)
+        janela = timedelta(minutes=options['janela'])
+
+        total = 0
+        dia = data_inicio
+        # Um dia por vez, para não carregar a telemetria do período inteiro
+        while dia <= data_fim:
+            for registro, leitura in telemetria.divergencias(dia, dia, options['tolerancia_km'], janela):
+                total += 1
+                self.stdout.write(
+                    f'#{registro.pk} {registro.motorista.nome_completo} '
+                    f'{timezone.localtime(registro.data_hora):%d/%m/%Y %H:%M} {registro.get_tipo_display()}: '
+                    f'digitado {registro.km_odometro} km, telemetria {leitura.km_odometro} km '
+                    f'({timezone.localtime(leitura.data_hora):%H:%M})'
+                )
+            dia += timedelta(days=1)
+
+        estilo = self.style.WARNING if total else self.style.SUCCESS
+        self.stdout.write(estilo(f'{total} registro(s) divergente(s).'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ponto import particionamento
+
+
+class Command(BaseCommand):
+    help = 'Cria as partições mensais de RegistroPonto para os próximos meses (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses', type=int, default=3,
+            help='Quantidade de meses à frente do atual que devem ter partição (padrão: 3)',
+        )
+
+    def handle(self, *args, **options):
+        if not particionamento.suportado(connection):
+            self.stdout.write('Banco não é PostgreSQL; nada a fazer.')
+            return
+
+        inicio = timezone.localdate().replace(day=1)
+        fim = inicio
+        for _ in range(options['meses']):
+            fim = particionamento.proximo_mes(fim)
+
+        with transaction.atomic():
+            criadas = particionamento.garantir_particoes(inicio, fim, connection)
+
+        for nome in criadas:
+            self.stdout.write(f'Partição criada: {nome}')
+        self.stdout.write(self.style.SUCCESS(f'{len(criadas)} partição(ões) criada(s).'))
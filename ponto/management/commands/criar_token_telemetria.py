@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ponto.models import TokenTelemetria
+
+
+class Command(BaseCommand):
+    help = 'Cria um token para envio de telemetria em api/telemetria/ (exibido uma única vez)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('nome', help='Identificação do rastreador ou integração')
+
+    def handle(self, *args, **options):
+        token, chave = TokenTelemetria.gerar(options['nome'])
+        self.stdout.write(self.style.SUCCESS(f'Token "{token.nome}" criado.'))
+        self.stdout.write(f'Authorization: Token {chave}')
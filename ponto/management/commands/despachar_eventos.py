@@ -0,0 +1,79 @@
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ponto import eventos
+
+# Chave do pg_advisory_lock que garante um único despachante (ordem por motorista)
+TRAVA_DESPACHANTE = 0x70_6F_6E_74_6F  # "ponto"
+
+# Intervalo entre as limpezas dos eventos já entregues
+INTERVALO_LIMPEZA = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        'Entrega os eventos dos registros de ponto (outbox) aos destinos de '
+        'EVENTOS_DESTINOS, em lotes e em ordem por motorista; roda até ser interrompido'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=settings.EVENTOS_LOTE,
+            help='Eventos por entrega (padrão: %(default)s)',
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=1.0, metavar='SEGUNDOS',
+            help='Espera entre as consultas quando não há eventos pendentes (padrão: 1)',
+        )
+        parser.add_argument(
+            '--uma-vez', action='store_true',
+            help='Entrega o que estiver pendente e termina (para rodar agendado)',
+        )
+
+    def _travar(self):
+        # Dois despachantes entregariam eventos do mesmo motorista fora de ordem
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [TRAVA_DESPACHANTE])
+            if not cursor.fetchone()[0]:
+                raise CommandError('Outro despachar_eventos já está rodando.')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser positivo.')
+        destinos = eventos.destinos()
+        if not destinos:
+            raise CommandError(
+                'Nenhum destino configurado (EVENTOS_WEBHOOK_URL, EVENTOS_ARQUIVO ou EVENTOS_FILA_DIR).'
+            )
+        self._travar()
+
+        parar = threading.Event()
+        # SIGTERM (deploy, systemd, docker stop): termina depois do lote atual
+        signal.signal(signal.SIGTERM, lambda *args: parar.set())
+
+        total, ultima_limpeza = 0, 0.0
+        try:
+            while not parar.is_set():
+                if time.monotonic() - ultima_limpeza > INTERVALO_LIMPEZA:
+                    eventos.limpar(settings.EVENTOS_RETENCAO_DIAS)
+                    ultima_limpeza = time.monotonic()
+
+                entregues = eventos.despachar(destinos, options['lote'])
+                total += entregues
+                if entregues == options['lote']:
+                    # Lote cheio: provavelmente há mais, segue sem esperar
+                    continue
+                if options['uma_vez']:
+                    break
+                parar.wait(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'{total} evento(s) entregue(s).'))
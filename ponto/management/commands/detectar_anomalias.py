@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ponto import anomalias
+
+
+class Command(BaseCommand):
+    help = 'Detecta anomalias de odômetro e combustível na frota (para rodar agendado, ex.: diariamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=1,
+            help='Quantidade de dias até hoje a analisar (padrão: 1)',
+        )
+        parser.add_argument('--data-inicio', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--data-fim', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--regra', choices=sorted(anomalias.REGRAS), help='Apenas uma regra')
+
+    def handle(self, *args, **options):
+        data_fim = options['data_fim'] or timezone.localdate()
+        data_inicio = options['data_inicio'] or data_fim - timedelta(days=options['dias'] - 1)
+        if data_inicio > data_fim:
+            raise CommandError('A data de início deve ser anterior à data de fim.')
+
+        encontradas = anomalias.relatorio(data_inicio, data_fim, options['regra'])
+        for anomalia in reversed(encontradas):
+            self.stdout.write(
+                f"{anomalia['data_hora']:%d/%m/%Y %H:%M} {anomalia['placa']} "
+                f"{anomalia['motorista']} - {anomalia['descricao']}: "
+                f"km {anomalia['km_anterior']} -> {anomalia['km']}, "
+                f"combustível {anomalia['nivel_anterior']}% -> {anomalia['nivel']}% "
+                f"(registro #{anomalia['registro_id']}, valor {anomalia['valor']})"
+            )
+
+        estilo = self.style.WARNING if encontradas else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f'{len(encontradas)} anomalia(s) entre {data_inicio:%d/%m/%Y} e {data_fim:%d/%m/%Y}.'
+        ))
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ponto import fotos_repetidas
+from ponto.models import HashFoto, RegistroPonto
+
+
+def _hash_da_foto(item):
+    """(registro_id, campo, hash ou None); roda nos processos do pool"""
+    registro_id, campo, nome = item
+    try:
+        with default_storage.open(nome, 'rb') as arquivo:
+            return registro_id, campo, fotos_repetidas.calcular_hash(arquivo)
+    except OSError:
+        return registro_id, campo, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Calcula o hash perceptual das fotos já gravadas (em paralelo) e sinaliza as repetidas; '
+        'retoma de onde parou, pulando as fotos já indexadas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processos', type=int, default=os.cpu_count(),
+            help='Processos calculando hashes (padrão: número de CPUs)',
+        )
+        parser.add_argument('--lote', type=int, default=500, help='Registros por lote (padrão: 500)')
+        parser.add_argument('--data-inicio', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--data-fim', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--refazer', action='store_true', help='Recalcula também as fotos já indexadas')
+
+    def handle(self, *args, **options):
+        if options['processos'] < 1 or options['lote'] < 1:
+            raise CommandError('--processos e --lote devem ser positivos.')
+
+        registros = RegistroPonto.objects.filter(arquivo='').no_periodo(options['data_inicio'], options['data_fim'])
+        ja_indexadas = set() if options['refazer'] else set(HashFoto.objects.values_list('registro_id', 'campo'))
+
+        # Ordem cronológica: a foto mais antiga é indexada antes e a reenviada
+        # é a que fica sinalizada
+        pendentes = []
+        for registro_id, *nomes in registros.order_by('data_hora', 'pk').values_list(
+            'pk', *fotos_repetidas.CAMPOS_FOTO
+        ).iterator(chunk_size=2000):
+            for campo, nome in zip(fotos_repetidas.CAMPOS_FOTO, nomes):
+                if nome and (registro_id, campo) not in ja_indexadas:
+                    pendentes.append((registro_id, campo, nome))
+        self.stdout.write(f'{len(pendentes)} foto(s) a indexar com {options["processos"]} processo(s).')
+
+        # Os processos filhos (fork) não devem herdar a conexão com o banco:
+        # só leem arquivos, a gravação fica neste processo
+        connections.close_all()
+        indexadas = sinalizadas = ilegiveis = 0
+        with ProcessPoolExecutor(max_workers=options['processos']) as pool:
+            for inicio in range(0, len(pendentes), options['lote']):
+                lote = pendentes[inicio:inicio + options['lote']]
+                resultados = list(pool.map(_hash_da_foto, lote, chunksize=16))
+                em_lote = RegistroPonto.objects.only('pk', 'data_hora').in_bulk({r for r, _, _ in resultados})
+                # pool.map preserva a ordem: gravação segue a ordem cronológica
+                for registro_id, campo, valor in resultados:
+                    if valor is None or registro_id not in em_lote:
+                        ilegiveis += 1
+                        continue
+                    if fotos_repetidas.registrar(em_lote[registro_id], campo, valor):
+                        sinalizadas += 1
+                    indexadas += 1
+                self.stdout.write(f'  {inicio + len(lote)}/{len(pendentes)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{indexadas} foto(s) indexada(s), {sinalizadas} sinalizada(s) como repetida(s), '
+            f'{ilegiveis} ausente(s) ou ilegível(is).'
+        ))
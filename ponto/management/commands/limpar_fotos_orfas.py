@@ -0,0 +1,93 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ponto import fotos_orfas
+
+
+class Command(BaseCommand):
+    help = (
+        'Procura fotos em registros/AAAA/MM/DD/ que nenhum registro referencia e as '
+        'remove (ou só lista, com --dry-run); retoma do último dia concluído'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas mostra as fotos órfãs, sem remover (use -v 2 para listar os nomes)',
+        )
+        parser.add_argument(
+            '--paralelo', type=int, default=8,
+            help='Diretórios de dia varridos ao mesmo tempo (padrão: 8)',
+        )
+        parser.add_argument(
+            '--idade-minima', type=int, default=24, metavar='HORAS',
+            help='Ignora fotos gravadas há menos que isso (padrão: 24 horas)',
+        )
+        parser.add_argument(
+            '--estado', type=Path, default=settings.BASE_DIR / 'limpeza_fotos_orfas.json',
+            help='Arquivo com o progresso, para retomar a varredura (padrão: %(default)s)',
+        )
+        parser.add_argument('--recomecar', action='store_true', help='Ignora o progresso salvo')
+
+    def _ler_estado(self, caminho, modo, recomecar):
+        if recomecar or not caminho.exists():
+            return {'modo': modo, 'ultimo_dia': '', 'arquivos': 0, 'orfas': 0}
+        estado = json.loads(caminho.read_text())
+        if estado['modo'] != modo:
+            raise CommandError(
+                f'O progresso em {caminho} é de uma varredura "{estado["modo"]}"; '
+                f'use --recomecar para começar uma "{modo}".'
+            )
+        return estado
+
+    def _gravar_estado(self, caminho, estado):
+        temporario = caminho.with_suffix('.tmp')
+        temporario.write_text(json.dumps(estado))
+        temporario.replace(caminho)
+
+    def handle(self, *args, **options):
+        if options['paralelo'] < 1:
+            raise CommandError('--paralelo deve ser positivo.')
+        remover = not options['dry_run']
+        modo = 'remover' if remover else 'dry-run'
+        caminho = options['estado']
+        estado = self._ler_estado(caminho, modo, options['recomecar'])
+        idade_minima = timedelta(hours=options['idade_minima'])
+
+        pendentes = [dia for dia in fotos_orfas.dias() if dia > estado['ultimo_dia']]
+        if estado['ultimo_dia']:
+            self.stdout.write(f'Retomando depois de {estado["ultimo_dia"]}.')
+        self.stdout.write(f'{len(pendentes)} diretório(s) de dia a varrer.')
+
+        pool = ThreadPoolExecutor(max_workers=options['paralelo'])
+        try:
+            resultados = pool.map(
+                lambda dia: fotos_orfas.varrer_dia(dia, idade_minima, remover), pendentes
+            )
+            # map devolve na ordem dos dias: o progresso salvo é sempre um
+            # prefixo contínuo, e uma interrupção recomeça no dia seguinte
+            for dia, (arquivos, orfas) in zip(pendentes, resultados):
+                estado['arquivos'] += arquivos
+                estado['orfas'] += len(orfas)
+                estado['ultimo_dia'] = dia
+                self._gravar_estado(caminho, estado)
+                if orfas:
+                    self.stdout.write(f'{dia}: {len(orfas)} de {arquivos} foto(s) órfã(s)')
+                    if options['verbosity'] >= 2:
+                        for nome in orfas:
+                            self.stdout.write(f'  {nome}')
+        finally:
+            # Interrompido (Ctrl+C, erro): não começa os dias ainda na fila
+            pool.shutdown(cancel_futures=True)
+
+        acao = 'encontrada(s)' if options['dry_run'] else 'removida(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{estado["orfas"]} foto(s) órfã(s) {acao} em {estado["arquivos"]} arquivo(s).'
+        ))
+        # Varredura completa: a próxima execução começa do início
+        caminho.unlink(missing_ok=True)
@@ -0,0 +1,108 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Bibliotecas que não devem ser carregadas no boot do worker (só nas views que as usam)
+PESADOS = ('PIL', 'openpyxl', 'numpy')
+
+# Boot de um worker: setup, aplicação WSGI e URLconf (que importa as views),
+# como acontece antes da primeira requisição
+CODIGO = '''
+import json, resource, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+tempo = time.perf_counter() - inicio
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss //= 1024
+print(json.dumps({
+    'tempo_ms': tempo * 1000,
+    'rss_mb': rss / 1024,
+    'modulos': len(sys.modules),
+    'pesados': sorted(m for m in %r if m in sys.modules),
+}))
+'''
+
+
+def _ler_importtime(saida):
+    """{pacote de primeiro nível: tempo acumulado em µs} da saída de -X importtime"""
+    tempos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, acumulado, nome = linha[len('import time:'):].split('|')
+        if nome.startswith('  '):
+            continue  # importado por outro módulo: já está no acumulado dele
+        tempos[nome.strip()] = tempos.get(nome.strip(), 0) + int(acumulado)
+    return tempos
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o tempo de importação e a memória no boot de um worker '
+        '(python -X importtime); falha se passar dos limites informados'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=3, help='Execuções (usa a mediana; padrão: 3)')
+        parser.add_argument('--top', type=int, default=15, help='Pacotes mais lentos a listar (padrão: 15)')
+        parser.add_argument('--limite-ms', type=float, help='Falha se o boot passar deste tempo (ms)')
+        parser.add_argument('--limite-mb', type=float, help='Falha se a memória máxima (RSS) passar deste valor (MB)')
+        parser.add_argument(
+            '--estrito', action='store_true',
+            help=f'Falha se alguma biblioteca pesada ({", ".join(PESADOS)}) for carregada no boot',
+        )
+
+    def _executar(self):
+        ambiente = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE
+        ))
+        processo = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CODIGO % (PESADOS,)],
+            capture_output=True, text=True, env=ambiente, cwd=settings.BASE_DIR,
+        )
+        if processo.returncode != 0:
+            raise CommandError(f'Falha ao iniciar o worker:\n{processo.stderr[-2000:]}')
+        resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+        resultado['pacotes'] = _ler_importtime(processo.stderr)
+        return resultado
+
+    def handle(self, *args, **options):
+        # A primeira execução também compila os .pyc; não entra na mediana
+        self._executar()
+        execucoes = [self._executar() for _ in range(max(options['repeticoes'], 1))]
+
+        tempo = statistics.median(e['tempo_ms'] for e in execucoes)
+        rss = statistics.median(e['rss_mb'] for e in execucoes)
+        ultima = execucoes[-1]
+
+        self.stdout.write(f'Boot do worker: {tempo:.0f} ms, {rss:.1f} MB (RSS máx.), {ultima["modulos"]} módulos')
+        self.stdout.write(f'\nPacotes mais lentos (acumulado, ms):')
+        mais_lentos = sorted(ultima['pacotes'].items(), key=lambda item: item[1], reverse=True)
+        for nome, acumulado in mais_lentos[:options['top']]:
+            self.stdout.write(f'  {acumulado / 1000:8.1f}  {nome}')
+
+        falhas = []
+        if ultima['pesados']:
+            aviso = f'Bibliotecas pesadas carregadas no boot: {", ".join(ultima["pesados"])}'
+            self.stdout.write(self.style.WARNING(f'\n{aviso}'))
+            if options['estrito']:
+                falhas.append(aviso)
+        if options['limite_ms'] is not None and tempo > options['limite_ms']:
+            falhas.append(f'boot de {tempo:.0f} ms acima do limite de {options["limite_ms"]:.0f} ms')
+        if options['limite_mb'] is not None and rss > options['limite_mb']:
+            falhas.append(f'memória de {rss:.1f} MB acima do limite de {options["limite_mb"]:.1f} MB')
+
+        if falhas:
+            raise CommandError('; '.join(falhas))
+        self.stdout.write(self.style.SUCCESS('\nDentro dos limites.'))
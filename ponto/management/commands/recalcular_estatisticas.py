@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ponto import estatisticas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a partir do banco os contadores em cache do dashboard administrativo'
+
+    def handle(self, *args, **options):
+        valores = estatisticas.recalcular()
+        for chave, valor in sorted(valores.items()):
+            self.stdout.write(f'{chave}: {valor}')
+        self.stdout.write(self.style.SUCCESS('Estatísticas do dashboard recalculadas.'))
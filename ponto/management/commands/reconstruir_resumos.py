@@ -0,0 +1,17 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from ponto import resumos
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o resumo diário por mercado a partir dos registros de ponto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data-inicio', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--data-fim', type=date.fromisoformat, help='AAAA-MM-DD')
+
+    def handle(self, *args, **options):
+        total = resumos.reconstruir(options['data_inicio'], options['data_fim'])
+        self.stdout.write(self.style.SUCCESS(f'{total} resumo(s) diário(s) gravado(s).'))
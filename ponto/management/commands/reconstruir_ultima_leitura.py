@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ponto import odometro
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a última leitura (KM, combustível e horário) de cada veículo a partir do histórico'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--veiculo', type=int, action='append', help='ID do veículo (pode repetir)')
+
+    def handle(self, *args, **options):
+        alterados = odometro.recalcular(options['veiculo'])
+        self.stdout.write(self.style.SUCCESS(f'{alterados} veículo(s) atualizado(s).'))
@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ponto import particionamento
+from ponto.models import RegistroPonto
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa EXPLAIN nas consultas de relatório para um período e confere '
+        'se o PostgreSQL poda as partições fora dele'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('data_inicio', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('data_fim', type=date.fromisoformat, help='AAAA-MM-DD')
+
+    def handle(self, *args, **options):
+        if not particionamento.suportado(connection):
+            raise CommandError('Particionamento só é suportado no PostgreSQL.')
+
+        with connection.cursor() as cursor:
+            if not particionamento.tabela_particionada(cursor):
+                raise CommandError(f'{particionamento.TABELA} não é uma tabela particionada.')
+
+        data_inicio, data_fim = options['data_inicio'], options['data_fim']
+        esperadas = set()
+        mes = data_inicio.replace(day=1)
+        while mes <= data_fim:
+            esperadas.add(particionamento.nome_particao(mes))
+            mes = particionamento.proximo_mes(mes)
+
+        # Mesmas consultas de relatorio_ponto, gerar_relatorio e exportar_relatorio_excel
+        periodo = RegistroPonto.objects.no_periodo(data_inicio, data_fim)
+        consultas = {
+            'relatorio': periodo.select_related(
+                'motorista', 'motorista__veiculo', 'motorista__mercado'
+            ).order_by('motorista', 'data_hora'),
+            'contagem': periodo.values('tipo'),
+        }
+
+        falhou = False
+        for nome, queryset in consultas.items():
+            tocadas = set(particionamento.particoes_no_plano(queryset.explain()))
+            # A partição padrão só aparece se houver linhas fora das partições mensais
+            extras = tocadas - esperadas - {particionamento.PARTICAO_PADRAO}
+            if extras:
+                falhou = True
+                self.stdout.write(self.style.ERROR(
+                    f'{nome}: sem poda, partições extras: {", ".join(sorted(extras))}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{nome}: ok ({", ".join(sorted(tocadas)) or "nenhuma partição"})'
+                ))
+
+        if falhou:
+            raise CommandError('Alguma consulta de relatório não teve poda de partições.')
@@ -0,0 +1,143 @@
+"""
+Métricas no formato do Prometheus, expostas em ``/metrics``.
+
+- ``ponto_requisicao_segundos`` e ``ponto_requisicao_consultas``: duração e
+  número de consultas SQL de cada requisição, por nome de URL
+  (``MetricasMiddleware``);
+- ``ponto_foto_etapa_segundos``: decodificação, marca d'água e codificação das
+  fotos; ``ponto_foto_erros_total``: fotos gravadas sem marca d'água;
+- ``ponto_exportacao_segundos`` e ``ponto_exportacao_linhas``: exportações;
+- ``ponto_cache_consultas_total``: acertos e falhas dos caches da app.
+
+As consultas são contadas por um ``execute_wrapper`` que toda conexão recebe
+ao abrir (``connection_created``) e que soma no contador da requisição atual,
+guardado num ``ContextVar``: as views async fazem o ORM nas threads de
+``sync_to_async``, que copiam o contexto, e não na conexão da thread do
+event loop.
+
+Com vários processos (gunicorn, uvicorn workers), defina a variável de
+ambiente ``PROMETHEUS_MULTIPROC_DIR`` apontando para um diretório esvaziado a
+cada início do servidor: cada processo grava seus valores ali e ``coletar``
+soma todos, qualquer que seja o worker que atende o ``/metrics``.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUISICAO_SEGUNDOS = Histogram(
+    'ponto_requisicao_segundos', 'Duração das requisições', ['view', 'metodo', 'status'], buckets=SEGUNDOS,
+)
+REQUISICAO_CONSULTAS = Histogram(
+    'ponto_requisicao_consultas', 'Consultas SQL por requisição', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+FOTO_ETAPA_SEGUNDOS = Histogram(
+    'ponto_foto_etapa_segundos', 'Processamento das fotos por etapa', ['etapa'], buckets=SEGUNDOS,
+)
+FOTO_ERROS = Counter('ponto_foto_erros', "Fotos gravadas sem marca d'água por erro no processamento")
+EXPORTACAO_SEGUNDOS = Histogram(
+    'ponto_exportacao_segundos', 'Duração das exportações', ['tipo'], buckets=SEGUNDOS,
+)
+EXPORTACAO_LINHAS = Histogram(
+    'ponto_exportacao_linhas', 'Linhas por exportação', ['tipo'],
+    buckets=(10, 100, 1000, 10_000, 100_000, 1_000_000),
+)
+CACHE_CONSULTAS = Counter('ponto_cache_consultas', 'Leituras dos caches da app', ['cache', 'resultado'])
+
+METODOS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+# Consultas da requisição em andamento ([total]); None fora de requisições
+_consultas = ContextVar('ponto_consultas', default=None)
+
+
+def contar_consulta(execute, sql, params, many, context):
+    contador = _consultas.get()
+    if contador is not None:
+        contador[0] += 1
+    return execute(sql, params, many, context)
+
+
+def instalar_contador(sender, connection, **kwargs):
+    """Receptor de ``connection_created``: a conexão passa a contar consultas"""
+    if contar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, contar_consulta)
+
+
+@contextmanager
+def cronometrar(histograma, **rotulos):
+    """Observa no histograma a duração do bloco"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograma.labels(**rotulos).observe(time.perf_counter() - inicio)
+
+
+def registrar_cache(nome, acertos, total):
+    if acertos:
+        CACHE_CONSULTAS.labels(nome, 'acerto').inc(acertos)
+    if total > acertos:
+        CACHE_CONSULTAS.labels(nome, 'falha').inc(total - acertos)
+
+
+def coletar():
+    """(conteúdo, content type) no formato texto do Prometheus"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
+
+
+class MetricasMiddleware:
+    """Duração e consultas SQL de cada requisição, pelo nome da URL"""
+
+    # Sob ASGI a cadeia segue assíncrona até as views async
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @contextmanager
+    def _medir(self, request):
+        consultas = [0]
+        marca = _consultas.set(consultas)
+        resultado = {}
+        inicio = time.perf_counter()
+        try:
+            yield resultado
+        finally:
+            _consultas.reset(marca)
+        duracao = time.perf_counter() - inicio
+
+        # Nome da URL (e não o caminho) para não criar uma série por id
+        correspondencia = getattr(request, 'resolver_match', None)
+        view = (correspondencia.view_name if correspondencia else None) or 'sem_rota'
+        metodo = request.method if request.method in METODOS else 'outro'
+        REQUISICAO_SEGUNDOS.labels(view, metodo, str(resultado['response'].status_code)).observe(duracao)
+        REQUISICAO_CONSULTAS.labels(view).observe(consultas[0])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self._medir(request) as resultado:
+            resultado['response'] = self.get_response(request)
+        return resultado['response']
+
+    async def __acall__(self, request):
+        with self._medir(request) as resultado:
+            resultado['response'] = await self.get_response(request)
+        return resultado['response']
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroponto',
+            index=models.Index(fields=['data_hora'], name='ponto_registro_data_hora_idx'),
+        ),
+    ]
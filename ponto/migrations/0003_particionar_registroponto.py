@@ -0,0 +1,143 @@
+# Converte ponto_registroponto em tabela particionada por mês (PostgreSQL).
+# Em outros bancos a migração não faz nada.
+
+# As funções de ponto/particionamento.py estão copiadas aqui: a migração não
+# pode mudar de comportamento quando aquele módulo ou o model mudarem.
+
+from datetime import date, datetime, time
+
+from django.db import migrations
+from django.utils import timezone
+
+TABELA = 'ponto_registroponto'
+PARTICAO_PADRAO = f'{TABELA}_default'
+
+COLUNAS = (
+    'id, tipo, data_hora, foto_odometro, foto_combustivel, '
+    'km_odometro, nivel_combustivel, observacoes, motorista_id'
+)
+
+# Meses criados adiante da data atual; o comando criar_particoes mantém a janela
+MESES_A_FRENTE = 3
+
+
+def _proximo_mes(mes):
+    return date(mes.year + (mes.month // 12), mes.month % 12 + 1, 1)
+
+
+def _mes_local(valor):
+    return timezone.localtime(valor).date().replace(day=1)
+
+
+def _nome_particao(mes):
+    return f'{TABELA}_y{mes.year:04d}m{mes.month:02d}'
+
+
+def _limites(mes):
+    """Literais timestamptz (início inclusivo, fim exclusivo): meia-noite no TIME_ZONE"""
+    inicio, fim = mes.replace(day=1), _proximo_mes(mes)
+    return tuple(
+        timezone.make_aware(datetime.combine(dia, time.min)).isoformat() for dia in (inicio, fim)
+    )
+
+
+def _definicao(nome, particionada):
+    """DDL da tabela de registros, particionada ou comum"""
+    pk = '(id, data_hora)' if particionada else '(id)'
+    sufixo = ' PARTITION BY RANGE (data_hora)' if particionada else ''
+    return f'''
+        CREATE TABLE "{nome}" (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            tipo varchar(10) NOT NULL,
+            data_hora timestamp with time zone NOT NULL,
+            foto_odometro varchar(100) NOT NULL,
+            foto_combustivel varchar(100) NOT NULL,
+            km_odometro integer NOT NULL,
+            nivel_combustivel integer NOT NULL,
+            observacoes text NULL,
+            motorista_id bigint NOT NULL,
+            CONSTRAINT "{nome}_pk" PRIMARY KEY {pk},
+            CONSTRAINT "{nome}_uniq" UNIQUE (motorista_id, data_hora, tipo),
+            CONSTRAINT "{nome}_motorista_fk" FOREIGN KEY (motorista_id)
+                REFERENCES ponto_motorista (id) DEFERRABLE INITIALLY DEFERRED
+        ){sufixo}
+    '''
+
+
+def _trocar_tabela(cursor, nova):
+    """Copia os dados para ``nova``, descarta a tabela atual e assume seu nome"""
+    cursor.execute(f'INSERT INTO "{nova}" ({COLUNAS}) SELECT {COLUNAS} FROM "{TABELA}"')
+    cursor.execute(f'DROP TABLE "{TABELA}"')
+    cursor.execute(f'ALTER TABLE "{nova}" RENAME TO "{TABELA}"')
+    for sufixo in ('pk', 'uniq', 'motorista_fk'):
+        cursor.execute(
+            f'ALTER TABLE "{TABELA}" RENAME CONSTRAINT "{nova}_{sufixo}" TO "{TABELA}_{sufixo}"'
+        )
+    cursor.execute(f'ALTER INDEX "{nova}_data_hora_idx" RENAME TO "ponto_registro_data_hora_idx"')
+    cursor.execute(f'CREATE INDEX "{TABELA}_motorista_id_idx" ON "{TABELA}" (motorista_id)')
+    cursor.execute(f"SELECT pg_get_serial_sequence('\"{TABELA}\"', 'id')")
+    sequencia = cursor.fetchone()[0]
+    cursor.execute(f'ALTER SEQUENCE {sequencia} RENAME TO "{TABELA}_id_seq"')
+    cursor.execute(
+        f"SELECT setval('\"{TABELA}_id_seq\"', COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f'FROM "{TABELA}"'
+    )
+
+
+def particionar(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    nova = f'{TABELA}_nova'
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(data_hora), MAX(data_hora) FROM "{TABELA}"')
+        menor, maior = cursor.fetchone()
+
+        cursor.execute(_definicao(nova, particionada=True))
+        cursor.execute(f'CREATE INDEX "{nova}_data_hora_idx" ON "{nova}" (data_hora)')
+        cursor.execute(
+            f'CREATE TABLE "{PARTICAO_PADRAO}" PARTITION OF "{nova}" DEFAULT'
+        )
+
+        # Partições para todo o histórico (limites no fuso local) e alguns meses à frente
+        hoje = timezone.localdate().replace(day=1)
+        inicio = _mes_local(menor) if menor else hoje
+        fim = _mes_local(maior) if maior else hoje
+        fim = max(fim, hoje)
+        for _ in range(MESES_A_FRENTE):
+            fim = _proximo_mes(fim)
+
+        mes = inicio
+        while mes <= fim:
+            inicio_mes, fim_mes = _limites(mes)
+            cursor.execute(
+                f'CREATE TABLE "{_nome_particao(mes)}" PARTITION OF "{nova}" '
+                f"FOR VALUES FROM ('{inicio_mes}') TO ('{fim_mes}')"
+            )
+            mes = _proximo_mes(mes)
+
+        _trocar_tabela(cursor, nova)
+
+
+def desparticionar(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    nova = f'{TABELA}_nova'
+    with connection.cursor() as cursor:
+        cursor.execute(_definicao(nova, particionada=False))
+        cursor.execute(f'CREATE INDEX "{nova}_data_hora_idx" ON "{nova}" (data_hora)')
+        _trocar_tabela(cursor, nova)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0002_registroponto_data_hora_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(particionar, desparticionar),
+    ]
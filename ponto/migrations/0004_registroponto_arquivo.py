@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0003_particionar_registroponto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registroponto',
+            name='arquivo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7, verbose_name='Arquivo'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0004_registroponto_arquivo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoDiarioMercado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('motoristas_ativos', models.PositiveIntegerField(default=0, verbose_name='Motoristas Ativos')),
+                ('turnos_concluidos', models.PositiveIntegerField(default=0, verbose_name='Turnos Concluídos')),
+                ('km_rodados', models.PositiveIntegerField(default=0, verbose_name='KM Rodados')),
+                ('combustivel_consumido', models.PositiveIntegerField(default=0, help_text='Soma das quedas de nível de combustível (pontos percentuais)', verbose_name='Combustível Consumido (%)')),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('mercado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_diarios', to='ponto.mercado', verbose_name='Mercado')),
+            ],
+            options={
+                'verbose_name': 'Resumo Diário por Mercado',
+                'verbose_name_plural': 'Resumos Diários por Mercado',
+                'ordering': ['-data', 'mercado'],
+                'indexes': [models.Index(fields=['data'], name='resumo_data_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mercado', 'data'), name='resumo_mercado_data_unico')],
+            },
+        ),
+    ]
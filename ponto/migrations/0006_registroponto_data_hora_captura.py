@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0005_resumodiariomercado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registroponto',
+            name='data_hora',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Data/Hora'),
+        ),
+    ]
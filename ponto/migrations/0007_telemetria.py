@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:28
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0006_registroponto_data_hora_captura'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenTelemetria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome')),
+                ('chave_hash', models.CharField(editable=False, max_length=64, unique=True)),
+                ('prefixo', models.CharField(editable=False, max_length=8, verbose_name='Prefixo')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('data_cadastro', models.DateTimeField(auto_now_add=True)),
+                ('ultimo_uso', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Último Uso')),
+            ],
+            options={
+                'verbose_name': 'Token de Telemetria',
+                'verbose_name_plural': 'Tokens de Telemetria',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeituraTelemetria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_hora', models.DateTimeField(verbose_name='Data/Hora')),
+                ('km_odometro', models.PositiveIntegerField(verbose_name='KM do Odômetro')),
+                ('nivel_combustivel', models.PositiveSmallIntegerField(blank=True, null=True, validators=[django.core.validators.MaxValueValidator(100)], verbose_name='Nível Combustível (%)')),
+                ('veiculo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leituras_telemetria', to='ponto.veiculo', verbose_name='Veículo')),
+            ],
+            options={
+                'verbose_name': 'Leitura de Telemetria',
+                'verbose_name_plural': 'Leituras de Telemetria',
+                'ordering': ['-data_hora'],
+                'constraints': [models.UniqueConstraint(fields=('veiculo', 'data_hora'), name='telemetria_veiculo_data_hora_unico')],
+            },
+        ),
+    ]
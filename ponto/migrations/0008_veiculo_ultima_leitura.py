@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0007_telemetria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='veiculo',
+            name='ultima_leitura_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Última Leitura'),
+        ),
+        migrations.AddField(
+            model_name='veiculo',
+            name='ultimo_km',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Último KM'),
+        ),
+        migrations.AddField(
+            model_name='veiculo',
+            name='ultimo_nivel_combustivel',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Último Nível de Combustível (%)'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Índices de busca (PostgreSQL): trigramas sem acento para nomes, CPF e placas
+# e busca textual em português nas observações dos registros.
+# As expressões dos índices precisam ser idênticas às usadas em ponto/busca.py.
+# Em outros bancos a migração não faz nada.
+
+from django.db import migrations
+
+FUNCAO = 'ponto_unaccent'
+CONFIGURACAO = 'ponto_portugues'
+
+INDICES = (
+    ('ponto_motorista_nome_trgm', 'ponto_motorista',
+     f'{FUNCAO}(lower(nome_completo)) gin_trgm_ops'),
+    ('ponto_motorista_cpf_trgm', 'ponto_motorista',
+     "regexp_replace(cpf, '[^0-9]', '', 'g') gin_trgm_ops"),
+    ('ponto_veiculo_placa_trgm', 'ponto_veiculo',
+     "replace(placa, '-', '') gin_trgm_ops"),
+    # Tabela particionada: o índice é criado em cada partição
+    ('ponto_registro_observacoes_fts', 'ponto_registroponto',
+     f"(to_tsvector('{CONFIGURACAO}', COALESCE(observacoes, '')))"),
+)
+
+
+def criar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        # unaccent() não é IMMUTABLE (depende do search_path); o invólucro
+        # com dicionário explícito pode ser usado em índices
+        cursor.execute(
+            f'CREATE OR REPLACE FUNCTION {FUNCAO}(text) RETURNS text '
+            f'LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT '
+            f"AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+        )
+        cursor.execute(f'CREATE TEXT SEARCH CONFIGURATION {CONFIGURACAO} (COPY = portuguese)')
+        cursor.execute(
+            f'ALTER TEXT SEARCH CONFIGURATION {CONFIGURACAO} '
+            f'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem'
+        )
+        for nome, tabela, expressao in INDICES:
+            cursor.execute(f'CREATE INDEX "{nome}" ON "{tabela}" USING gin ({expressao})')
+
+
+def remover(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for nome, _, _ in INDICES:
+            cursor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+        cursor.execute(f'DROP TEXT SEARCH CONFIGURATION IF EXISTS {CONFIGURACAO}')
+        cursor.execute(f'DROP FUNCTION IF EXISTS {FUNCAO}(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0008_veiculo_ultima_leitura'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar, remover),
+    ]
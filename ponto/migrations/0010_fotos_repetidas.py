@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0009_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FotoRepetida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campo', models.CharField(choices=[('foto_odometro', 'Odômetro'), ('foto_combustivel', 'Combustível')], max_length=20, verbose_name='Foto')),
+                ('campo_original', models.CharField(choices=[('foto_odometro', 'Odômetro'), ('foto_combustivel', 'Combustível')], max_length=20, verbose_name='Foto Original')),
+                ('distancia', models.PositiveSmallIntegerField(help_text='Bits diferentes entre os hashes (0 = mesma imagem)', verbose_name='Distância')),
+                ('revisada', models.BooleanField(default=False, verbose_name='Revisada')),
+                ('data_cadastro', models.DateTimeField(auto_now_add=True)),
+                ('original', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ponto.registroponto', verbose_name='Registro Original')),
+                ('registro', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='fotos_repetidas', to='ponto.registroponto', verbose_name='Registro')),
+            ],
+            options={
+                'verbose_name': 'Foto Repetida',
+                'verbose_name_plural': 'Fotos Repetidas',
+                'ordering': ['-data_cadastro'],
+                'indexes': [models.Index(fields=['revisada', '-data_cadastro'], name='foto_repetida_revisada_idx')],
+                'constraints': [models.UniqueConstraint(fields=('registro', 'campo'), name='foto_repetida_registro_campo_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HashFoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campo', models.CharField(choices=[('foto_odometro', 'Odômetro'), ('foto_combustivel', 'Combustível')], max_length=20, verbose_name='Foto')),
+                ('hash', models.BigIntegerField(verbose_name='Hash')),
+                ('faixa0', models.PositiveIntegerField()),
+                ('faixa1', models.PositiveIntegerField()),
+                ('faixa2', models.PositiveIntegerField()),
+                ('faixa3', models.PositiveIntegerField()),
+                ('data_hora', models.DateTimeField(verbose_name='Data/Hora')),
+                ('registro', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='hashes_fotos', to='ponto.registroponto', verbose_name='Registro')),
+            ],
+            options={
+                'verbose_name': 'Hash de Foto',
+                'verbose_name_plural': 'Hashes de Fotos',
+                'indexes': [models.Index(fields=['faixa0'], name='hash_foto_faixa0_idx'), models.Index(fields=['faixa1'], name='hash_foto_faixa1_idx'), models.Index(fields=['faixa2'], name='hash_foto_faixa2_idx'), models.Index(fields=['faixa3'], name='hash_foto_faixa3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('registro', 'campo'), name='hash_foto_registro_campo_unico')],
+            },
+        ),
+    ]
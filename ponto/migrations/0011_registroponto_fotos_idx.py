@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0010_fotos_repetidas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroponto',
+            index=models.Index(fields=['foto_odometro'], name='registro_foto_odometro_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroponto',
+            index=models.Index(fields=['foto_combustivel'], name='registro_foto_combustivel_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0011_registroponto_fotos_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mercado',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='mercado',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Longitude'),
+        ),
+        migrations.AddField(
+            model_name='mercado',
+            name='raio_metros',
+            field=models.PositiveIntegerField(default=300, verbose_name='Raio da Cerca (m)'),
+        ),
+        migrations.AddField(
+            model_name='registroponto',
+            name='dentro_cerca',
+            field=models.BooleanField(editable=False, null=True, verbose_name='Dentro da Cerca'),
+        ),
+        migrations.AddField(
+            model_name='registroponto',
+            name='distancia_mercado_metros',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Distância do Mercado (m)'),
+        ),
+        migrations.AddField(
+            model_name='registroponto',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12, verbose_name='Geohash'),
+        ),
+        migrations.AddField(
+            model_name='registroponto',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='registroponto',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Longitude'),
+        ),
+        migrations.AddField(
+            model_name='registroponto',
+            name='precisao_metros',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Precisão (m)'),
+        ),
+        migrations.AddIndex(
+            model_name='registroponto',
+            index=models.Index(fields=['geohash'], name='registro_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:03
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ponto', '0012_localizacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoSaida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('registro.criado', 'Registro criado'), ('registro.alterado', 'Registro alterado'), ('registro.removido', 'Registro removido')], max_length=30, verbose_name='Tipo')),
+                ('registro_id', models.BigIntegerField(verbose_name='Registro')),
+                ('motorista_id', models.BigIntegerField(verbose_name='Motorista')),
+                ('dados', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Dados')),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Criado em')),
+                ('enviado_em', models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('proxima_tentativa', models.DateTimeField(blank=True, null=True, verbose_name='Próxima Tentativa')),
+                ('ultimo_erro', models.TextField(blank=True, default='', verbose_name='Último Erro')),
+            ],
+            options={
+                'verbose_name': 'Evento de Saída',
+                'verbose_name_plural': 'Eventos de Saída',
+                'ordering': ['-id'],
+                'indexes': [models.Index(condition=models.Q(('enviado_em__isnull', True)), fields=['id'], name='evento_pendente_idx'), models.Index(condition=models.Q(('enviado_em__isnull', True), ('proxima_tentativa__isnull', False)), fields=['proxima_tentativa'], name='evento_em_espera_idx'), models.Index(fields=['enviado_em'], name='evento_enviado_idx')],
+            },
+        ),
+    ]
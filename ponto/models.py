@@ -1,9 +1,22 @@
-from django.db import models
+from datetime import date, datetime, time, timedelta
+import hashlib
+import secrets
+
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 import os
+from django.urls import reverse
 from django.utils import timezone
 
+
+def inicio_do_dia(dia):
+    """Meia-noite (no fuso TIME_ZONE) do dia informado, como datetime aware"""
+    if isinstance(dia, str):
+        dia = date.fromisoformat(dia)
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
 def upload_to_registro(instance, filename):
     """Função para organizar o upload das fotos por data"""
     today = timezone.now().strftime('%Y/%m/%d')
@@ -13,6 +26,14 @@ class Mercado(models.Model):
     nome = models.CharField(max_length=100, verbose_name="Nome do Mercado")
     endereco = models.TextField(blank=True, null=True, verbose_name="Endereço")
     telefone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Telefone")
+    # Cerca: registros de ponto a mais de raio_metros daqui são sinalizados (ponto/geo.py)
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Latitude"
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Longitude"
+    )
+    raio_metros = models.PositiveIntegerField(default=300, verbose_name="Raio da Cerca (m)")
     ativo = models.BooleanField(default=True, verbose_name="Ativo")
     data_cadastro = models.DateTimeField(auto_now_add=True)
 
@@ -31,6 +52,14 @@ class Veiculo(models.Model):
     ativo = models.BooleanField(default=True, verbose_name="Ativo")
     data_cadastro = models.DateTimeField(auto_now_add=True)
 
+    # Última leitura conhecida (registro de ponto ou telemetria), mantida por
+    # odometro.registrar para validar novas leituras sem consultar o histórico
+    ultimo_km = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Último KM")
+    ultimo_nivel_combustivel = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Último Nível de Combustível (%)"
+    )
+    ultima_leitura_em = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Última Leitura")
+
     class Meta:
         verbose_name = "Veículo"
         verbose_name_plural = "Veículos"
@@ -71,6 +100,27 @@ class Motorista(models.Model):
     def __str__(self):
         return f"{self.nome_completo} - {self.mercado.nome}"
 
+class RegistroPontoQuerySet(models.QuerySet):
+    def no_periodo(self, data_inicio=None, data_fim=None):
+        """
+        Filtra por intervalo de datas (inclusivo) usando limites de data_hora.
+
+        Ao contrário de ``data_hora__date``, a comparação direta com a coluna
+        usa o índice e permite a poda de partições mensais no PostgreSQL.
+        """
+        qs = self
+        if data_inicio:
+            qs = qs.filter(data_hora__gte=inicio_do_dia(data_inicio))
+        if data_fim:
+            if isinstance(data_fim, str):
+                data_fim = date.fromisoformat(data_fim)
+            qs = qs.filter(data_hora__lt=inicio_do_dia(data_fim + timedelta(days=1)))
+        return qs
+
+    def do_dia(self, dia):
+        return self.no_periodo(dia, dia)
+
+
 class RegistroPonto(models.Model):
     TIPO_CHOICES = [
         ('entrada', 'Entrada'),
@@ -87,7 +137,9 @@ class RegistroPonto(models.Model):
         choices=TIPO_CHOICES, 
         verbose_name="Tipo"
     )
-    data_hora = models.DateTimeField(auto_now_add=True, verbose_name="Data/Hora")
+    # Padrão é o momento do save; registros sincronizados do app offline
+    # recebem o horário em que foram capturados no celular
+    data_hora = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Data/Hora")
     
     # Fotos obrigatórias
     foto_odometro = models.ImageField(
@@ -117,15 +169,60 @@ class RegistroPonto(models.Model):
         verbose_name="Observações"
     )
 
+    # Localização do aparelho no registro (opcional; geolocalização do navegador)
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Latitude"
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Longitude"
+    )
+    precisao_metros = models.PositiveIntegerField(null=True, blank=True, verbose_name="Precisão (m)")
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False, verbose_name="Geohash")
+    # Cerca do mercado do motorista no momento do registro; None = sem localização
+    # ou mercado sem coordenadas
+    distancia_mercado_metros = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Distância do Mercado (m)"
+    )
+    dentro_cerca = models.BooleanField(null=True, editable=False, verbose_name="Dentro da Cerca")
+
+    # Pacote mensal (AAAA-MM) onde o registro foi arquivado; vazio = não arquivado
+    arquivo = models.CharField(
+        max_length=7,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Arquivo"
+    )
+
+    objects = RegistroPontoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Registro de Ponto"
         verbose_name_plural = "Registros de Ponto"
         ordering = ['-data_hora']
         unique_together = (('motorista', 'data_hora', 'tipo'),)
+        indexes = [
+            models.Index(fields=['data_hora'], name='ponto_registro_data_hora_idx'),
+            # Busca pelo nome do arquivo (limpeza de fotos órfãs, limpar_fotos_orfas)
+            models.Index(fields=['foto_odometro'], name='registro_foto_odometro_idx'),
+            models.Index(fields=['foto_combustivel'], name='registro_foto_combustivel_idx'),
+            # Busca por prefixo (LIKE 'abc%') na grade de geohash (ponto/geo.py)
+            models.Index(fields=['geohash'], name='registro_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ]
+        # No PostgreSQL a tabela é particionada por mês em data_hora
+        # (migração 0003). A chave primária física é (id, data_hora), então
+        # chaves estrangeiras para RegistroPonto devem usar db_constraint=False.
 
     def __str__(self):
         return f"{self.motorista.nome_completo} - {self.get_tipo_display()} - {self.data_hora.strftime('%d/%m/%Y %H:%M')}"
 
+    def save(self, *args, **kwargs):
+        # O evento de saída (signals, ponto/eventos.py) é gravado na mesma
+        # transação do registro, mesmo fora de um atomic() da view
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     @property
     def data_formatada(self):
         return self.data_hora.strftime('%d/%m/%Y')
@@ -134,38 +231,308 @@ class RegistroPonto(models.Model):
     def hora_formatada(self):
         return self.data_hora.strftime('%H:%M')
 
+    @property
+    def arquivado(self):
+        return bool(self.arquivo)
+
+    def url_foto(self, campo):
+        """URL autenticada da foto (servida por views.foto_registro)"""
+        if not getattr(self, campo):
+            return None
+        return reverse('foto_registro', args=[self.pk, campo])
+
+    @property
+    def url_foto_odometro(self):
+        return self.url_foto('foto_odometro')
+
+    @property
+    def url_foto_combustivel(self):
+        return self.url_foto('foto_combustivel')
+
+    def _filtro_registro_par(self):
+        data_atual = timezone.localtime(self.data_hora).date()
+        tipo_oposto = 'saida' if self.tipo == 'entrada' else 'entrada'
+        return RegistroPonto.objects.do_dia(data_atual).filter(
+            motorista_id=self.motorista_id,
+            tipo=tipo_oposto
+        )
+
     def get_registro_par(self):
         """Retorna o registro de entrada/saída correspondente do mesmo dia"""
-        data_atual = self.data_hora.date()
-        tipo_oposto = 'saida' if self.tipo == 'entrada' else 'entrada'
-        
         try:
-            return RegistroPonto.objects.get(
-                motorista=self.motorista,
-                tipo=tipo_oposto,
-                data_hora__date=data_atual
-            )
+            return self._filtro_registro_par().get()
+        except RegistroPonto.DoesNotExist:
+            return None
+
+    async def aget_registro_par(self):
+        """Versão assíncrona de get_registro_par"""
+        try:
+            return await self._filtro_registro_par().aget()
         except RegistroPonto.DoesNotExist:
             return None
 
-    def calcular_horas_trabalhadas(self):
+    def calcular_horas_trabalhadas(self, par=None):
         """Calcula as horas trabalhadas no dia (se houver entrada e saída)"""
-        if self.tipo == 'entrada':
-            saida = self.get_registro_par()
-            if saida:
-                delta = saida.data_hora - self.data_hora
-                return delta.total_seconds() / 3600  # Retorna em horas
-        elif self.tipo == 'saida':
-            entrada = self.get_registro_par()
-            if entrada:
-                delta = self.data_hora - entrada.data_hora
-                return delta.total_seconds() / 3600  # Retorna em horas
+        par = par or self.get_registro_par()
+        if par:
+            if self.tipo == 'entrada':
+                delta = par.data_hora - self.data_hora
+            else:
+                delta = self.data_hora - par.data_hora
+            return delta.total_seconds() / 3600  # Retorna em horas
         return 0
 
-    def calcular_km_rodados(self):
+    def calcular_km_rodados(self, par=None):
         """Calcula os km rodados no dia (saída - entrada)"""
         if self.tipo == 'saida':
-            entrada = self.get_registro_par()
+            entrada = par or self.get_registro_par()
             if entrada and self.km_odometro > entrada.km_odometro:
                 return self.km_odometro - entrada.km_odometro
-        return 0
\ No newline at end of file
+        return 0
+
+class ResumoDiarioMercado(models.Model):
+    """Totais diários por mercado, mantidos a partir dos registros de ponto"""
+    mercado = models.ForeignKey(
+        Mercado,
+        on_delete=models.CASCADE,
+        related_name='resumos_diarios',
+        verbose_name="Mercado"
+    )
+    data = models.DateField(verbose_name="Data")
+    motoristas_ativos = models.PositiveIntegerField(default=0, verbose_name="Motoristas Ativos")
+    turnos_concluidos = models.PositiveIntegerField(default=0, verbose_name="Turnos Concluídos")
+    km_rodados = models.PositiveIntegerField(default=0, verbose_name="KM Rodados")
+    combustivel_consumido = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Combustível Consumido (%)",
+        help_text="Soma das quedas de nível de combustível (pontos percentuais)"
+    )
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Resumo Diário por Mercado"
+        verbose_name_plural = "Resumos Diários por Mercado"
+        ordering = ['-data', 'mercado']
+        constraints = [
+            models.UniqueConstraint(fields=['mercado', 'data'], name='resumo_mercado_data_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['data'], name='resumo_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.mercado.nome} - {self.data.strftime('%d/%m/%Y')}"
+
+class TokenTelemetria(models.Model):
+    """Credencial de um rastreador/integração para enviar leituras de telemetria"""
+    nome = models.CharField(max_length=100, verbose_name="Nome")
+    # Só o SHA-256 do token é guardado; o valor é exibido uma única vez ao criar
+    chave_hash = models.CharField(max_length=64, unique=True, editable=False)
+    prefixo = models.CharField(max_length=8, editable=False, verbose_name="Prefixo")
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    data_cadastro = models.DateTimeField(auto_now_add=True)
+    ultimo_uso = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Último Uso")
+
+    class Meta:
+        verbose_name = "Token de Telemetria"
+        verbose_name_plural = "Tokens de Telemetria"
+        ordering = ['nome']
+
+    def __str__(self):
+        return f"{self.nome} ({self.prefixo}…)"
+
+    @staticmethod
+    def hash_chave(chave):
+        return hashlib.sha256(chave.encode()).hexdigest()
+
+    def nova_chave(self):
+        """Sorteia uma nova chave (sem salvar) e retorna o texto puro"""
+        chave = secrets.token_urlsafe(32)
+        self.chave_hash = self.hash_chave(chave)
+        self.prefixo = chave[:8]
+        return chave
+
+    @classmethod
+    def gerar(cls, nome):
+        """Cria um token e retorna (token, chave em texto puro)"""
+        token = cls(nome=nome)
+        chave = token.nova_chave()
+        token.save()
+        return token, chave
+
+    @classmethod
+    def autenticar(cls, chave):
+        """Token ativo correspondente à chave, ou None"""
+        if not chave:
+            return None
+        return cls.objects.filter(chave_hash=cls.hash_chave(chave), ativo=True).first()
+
+class LeituraTelemetria(models.Model):
+    """
+    Leitura de odômetro/combustível enviada por rastreador. Tabela só de
+    inserção: uma linha por (veículo, instante), sem fotos nem texto livre.
+    """
+    veiculo = models.ForeignKey(
+        Veiculo,
+        on_delete=models.CASCADE,
+        related_name='leituras_telemetria',
+        verbose_name="Veículo"
+    )
+    data_hora = models.DateTimeField(verbose_name="Data/Hora")
+    km_odometro = models.PositiveIntegerField(verbose_name="KM do Odômetro")
+    nivel_combustivel = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        validators=[MaxValueValidator(100)],
+        verbose_name="Nível Combustível (%)"
+    )
+
+    class Meta:
+        verbose_name = "Leitura de Telemetria"
+        verbose_name_plural = "Leituras de Telemetria"
+        ordering = ['-data_hora']
+        constraints = [
+            # Reenvios da mesma leitura são ignorados na inserção
+            models.UniqueConstraint(fields=['veiculo', 'data_hora'], name='telemetria_veiculo_data_hora_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.veiculo.placa} - {timezone.localtime(self.data_hora).strftime('%d/%m/%Y %H:%M')} - {self.km_odometro} km"
+
+CAMPOS_FOTO_CHOICES = [
+    ('foto_odometro', 'Odômetro'),
+    ('foto_combustivel', 'Combustível'),
+]
+
+class HashFoto(models.Model):
+    """
+    Hash perceptual (dHash de 64 bits) de uma foto de registro. As quatro
+    faixas de 16 bits são indexadas para a busca por fotos parecidas
+    (multi-index hashing, ver ``ponto/fotos_repetidas.py``).
+    """
+    # RegistroPonto é particionada: sem FK no banco (ver RegistroPonto.Meta)
+    registro = models.ForeignKey(
+        RegistroPonto,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='hashes_fotos',
+        verbose_name="Registro"
+    )
+    campo = models.CharField(max_length=20, choices=CAMPOS_FOTO_CHOICES, verbose_name="Foto")
+    hash = models.BigIntegerField(verbose_name="Hash")
+    faixa0 = models.PositiveIntegerField()
+    faixa1 = models.PositiveIntegerField()
+    faixa2 = models.PositiveIntegerField()
+    faixa3 = models.PositiveIntegerField()
+    # Cópia de registro.data_hora: a foto mais antiga é a original
+    data_hora = models.DateTimeField(verbose_name="Data/Hora")
+
+    class Meta:
+        verbose_name = "Hash de Foto"
+        verbose_name_plural = "Hashes de Fotos"
+        constraints = [
+            models.UniqueConstraint(fields=['registro', 'campo'], name='hash_foto_registro_campo_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['faixa0'], name='hash_foto_faixa0_idx'),
+            models.Index(fields=['faixa1'], name='hash_foto_faixa1_idx'),
+            models.Index(fields=['faixa2'], name='hash_foto_faixa2_idx'),
+            models.Index(fields=['faixa3'], name='hash_foto_faixa3_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_campo_display()} do registro #{self.registro_id}: {self.hash & 0xFFFFFFFFFFFFFFFF:016x}"
+
+class FotoRepetida(models.Model):
+    """Foto de registro quase idêntica a uma enviada antes, aguardando revisão do admin"""
+    registro = models.ForeignKey(
+        RegistroPonto,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='fotos_repetidas',
+        verbose_name="Registro"
+    )
+    campo = models.CharField(max_length=20, choices=CAMPOS_FOTO_CHOICES, verbose_name="Foto")
+    original = models.ForeignKey(
+        RegistroPonto,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='+',
+        verbose_name="Registro Original"
+    )
+    campo_original = models.CharField(max_length=20, choices=CAMPOS_FOTO_CHOICES, verbose_name="Foto Original")
+    distancia = models.PositiveSmallIntegerField(
+        verbose_name="Distância",
+        help_text="Bits diferentes entre os hashes (0 = mesma imagem)"
+    )
+    revisada = models.BooleanField(default=False, verbose_name="Revisada")
+    data_cadastro = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Foto Repetida"
+        verbose_name_plural = "Fotos Repetidas"
+        ordering = ['-data_cadastro']
+        constraints = [
+            models.UniqueConstraint(fields=['registro', 'campo'], name='foto_repetida_registro_campo_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['revisada', '-data_cadastro'], name='foto_repetida_revisada_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_campo_display()} do registro #{self.registro_id} ≈ registro #{self.original_id}"
+
+class EventoSaida(models.Model):
+    """
+    Mudança em um registro de ponto a entregar aos sistemas externos (outbox).
+    Gravado na mesma transação do registro; entregue pelo comando
+    ``despachar_eventos`` (ver ``ponto/eventos.py``).
+    """
+    TIPO_CHOICES = [
+        ('registro.criado', 'Registro criado'),
+        ('registro.alterado', 'Registro alterado'),
+        ('registro.removido', 'Registro removido'),
+    ]
+
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES, verbose_name="Tipo")
+    # Sem FK: o registro pode ter sido removido (e RegistroPonto é particionada)
+    registro_id = models.BigIntegerField(verbose_name="Registro")
+    # Chave de ordenação: eventos do mesmo motorista são entregues em ordem
+    motorista_id = models.BigIntegerField(verbose_name="Motorista")
+    dados = models.JSONField(encoder=DjangoJSONEncoder, verbose_name="Dados")
+    criado_em = models.DateTimeField(default=timezone.now, verbose_name="Criado em")
+    enviado_em = models.DateTimeField(null=True, blank=True, verbose_name="Enviado em")
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    proxima_tentativa = models.DateTimeField(null=True, blank=True, verbose_name="Próxima Tentativa")
+    ultimo_erro = models.TextField(blank=True, default='', verbose_name="Último Erro")
+
+    class Meta:
+        verbose_name = "Evento de Saída"
+        verbose_name_plural = "Eventos de Saída"
+        ordering = ['-id']
+        indexes = [
+            # Só os pendentes: o despachante lê poucas linhas de uma tabela que cresce
+            models.Index(
+                fields=['id'], name='evento_pendente_idx', condition=models.Q(enviado_em__isnull=True)
+            ),
+            models.Index(
+                fields=['proxima_tentativa'],
+                name='evento_em_espera_idx',
+                condition=models.Q(enviado_em__isnull=True, proxima_tentativa__isnull=False),
+            ),
+            models.Index(fields=['enviado_em'], name='evento_enviado_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.tipo} (registro #{self.registro_id})"
+
+    def envelope(self):
+        """Evento como entregue aos destinos"""
+        return {
+            'id': self.pk,
+            'tipo': self.tipo,
+            'criado_em': self.criado_em.isoformat(),
+            'registro_id': self.registro_id,
+            'motorista_id': self.motorista_id,
+            'dados': self.dados,
+        }
@@ -0,0 +1,101 @@
+"""
+Última leitura conhecida de cada veículo (``Veiculo.ultimo_km``,
+``ultimo_nivel_combustivel`` e ``ultima_leitura_em``).
+
+- ``registrar`` grava uma leitura com um único UPDATE condicional, que só
+  substitui a atual se a nova for mais recente: leituras fora de ordem (app
+  offline, telemetria atrasada) não fazem o valor regredir e workers
+  concorrentes não se sobrescrevem.
+- ``verificar`` compara uma nova leitura com a última, sem consultar o
+  histórico de registros.
+- ``recalcular`` refaz os valores a partir do histórico (comando
+  ``reconstruir_ultima_leitura``).
+"""
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import LeituraTelemetria, RegistroPonto, Veiculo
+
+# Velocidade média máxima plausível entre duas leituras do mesmo veículo
+VELOCIDADE_MAX_KMH = 120
+CAMPOS = ('ultimo_km', 'ultimo_nivel_combustivel', 'ultima_leitura_em')
+
+
+def registrar(veiculo_id, momento, km, nivel=None):
+    """Grava a leitura se for a mais recente do veículo; retorna se gravou"""
+    valores = {'ultimo_km': km, 'ultima_leitura_em': momento}
+    if nivel is not None:
+        valores['ultimo_nivel_combustivel'] = nivel
+    return bool(
+        Veiculo.objects.filter(pk=veiculo_id).filter(
+            Q(ultima_leitura_em__isnull=True) | Q(ultima_leitura_em__lte=momento)
+        ).update(**valores)
+    )
+
+
+def verificar(veiculo, km, momento=None):
+    """Avisos sobre uma nova leitura de KM, comparada à última do veículo"""
+    momento = momento or timezone.now()
+    if veiculo.ultimo_km is None or veiculo.ultima_leitura_em is None:
+        return []
+    if momento < veiculo.ultima_leitura_em:
+        # Leitura anterior à última conhecida (ex.: sincronização atrasada)
+        return []
+
+    quando = timezone.localtime(veiculo.ultima_leitura_em).strftime('%d/%m/%Y %H:%M')
+    if km < veiculo.ultimo_km:
+        return [f'O KM informado é menor que a última leitura do veículo ({veiculo.ultimo_km} km em {quando}).']
+
+    horas = (momento - veiculo.ultima_leitura_em).total_seconds() / 3600
+    rodados = km - veiculo.ultimo_km
+    # Pelo menos uma hora de folga, para pequenas diferenças logo após a última leitura
+    if rodados > VELOCIDADE_MAX_KMH * max(horas, 1):
+        return [
+            f'O KM informado está {rodados} km acima da última leitura do veículo '
+            f'({veiculo.ultimo_km} km em {quando}), o que não é possível em {horas:.1f} h.'
+        ]
+    return []
+
+
+def _ultima(queryset, campo):
+    return Subquery(queryset.values(campo)[:1])
+
+
+def recalcular(veiculos=None):
+    """Refaz a última leitura dos veículos (todos, se None); retorna quantos mudaram"""
+    registros = RegistroPonto.objects.filter(motorista__veiculo=OuterRef('pk')).order_by('-data_hora')
+    telemetria = LeituraTelemetria.objects.filter(veiculo=OuterRef('pk')).order_by('-data_hora')
+
+    consulta = Veiculo.objects.annotate(
+        registro_em=_ultima(registros, 'data_hora'),
+        registro_km=_ultima(registros, 'km_odometro'),
+        registro_nivel=_ultima(registros, 'nivel_combustivel'),
+        telemetria_em=_ultima(telemetria, 'data_hora'),
+        telemetria_km=_ultima(telemetria, 'km_odometro'),
+        telemetria_nivel=_ultima(telemetria, 'nivel_combustivel'),
+    )
+    if veiculos is not None:
+        consulta = consulta.filter(pk__in=veiculos)
+
+    alterados = []
+    for veiculo in consulta:
+        leituras = [
+            (veiculo.registro_em, veiculo.registro_km, veiculo.registro_nivel),
+            (veiculo.telemetria_em, veiculo.telemetria_km, veiculo.telemetria_nivel),
+        ]
+        leituras = sorted((l for l in leituras if l[0]), key=lambda l: l[0], reverse=True)
+        if leituras:
+            momento, km, nivel = leituras[0]
+            # Telemetria sem nível: mantém o nível da outra fonte
+            if nivel is None and len(leituras) > 1:
+                nivel = leituras[1][2]
+        else:
+            momento = km = nivel = None
+
+        novo = (km, nivel, momento)
+        if novo != tuple(getattr(veiculo, campo) for campo in CAMPOS):
+            veiculo.ultimo_km, veiculo.ultimo_nivel_combustivel, veiculo.ultima_leitura_em = novo
+            alterados.append(veiculo)
+
+    Veiculo.objects.bulk_update(alterados, CAMPOS, batch_size=500)
+    return len(alterados)
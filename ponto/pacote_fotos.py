@@ -0,0 +1,119 @@
+"""
+ZIP com as fotos de odômetro e combustível de um conjunto de registros, para
+auditoria, com um ``manifesto.csv`` descrevendo cada foto.
+
+O ZIP é gerado enquanto é baixado: cada foto é lida do armazenamento em blocos
+e repassada, sem arquivo temporário nem a foto inteira na memória (no bucket
+S3, direto da resposta HTTP; nos registros arquivados, de dentro do pacote
+mensal). As fotos entram sem nova compressão (JPEG já é comprimido). Só o
+manifesto, texto pequeno, é montado em memória e vai no fim do ZIP.
+"""
+import csv
+import io
+import logging
+import posixpath
+import re
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from . import arquivamento
+from .planilhas import SaidaZip
+
+logger = logging.getLogger(__name__)
+
+BLOCO = 64 * 1024
+
+CABECALHOS_MANIFESTO = [
+    'arquivo', 'registro_id', 'motorista', 'cpf', 'mercado', 'veiculo', 'tipo',
+    'data_hora', 'km_odometro', 'nivel_combustivel', 'foto', 'situacao',
+]
+
+
+def _seguro(texto):
+    return re.sub(r'[^\w.-]+', '_', texto).strip('_') or 'sem_nome'
+
+
+def _abrir(registro, campo):
+    """Arquivo (binário, leitura sequencial) com a foto do registro"""
+    if registro.arquivado:
+        return arquivamento.ler_foto(registro, campo)
+    nome = getattr(registro, campo).name
+    abrir_fluxo = getattr(default_storage, 'abrir_fluxo', None)
+    return abrir_fluxo(nome) if abrir_fluxo else default_storage.open(nome, 'rb')
+
+
+def membro(registro, campo):
+    """Caminho da foto dentro do ZIP: motorista/AAAA-MM-DD_HHMM_tipo_foto_id.ext"""
+    motorista = registro.motorista
+    momento = timezone.localtime(registro.data_hora)
+    extensao = posixpath.splitext(getattr(registro, campo).name)[1].lower() or '.jpg'
+    rotulo = campo.removeprefix('foto_')
+    return (
+        f'{_seguro(f"{motorista.nome_completo}_{motorista.cpf}")}/'
+        f'{momento:%Y-%m-%d_%H%M}_{registro.tipo}_{rotulo}_{registro.pk}{extensao}'
+    )
+
+
+def gerar_zip(registros):
+    """Gera os bytes do ZIP (fotos + manifesto.csv) à medida que são lidos"""
+    saida = SaidaZip()
+    manifesto = io.StringIO()
+    escritor = csv.writer(manifesto)
+    escritor.writerow(CABECALHOS_MANIFESTO)
+
+    with zipfile.ZipFile(saida, 'w', zipfile.ZIP_STORED) as pacote:
+        for registro in registros:
+            for campo in arquivamento.CAMPOS_FOTO:
+                if not getattr(registro, campo):
+                    continue
+                caminho = membro(registro, campo)
+                situacao = 'ok'
+                try:
+                    origem = _abrir(registro, campo)
+                except FileNotFoundError:
+                    situacao = 'ausente'
+                else:
+                    with origem, pacote.open(caminho, 'w', force_zip64=True) as destino:
+                        for bloco in iter(lambda: origem.read(BLOCO), b''):
+                            destino.write(bloco)
+                            yield saida.esvaziar()
+                    yield saida.esvaziar()
+
+                motorista = registro.motorista
+                escritor.writerow([
+                    caminho if situacao == 'ok' else '',
+                    registro.pk,
+                    motorista.nome_completo,
+                    motorista.cpf,
+                    motorista.mercado.nome if motorista.mercado else '',
+                    str(motorista.veiculo) if motorista.veiculo else '',
+                    registro.tipo,
+                    timezone.localtime(registro.data_hora).isoformat(),
+                    registro.km_odometro,
+                    registro.nivel_combustivel,
+                    campo,
+                    situacao,
+                ])
+                if situacao != 'ok':
+                    logger.warning('Foto ausente no pacote de auditoria', extra={
+                        'registro_id': registro.pk, 'campo': campo,
+                    })
+
+        # utf-8-sig: o Excel abre o CSV com acentos corretos
+        pacote.writestr('manifesto.csv', manifesto.getvalue().encode('utf-8-sig'))
+    yield saida.esvaziar()
+
+
+def resposta(registros, nome='fotos_registros'):
+    """StreamingHttpResponse com o ZIP das fotos dos registros"""
+    # O ZIP é gerado depois que a view retorna: fixa já o banco escolhido
+    # agora (réplica, com @leitura_replica)
+    registros = registros.using(registros.db).select_related(
+        'motorista', 'motorista__veiculo', 'motorista__mercado'
+    ).order_by('motorista__nome_completo', 'data_hora', 'pk')
+    response = StreamingHttpResponse(gerar_zip(registros.iterator(chunk_size=500)), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{nome}_{timezone.localtime():%Y%m%d_%H%M%S}.zip"'
+    return response
@@ -0,0 +1,140 @@
+"""
+Particionamento mensal (RANGE em data_hora) da tabela de RegistroPonto.
+
+Só tem efeito no PostgreSQL; nos demais bancos as funções não fazem nada.
+Os limites de cada partição são a meia-noite do primeiro dia do mês no fuso
+TIME_ZONE, de modo que um relatório mensal toca exatamente uma partição.
+"""
+import re
+from datetime import date
+
+from django.db import connection as default_connection
+from django.utils import timezone
+
+from .models import inicio_do_dia
+
+TABELA = 'ponto_registroponto'
+PARTICAO_PADRAO = f'{TABELA}_default'
+PADRAO_NOME = re.compile(rf'^{TABELA}_y(\d{{4}})m(\d{{2}})$')
+
+
+def suportado(connection=default_connection):
+    return connection.vendor == 'postgresql'
+
+
+def proximo_mes(mes):
+    return date(mes.year + (mes.month // 12), mes.month % 12 + 1, 1)
+
+
+def mes_local(valor):
+    """Primeiro dia do mês (no fuso TIME_ZONE) de um datetime"""
+    return timezone.localtime(valor).date().replace(day=1)
+
+
+def nome_particao(mes):
+    return f'{TABELA}_y{mes.year:04d}m{mes.month:02d}'
+
+
+def limites(mes):
+    """Literais timestamptz (início inclusivo, fim exclusivo) da partição do mês"""
+    inicio = inicio_do_dia(mes.replace(day=1)).isoformat()
+    fim = inicio_do_dia(proximo_mes(mes)).isoformat()
+    return inicio, fim
+
+
+def tabela_particionada(cursor):
+    cursor.execute(
+        "SELECT c.relkind FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = %s AND n.nspname = current_schema()",
+        [TABELA],
+    )
+    linha = cursor.fetchone()
+    return bool(linha) and linha[0] == 'p'
+
+
+def particoes_existentes(cursor):
+    """Meses (date no dia 1) que já têm partição"""
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = %s",
+        [TABELA],
+    )
+    meses = set()
+    for (nome,) in cursor.fetchall():
+        casamento = PADRAO_NOME.match(nome)
+        if casamento:
+            meses.add(date(int(casamento.group(1)), int(casamento.group(2)), 1))
+    return meses
+
+
+def linhas_estimadas(connection=default_connection):
+    """
+    Total de registros estimado pelas estatísticas do planejador (soma das
+    partições), sem percorrer a tabela; None fora do PostgreSQL ou se nenhuma
+    partição foi analisada. Partições nunca analisadas (as dos meses futuros
+    e a padrão, em geral vazias) contam como zero.
+    """
+    if not suportado(connection):
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(GREATEST(c.reltuples, 0)), bool_and(c.reltuples < 0) FROM pg_class c "
+            "WHERE c.relkind = 'r' AND (c.oid = %s::regclass OR c.oid IN ("
+            "SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass))",
+            [TABELA, TABELA],
+        )
+        total, sem_estatistica = cursor.fetchone()
+    if total is None or sem_estatistica:
+        return None
+    return int(total)
+
+
+def criar_particao(cursor, mes):
+    """
+    Cria a partição do mês, movendo para ela as linhas que tenham caído na
+    partição padrão. Deve rodar dentro de uma transação.
+    """
+    nome = nome_particao(mes)
+    inicio, fim = limites(mes)
+    cursor.execute(
+        f'CREATE TABLE "{nome}" (LIKE "{TABELA}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    cursor.execute(
+        f'WITH movidos AS ('
+        f'DELETE FROM "{PARTICAO_PADRAO}" WHERE data_hora >= %s AND data_hora < %s RETURNING *'
+        f') INSERT INTO "{nome}" SELECT * FROM movidos',
+        [inicio, fim],
+    )
+    cursor.execute(
+        f"ALTER TABLE \"{TABELA}\" ATTACH PARTITION \"{nome}\" "
+        f"FOR VALUES FROM ('{inicio}') TO ('{fim}')"
+    )
+    return nome
+
+
+def garantir_particoes(inicio, fim, connection=default_connection):
+    """Cria as partições que faltam para os meses de ``inicio`` até ``fim``"""
+    if not suportado(connection):
+        return []
+
+    criadas = []
+    with connection.cursor() as cursor:
+        if not tabela_particionada(cursor):
+            return []
+        existentes = particoes_existentes(cursor)
+        mes = inicio.replace(day=1)
+        while mes <= fim:
+            if mes not in existentes:
+                criadas.append(criar_particao(cursor, mes))
+            mes = proximo_mes(mes)
+    return criadas
+
+
+def particoes_no_plano(plano):
+    """Nomes de partições que aparecem em um EXPLAIN (formato texto)"""
+    padrao = re.compile(rf'\b({TABELA}_(?:y\d{{4}}m\d{{2}}|default))\b')
+    return sorted(set(padrao.findall(plano)))
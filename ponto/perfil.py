@@ -0,0 +1,224 @@
+"""
+Perfilamento (cProfile) de uma amostra das requisições em produção.
+
+Com ``PERFIL_ATIVO`` o ``PerfilMiddleware`` perfila a view de uma fração
+``PERFIL_AMOSTRA`` das requisições e, sempre, das URLs cujos nomes estão em
+``PERFIL_URLS`` (ex.: ``exportar_relatorio_excel,relatorio_ponto``). Cada perfil
+vira um ``.prof`` (formato do ``pstats``, abre no snakeviz) com um ``.json`` de
+metadados ao lado, em ``PERFIL_DIR``; só os ``PERFIL_MAX_ARQUIVOS`` mais
+recentes são mantidos. Desligado, o Django descarta o middleware na
+inicialização (``MiddlewareNotUsed``) e não há custo por requisição.
+
+Views assíncronas não são perfiladas: rodam em outra thread, fora do alcance
+do cProfile. Só um perfil por vez no processo: requisição amostrada enquanto
+outra está sendo perfilada segue sem perfil.
+
+No Python 3.12+ o cProfile usa ``sys.monitoring`` e registra as chamadas de
+todas as threads do processo, não só a da requisição. Com servidor em threads
+(runserver, gunicorn ``--threads``, ASGI) a requisição só é perfilada se for a
+única em andamento no processo; se outra começar durante o perfil, ele é
+gravado com ``exclusivo: false`` (os números incluem as duas) e a listagem
+avisa. Para perfis confiáveis sob carga, use workers de uma thread.
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+NOME_VALIDO = re.compile(r'^[\w.-]+\.prof$')
+
+logger = logging.getLogger(__name__)
+
+# Python 3.12+: o perfilador vê as chamadas de todas as threads do processo
+PERFIL_DO_PROCESSO = sys.version_info >= (3, 12)
+
+# Um perfil por vez no processo (threads do runserver/ASGI)
+_trava = threading.Lock()
+# Requisições em andamento no processo e se alguma começou durante o perfil atual
+_contagem = threading.Lock()
+_em_andamento = 0
+_misturado = False
+
+
+def _entrar():
+    global _em_andamento, _misturado
+    with _contagem:
+        _em_andamento += 1
+        if _trava.locked():
+            _misturado = True
+
+
+def _sair():
+    global _em_andamento
+    with _contagem:
+        _em_andamento -= 1
+
+
+def _diretorio():
+    diretorio = settings.PERFIL_DIR
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return diretorio
+
+
+def deve_perfilar(nome_url):
+    return nome_url in settings.PERFIL_URLS or random.random() < settings.PERFIL_AMOSTRA
+
+
+def gravar(perfilador, metadados):
+    """Grava o perfil e os metadados; descarta os mais antigos além do limite"""
+    momento = timezone.localtime()
+    nome = f"{momento:%Y%m%d-%H%M%S}_{metadados['url_nome'] or 'sem-nome'}_{uuid.uuid4().hex[:6]}"
+    diretorio = _diretorio()
+    perfilador.dump_stats(diretorio / f'{nome}.prof')
+    metadados = dict(metadados, data_hora=momento.isoformat(), arquivo=f'{nome}.prof')
+    (diretorio / f'{nome}.json').write_text(json.dumps(metadados, ensure_ascii=False))
+    rotacionar()
+    return f'{nome}.prof'
+
+
+def rotacionar():
+    perfis = sorted(_diretorio().glob('*.prof'))
+    for antigo in perfis[:max(len(perfis) - settings.PERFIL_MAX_ARQUIVOS, 0)]:
+        antigo.unlink(missing_ok=True)
+        antigo.with_suffix('.json').unlink(missing_ok=True)
+
+
+def listar():
+    """Metadados dos perfis gravados, mais recentes primeiro"""
+    if not settings.PERFIL_DIR.is_dir():
+        return []
+    perfis = []
+    for arquivo in sorted(settings.PERFIL_DIR.glob('*.json'), reverse=True):
+        try:
+            metadados = json.loads(arquivo.read_text())
+        except (OSError, ValueError):
+            continue  # removido pela rotação ou gravação incompleta
+        metadados['data_hora'] = datetime.fromisoformat(metadados['data_hora'])
+        perfis.append(metadados)
+    return perfis
+
+
+def caminho(nome):
+    """Caminho do .prof pelo nome (sem permitir sair de PERFIL_DIR); None se não existe"""
+    if not NOME_VALIDO.match(nome):
+        return None
+    arquivo = settings.PERFIL_DIR / nome
+    return arquivo if arquivo.is_file() else None
+
+
+def resumo(nome, linhas=40, ordem='cumulative'):
+    """Texto do pstats com as funções mais custosas"""
+    saida = io.StringIO()
+    pstats.Stats(str(caminho(nome)), stream=saida).sort_stats(ordem).print_stats(linhas)
+    return saida.getvalue()
+
+
+class PerfilMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERFIL_ATIVO:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _entrar()
+        try:
+            response = self.get_response(request)
+        finally:
+            _sair()
+            perfilador = self._encerrar(request)
+        if perfilador is not None:
+            self._gravar(request, response, perfilador)
+        return response
+
+    async def __acall__(self, request):
+        # Sob ASGI, process_view e a view síncrona rodam na thread de
+        # sync_to_async (thread_sensitive); o perfilador é desligado nela
+        _entrar()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _sair()
+            perfilador = await sync_to_async(self._encerrar, thread_sensitive=True)(request)
+        if perfilador is not None:
+            await sync_to_async(self._gravar, thread_sensitive=True)(request, response, perfilador)
+        return response
+
+    def _encerrar(self, request):
+        """Desliga o perfilador da requisição (se houver) e libera a trava"""
+        perfilador = getattr(request, '_perfilador', None)
+        if perfilador is None:
+            return None
+        try:
+            perfilador.disable()
+        finally:
+            with _contagem:
+                request._perfil_exclusivo = not (PERFIL_DO_PROCESSO and _misturado)
+            request._perfilador = None
+            _trava.release()
+        return perfilador
+
+    def _gravar(self, request, response, perfilador):
+        duracao_ms = (time.perf_counter() - request._perfil_inicio) * 1000
+        if duracao_ms < settings.PERFIL_MIN_MS:
+            return
+        usuario = getattr(request, 'user', None)
+        try:
+            gravar(perfilador, {
+                'metodo': request.method,
+                'caminho': request.get_full_path(),
+                'url_nome': request.resolver_match.url_name if request.resolver_match else None,
+                'status': response.status_code,
+                'duracao_ms': round(duracao_ms, 1),
+                'usuario': usuario.get_username() if usuario and usuario.is_authenticated else None,
+                'exclusivo': request._perfil_exclusivo,
+            })
+        except OSError:
+            # Diagnóstico nunca derruba a requisição (ex.: disco cheio)
+            logger.exception('Falha ao gravar perfil da requisição')
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        global _misturado
+        if iscoroutinefunction(view_func) or not deve_perfilar(request.resolver_match.url_name):
+            return None
+        # Outra requisição sendo perfilada: esta segue sem perfil
+        if not _trava.acquire(blocking=False):
+            return None
+        if PERFIL_DO_PROCESSO:
+            # Outra requisição em andamento entraria no perfil desta
+            with _contagem:
+                sozinha = _em_andamento <= 1
+                _misturado = False
+            if not sozinha:
+                _trava.release()
+                return None
+        perfilador = cProfile.Profile()
+        try:
+            perfilador.enable()
+        except ValueError:
+            # Outra ferramenta de perfil ativa no processo (ex.: sys.monitoring)
+            _trava.release()
+            return None
+        request._perfil_inicio = time.perf_counter()
+        request._perfilador = perfilador
+        return None
@@ -0,0 +1,48 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.http import JsonResponse
+from django.utils import timezone
+
+
+def _e_staff(user):
+    return user.is_superuser or user.is_staff
+
+
+def staff_api(view_func):
+    """
+    Restringe uma view de API a administradores, respondendo 403 em JSON.
+    Funciona com views síncronas e assíncronas (usa ``request.auser()``).
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _view(request, *args, **kwargs):
+            if not _e_staff(await request.auser()):
+                return JsonResponse({'error': 'Acesso negado'}, status=403)
+            return await view_func(request, *args, **kwargs)
+    else:
+        @wraps(view_func)
+        def _view(request, *args, **kwargs):
+            if not _e_staff(request.user):
+                return JsonResponse({'error': 'Acesso negado'}, status=403)
+            return view_func(request, *args, **kwargs)
+    return _view
+
+
+def token_telemetria(view_func):
+    """
+    Autentica integrações de telemetria pelo cabeçalho
+    ``Authorization: Token <chave>``, respondendo 401 em JSON.
+    """
+    @wraps(view_func)
+    def _view(request, *args, **kwargs):
+        from .models import TokenTelemetria
+
+        esquema, _, chave = request.headers.get('Authorization', '').partition(' ')
+        token = TokenTelemetria.autenticar(chave.strip()) if esquema.lower() == 'token' else None
+        if token is None:
+            return JsonResponse({'error': 'Token inválido'}, status=401)
+        TokenTelemetria.objects.filter(pk=token.pk).update(ultimo_uso=timezone.now())
+        request.token_telemetria = token
+        return view_func(request, *args, **kwargs)
+    return _view
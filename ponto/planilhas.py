@@ -0,0 +1,167 @@
+"""
+Montagem das planilhas do relatório de ponto e do pacote ZIP com uma planilha
+por mercado ou por motorista.
+
+O openpyxl gasta quase todo o tempo da exportação em Python puro (uma thread
+só avança por vez), então as planilhas do pacote são montadas em paralelo num
+pool de processos, e o ZIP é enviado à medida que cada uma fica pronta: o tempo
+total cresce com o número de núcleos, não com o de grupos.
+
+Se um processo do pool morre (ex.: OOM killer), o pool inteiro fica
+inutilizável (``BrokenProcessPool``): ele é descartado e as planilhas que
+faltavam são montadas uma vez mais num pool novo.
+
+Este módulo não importa o Django: os processos do pool (``forkserver``) o
+carregam sozinho, sem configurar settings, apps ou conexões com o banco. Os
+dados chegam já prontos, como tuplas de valores simples.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+CABECALHOS = [
+    'Motorista', 'CPF', 'Veículo', 'Mercado', 'Data',
+    'Entrada', 'Saída', 'Horas Trabalhadas', 'KM Rodados', 'Valor Dia'
+]
+
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_trava = threading.Lock()
+
+
+def montar_planilha(linhas, titulo="Relatório de Ponto"):
+    """Bytes do .xlsx com o cabeçalho padrão e as linhas informadas"""
+    import openpyxl
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    # Nome de aba: até 31 caracteres e sem []:*?/\
+    ws.title = re.sub(r'[\[\]:*?/\\]', ' ', titulo)[:31] or "Relatório"
+
+    # Estilo do cabeçalho
+    header_font = Font(bold=True, color='FFFFFF')
+    header_fill = PatternFill(start_color='2563eb', end_color='2563eb', fill_type='solid')
+
+    for col_num, header in enumerate(CABECALHOS, 1):
+        cell = ws.cell(row=1, column=col_num, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center')
+
+    # Largura das colunas pelo maior valor (calculada junto com as linhas)
+    larguras = [len(header) for header in CABECALHOS]
+    for linha in linhas:
+        ws.append(linha)
+        for i, valor in enumerate(linha):
+            if valor:
+                larguras[i] = max(larguras[i], len(str(valor)))
+    for i, largura in enumerate(larguras, 1):
+        ws.column_dimensions[get_column_letter(i)].width = largura + 2
+
+    saida = io.BytesIO()
+    wb.save(saida)
+    return saida.getvalue()
+
+
+def nome_arquivo(nome, usados):
+    """Nome de arquivo seguro e único dentro do ZIP"""
+    base = re.sub(r'[^\w.-]+', '_', nome).strip('_') or 'sem_nome'
+    candidato, n = f'{base}.xlsx', 2
+    while candidato in usados:
+        candidato, n = f'{base}_{n}.xlsx', n + 1
+    usados.add(candidato)
+    return candidato
+
+
+def pool(processos=None):
+    """
+    Pool compartilhado pelas requisições do worker, criado no primeiro uso.
+    ``processos`` (padrão: número de CPUs) só vale nessa criação: chamadas
+    seguintes devolvem o mesmo pool, qualquer que seja o valor.
+    """
+    global _pool
+    with _pool_trava:
+        if _pool is None:
+            # forkserver: os filhos não herdam threads nem sockets do servidor
+            _pool = ProcessPoolExecutor(
+                max_workers=processos or os.cpu_count(),
+                mp_context=multiprocessing.get_context('forkserver'),
+            )
+        return _pool
+
+
+def descartar_pool(quebrado):
+    """Encerra o pool quebrado; o próximo ``pool()`` cria outro"""
+    global _pool
+    with _pool_trava:
+        if _pool is quebrado:
+            _pool = None
+    quebrado.shutdown(wait=False, cancel_futures=True)
+
+
+class SaidaZip(io.RawIOBase):
+    """Destino de um ZipFile gerado aos pedaços: acumula os bytes até serem enviados"""
+
+    def __init__(self):
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def esvaziar(self):
+        dados = b''.join(self.partes)
+        self.partes = []
+        return dados
+
+
+def gerar_zip(grupos, processos=None):
+    """
+    Gera os bytes do ZIP, uma planilha por grupo, na ordem em que ficam prontas.
+
+    ``grupos``: {nome: linhas}. As planilhas já são comprimidas (xlsx é ZIP),
+    então entram sem nova compressão. Com o pool quebrado duas vezes seguidas
+    o ``BrokenProcessPool`` é propagado (o download fica incompleto).
+    """
+    usados = set()
+    pendentes = {nome_arquivo(nome, usados): (nome, linhas) for nome, linhas in grupos.items()}
+    saida = SaidaZip()
+    with zipfile.ZipFile(saida, 'w', zipfile.ZIP_STORED) as pacote:
+        for tentativa in range(2):
+            executor = pool(processos)
+            futuros = {}
+            try:
+                for arquivo, (nome, linhas) in pendentes.items():
+                    futuros[executor.submit(montar_planilha, linhas, nome)] = arquivo
+                for futuro in as_completed(futuros):
+                    arquivo = futuros[futuro]
+                    pacote.writestr(arquivo, futuro.result())
+                    del pendentes[arquivo]
+                    yield saida.esvaziar()
+                break
+            except BrokenProcessPool:
+                descartar_pool(executor)
+                logger.warning('Pool de planilhas quebrado', extra={
+                    'pendentes': len(pendentes), 'tentativa': tentativa + 1,
+                })
+                if tentativa:
+                    raise
+            finally:
+                # Download interrompido: descarta as planilhas que nem começaram
+                for futuro in futuros:
+                    futuro.cancel()
+    yield saida.esvaziar()
@@ -0,0 +1,115 @@
+"""
+Resumo diário por mercado (ResumoDiarioMercado).
+
+Cada (mercado, dia) é recalculado isoladamente quando um registro daquele dia
+é salvo ou removido (ver ``signals.py``), o que custa uma consulta pequena.
+``reconstruir`` refaz um período inteiro em uma única passada ordenada.
+
+O registro conta para o mercado atual do motorista (como nos relatórios):
+quando o motorista muda de mercado, os dias dele são refeitos nos dois
+mercados (``reconstruir`` com ``mercados``).
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RegistroPonto, ResumoDiarioMercado
+
+METRICAS = ('motoristas_ativos', 'turnos_concluidos', 'km_rodados', 'combustivel_consumido')
+CAMPOS = ('motorista_id', 'motorista__mercado_id', 'data_hora', 'tipo', 'km_odometro', 'nivel_combustivel')
+
+
+def _totais(linhas):
+    """
+    Agrupa linhas (na ordem de CAMPOS) por (mercado, dia) e devolve os
+    totais de cada grupo.
+    """
+    turnos = defaultdict(dict)
+    for motorista_id, mercado_id, data_hora, tipo, km, nivel in linhas:
+        dia = timezone.localtime(data_hora).date()
+        turnos[(mercado_id, dia, motorista_id)][tipo] = (km, nivel)
+
+    totais = defaultdict(lambda: dict.fromkeys(METRICAS, 0))
+    for (mercado_id, dia, _), turno in turnos.items():
+        resumo = totais[(mercado_id, dia)]
+        resumo['motoristas_ativos'] += 1
+        entrada, saida = turno.get('entrada'), turno.get('saida')
+        if entrada and saida:
+            resumo['turnos_concluidos'] += 1
+            # Odômetro voltando ou tanque abastecido não contam como negativo
+            resumo['km_rodados'] += max(saida[0] - entrada[0], 0)
+            resumo['combustivel_consumido'] += max(entrada[1] - saida[1], 0)
+    return totais
+
+
+def atualizar_dia(mercado_id, dia):
+    """Recalcula o resumo de um mercado em um dia"""
+    linhas = RegistroPonto.objects.do_dia(dia).filter(
+        motorista__mercado_id=mercado_id
+    ).values_list(*CAMPOS)
+    totais = _totais(linhas).get((mercado_id, dia))
+
+    if totais is None:
+        ResumoDiarioMercado.objects.filter(mercado_id=mercado_id, data=dia).delete()
+    else:
+        ResumoDiarioMercado.objects.update_or_create(
+            mercado_id=mercado_id, data=dia, defaults=totais
+        )
+
+
+def reconstruir(data_inicio=None, data_fim=None, lote=1000, mercados=None):
+    """Refaz todos os resumos do período (ou de todo o histórico), de todos os mercados ou só de ``mercados``"""
+    linhas = RegistroPonto.objects.no_periodo(data_inicio, data_fim).order_by()
+    existentes = ResumoDiarioMercado.objects.all()
+    if mercados is not None:
+        linhas = linhas.filter(motorista__mercado_id__in=mercados)
+        existentes = existentes.filter(mercado_id__in=mercados)
+    totais = _totais(linhas.values_list(*CAMPOS).iterator(chunk_size=5000))
+
+    resumos = [
+        ResumoDiarioMercado(mercado_id=mercado_id, data=dia, **valores)
+        for (mercado_id, dia), valores in totais.items()
+    ]
+
+    if data_inicio:
+        existentes = existentes.filter(data__gte=data_inicio)
+    if data_fim:
+        existentes = existentes.filter(data__lte=data_fim)
+
+    with transaction.atomic():
+        existentes.delete()
+        ResumoDiarioMercado.objects.bulk_create(resumos, batch_size=lote)
+    return len(resumos)
+
+
+def tendencias(dias=30, mercado_id=None):
+    """
+    Séries diárias por mercado dos últimos ``dias``, lidas só do resumo.
+    Dias sem registros entram com zero, para todas as séries compartilharem
+    o mesmo eixo ``datas``.
+    """
+    hoje = timezone.localdate()
+    inicio = hoje - timedelta(days=dias - 1)
+    datas = [inicio + timedelta(days=i) for i in range(dias)]
+
+    resumos = ResumoDiarioMercado.objects.filter(data__gte=inicio, data__lte=hoje)
+    if mercado_id:
+        resumos = resumos.filter(mercado_id=mercado_id)
+
+    series = {}
+    for linha in resumos.values('data', 'mercado_id', 'mercado__nome', *METRICAS):
+        serie = series.get(linha['mercado_id'])
+        if serie is None:
+            serie = {'mercado': linha['mercado__nome']}
+            serie.update({metrica: [0] * dias for metrica in METRICAS})
+            series[linha['mercado_id']] = serie
+        posicao = (linha['data'] - inicio).days
+        for metrica in METRICAS:
+            serie[metrica][posicao] = linha[metrica]
+
+    return {
+        'datas': [dia.isoformat() for dia in datas],
+        'series': sorted(series.values(), key=lambda serie: serie['mercado']),
+    }
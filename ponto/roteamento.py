@@ -0,0 +1,122 @@
+"""
+Roteamento opcional de leituras pesadas (relatórios, exportações e APIs) para
+uma réplica de leitura.
+
+- Views marcadas com ``@leitura_replica`` leem os modelos da app ``ponto`` do
+  alias ``replica``; todo o resto (e todas as escritas) vai para ``default``.
+- Depois que um usuário faz uma escrita, suas leituras ficam no primário por
+  ``REPLICA_JANELA_PRIMARIO`` segundos, evitando ver dados ainda não replicados.
+- Sem ``replica`` em ``DATABASES`` o roteador não interfere.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = 'replica'
+CHAVE_SESSAO = '_ultima_escrita'
+
+_alias_leitura = ContextVar('alias_leitura', default=None)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+def _escreveu_recentemente(request):
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    ultima = session.get(CHAVE_SESSAO)
+    return bool(ultima) and time.time() - ultima < settings.REPLICA_JANELA_PRIMARIO
+
+
+def _alias_para(request):
+    if replica_configurada() and not _escreveu_recentemente(request):
+        return REPLICA
+    return None
+
+
+def leitura_replica(view_func):
+    """Faz as leituras da view (somente leitura) usarem a réplica, se houver"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _view(request, *args, **kwargs):
+            token = _alias_leitura.set(_alias_para(request))
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _alias_leitura.reset(token)
+    else:
+        @wraps(view_func)
+        def _view(request, *args, **kwargs):
+            token = _alias_leitura.set(_alias_para(request))
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                _alias_leitura.reset(token)
+    return _view
+
+
+class EscritaRecenteMiddleware:
+    """Marca na sessão o momento da última requisição de escrita do usuário"""
+
+    METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _escrita(self, request):
+        return replica_configurada() and request.method not in self.METODOS_SEGUROS
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if (
+            self._escrita(request)
+            and getattr(request, 'user', None) is not None
+            and request.user.is_authenticated
+        ):
+            request.session[CHAVE_SESSAO] = time.time()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._escrita(request) and hasattr(request, 'auser'):
+            # Versões async: request.user e a sessão consultam o banco
+            usuario = await request.auser()
+            if usuario.is_authenticated:
+                await request.session.aset(CHAVE_SESSAO, time.time())
+        return response
+
+
+class ReplicaRouter:
+    """Envia leituras dos modelos de ``ponto`` à réplica dentro de ``@leitura_replica``"""
+
+    app_label = 'ponto'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return _alias_leitura.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA:
+            return False
+        return None
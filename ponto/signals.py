@@ -0,0 +1,181 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import estatisticas, eventos, fotos_repetidas, odometro, resumos
+from .models import Motorista, Veiculo, Mercado, RegistroPonto
+
+
+# =====================
+# ESTATÍSTICAS DO DASHBOARD
+# =====================
+
+def _cadastro_alterado(sender, instance, **kwargs):
+    transaction.on_commit(partial(estatisticas.atualizar_ativos, sender))
+    transaction.on_commit(estatisticas.invalidar_ultimos_registros)
+
+
+for _model in estatisticas.CONTADORES_ATIVOS:
+    post_save.connect(_cadastro_alterado, sender=_model, dispatch_uid=f'estatisticas_save_{_model.__name__}')
+    post_delete.connect(_cadastro_alterado, sender=_model, dispatch_uid=f'estatisticas_delete_{_model.__name__}')
+
+
+@receiver(post_save, sender=RegistroPonto, dispatch_uid='estatisticas_registro_save')
+def registro_salvo(sender, instance, **kwargs):
+    # Antes de resumo_registro_salvo: _chaves_resumo ainda tem o dia anterior (edição)
+    for dia in {dia for _, dia in _chaves_resumo(instance)}:
+        transaction.on_commit(partial(estatisticas.atualizar_dia, dia))
+    transaction.on_commit(estatisticas.invalidar_ultimos_registros)
+
+
+@receiver(post_delete, sender=RegistroPonto, dispatch_uid='estatisticas_registro_delete')
+def registro_removido(sender, instance, **kwargs):
+    transaction.on_commit(partial(estatisticas.atualizar_dia, estatisticas.dia_do_registro(instance)))
+    transaction.on_commit(estatisticas.invalidar_ultimos_registros)
+
+
+# =====================
+# RESUMO DIÁRIO POR MERCADO E EFICIÊNCIA MENSAL
+# =====================
+
+@receiver(post_init, sender=RegistroPonto, dispatch_uid='resumo_registro_init')
+def guardar_dia_registro(sender, instance, **kwargs):
+    """Guarda motorista/data carregados para refazer também o dia antigo ao editar"""
+    if instance.pk:
+        instance._resumo_inicial = (
+            instance.__dict__.get('motorista_id'),
+            instance.__dict__.get('data_hora'),
+        )
+
+
+def _atualizar_resumos(chaves):
+    mercados = dict(
+        Motorista.objects.filter(
+            pk__in={motorista_id for motorista_id, _ in chaves}
+        ).values_list('pk', 'mercado_id')
+    )
+    for motorista_id, dia in chaves:
+        if motorista_id in mercados:
+            resumos.atualizar_dia(mercados[motorista_id], dia)
+
+
+@receiver(post_init, sender=Motorista, dispatch_uid='resumo_motorista_init')
+def guardar_mercado_motorista(sender, instance, **kwargs):
+    instance._mercado_inicial = instance.__dict__.get('mercado_id') if instance.pk else None
+
+
+def _refazer_mercados(motorista_id, mercados):
+    periodo = RegistroPonto.objects.filter(motorista_id=motorista_id).aggregate(
+        inicio=Min('data_hora'), fim=Max('data_hora')
+    )
+    if periodo['inicio'] is None:
+        return
+    resumos.reconstruir(
+        timezone.localtime(periodo['inicio']).date(),
+        timezone.localtime(periodo['fim']).date(),
+        mercados=mercados,
+    )
+
+
+@receiver(post_save, sender=Motorista, dispatch_uid='resumo_motorista_save')
+def resumo_motorista_salvo(sender, instance, created, **kwargs):
+    # Os registros contam para o mercado atual: mudou, os dias dele vão do
+    # mercado antigo para o novo
+    inicial = getattr(instance, '_mercado_inicial', None)
+    if not created and inicial is not None and inicial != instance.mercado_id:
+        transaction.on_commit(partial(_refazer_mercados, instance.pk, [inicial, instance.mercado_id]))
+    instance._mercado_inicial = instance.mercado_id
+
+
+def _invalidar_eficiencia(dias):
+    # Import tardio: ponto.eficiencia carrega o NumPy, que não precisa estar
+    # no boot de todo worker só para descartar chaves de cache
+    from . import eficiencia
+    eficiencia.invalidar_meses(dias)
+
+
+def _chaves_resumo(instance):
+    chaves = {(instance.motorista_id, estatisticas.dia_do_registro(instance))}
+    motorista_id, data_hora = getattr(instance, '_resumo_inicial', (None, None))
+    if motorista_id and data_hora:
+        chaves.add((motorista_id, timezone.localtime(data_hora).date()))
+    return chaves
+
+
+@receiver(post_save, sender=RegistroPonto, dispatch_uid='resumo_registro_save')
+def resumo_registro_salvo(sender, instance, **kwargs):
+    chaves = _chaves_resumo(instance)
+    instance._resumo_inicial = (instance.motorista_id, instance.data_hora)
+    transaction.on_commit(partial(_atualizar_resumos, chaves))
+    transaction.on_commit(partial(_invalidar_eficiencia, {dia for _, dia in chaves}))
+
+
+@receiver(post_delete, sender=RegistroPonto, dispatch_uid='resumo_registro_delete')
+def resumo_registro_removido(sender, instance, **kwargs):
+    chaves = _chaves_resumo(instance)
+    transaction.on_commit(partial(_atualizar_resumos, chaves))
+    transaction.on_commit(partial(_invalidar_eficiencia, {dia for _, dia in chaves}))
+
+
+# =====================
+# ÚLTIMA LEITURA DO VEÍCULO
+# =====================
+
+CAMPOS_LEITURA = {'data_hora', 'km_odometro', 'nivel_combustivel', 'motorista'}
+
+
+@receiver(post_save, sender=RegistroPonto, dispatch_uid='odometro_registro_save')
+def leitura_registro_salvo(sender, instance, update_fields=None, **kwargs):
+    # Fora de on_commit: a atualização acompanha a transação do registro
+    if update_fields is not None and not CAMPOS_LEITURA & set(update_fields):
+        return
+    odometro.registrar(
+        instance.motorista.veiculo_id,
+        instance.data_hora,
+        instance.km_odometro,
+        instance.nivel_combustivel,
+    )
+
+
+@receiver(post_delete, sender=RegistroPonto, dispatch_uid='odometro_registro_delete')
+def leitura_registro_removido(sender, instance, **kwargs):
+    veiculo_id = Motorista.objects.filter(pk=instance.motorista_id).values_list('veiculo_id', flat=True).first()
+    if veiculo_id:
+        odometro.recalcular([veiculo_id])
+
+
+# =====================
+# FOTOS REPETIDAS
+# =====================
+
+@receiver(post_save, sender=RegistroPonto, dispatch_uid='fotos_repetidas_registro_save')
+def indexar_fotos_registro(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(fotos_repetidas.CAMPOS_FOTO) & set(update_fields):
+        return
+    if not any(getattr(instance, campo) for campo in fotos_repetidas.CAMPOS_FOTO):
+        return
+    # Depois do commit: a foto já está no armazenamento e o registro visível.
+    # robust: uma falha ao agendar não vira erro 500 de um registro já gravado
+    transaction.on_commit(partial(fotos_repetidas.agendar, instance), robust=True)
+
+
+# =====================
+# SAÍDA DE EVENTOS (OUTBOX)
+# =====================
+
+@receiver(post_save, sender=RegistroPonto, dispatch_uid='eventos_registro_save')
+def evento_registro_salvo(sender, instance, created, raw=False, **kwargs):
+    # Fora de on_commit: o evento é gravado na transação do registro
+    # (RegistroPonto.save), e some junto se ela for desfeita
+    if not raw:
+        eventos.registrar(instance, 'registro.criado' if created else 'registro.alterado')
+
+
+@receiver(post_delete, sender=RegistroPonto, dispatch_uid='eventos_registro_delete')
+def evento_registro_removido(sender, instance, **kwargs):
+    # delete() do Django já roda numa transação
+    eventos.registrar(instance, 'registro.removido')
@@ -0,0 +1,248 @@
+"""
+Ingestão em lote de leituras de telemetria (odômetro e combustível) enviadas
+por rastreadores, e conferência com o KM digitado pelos motoristas.
+
+Formatos aceitos (uma leitura por item/linha):
+
+- JSON: ``[{"placa": "ABC1D23", "data_hora": "2026-10-01T08:00:00-03:00",
+  "km_odometro": 125000, "nivel_combustivel": 80}, ...]`` (ou o mesmo array
+  em ``{"leituras": [...]}``);
+- CSV com cabeçalho ``placa,data_hora,km_odometro,nivel_combustivel``.
+
+``data_hora`` sem fuso é interpretada no TIME_ZONE do projeto e
+``nivel_combustivel`` é opcional. Leituras repetidas (mesmo veículo e
+instante) são ignoradas, então o envio pode ser repetido com segurança.
+"""
+import bisect
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import odometro
+from .models import LeituraTelemetria, RegistroPonto, Veiculo
+
+CAMPOS = ('placa', 'data_hora', 'km_odometro', 'nivel_combustivel')
+TOLERANCIA_FUTURO = timedelta(minutes=5)
+MAX_ERROS_RESPOSTA = 100
+# Maior valor do PositiveIntegerField: acima disso o banco recusaria o lote inteiro
+KM_MAXIMO = 2_147_483_647
+
+
+class LoteInvalido(ValueError):
+    """O corpo da requisição não pôde ser lido como lote de leituras"""
+
+
+def normalizar_placa(placa):
+    return str(placa or '').upper().replace('-', '').replace(' ', '')
+
+
+def ler_json(conteudo):
+    try:
+        dados = json.loads(conteudo)
+    except (ValueError, UnicodeDecodeError):
+        raise LoteInvalido('JSON inválido')
+    if isinstance(dados, dict):
+        dados = dados.get('leituras')
+    if not isinstance(dados, list) or not all(isinstance(item, dict) for item in dados):
+        raise LoteInvalido('Envie uma lista de leituras')
+    return dados
+
+
+def ler_csv(conteudo):
+    try:
+        texto = conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise LoteInvalido('CSV deve estar em UTF-8')
+    leitor = csv.DictReader(io.StringIO(texto))
+    faltando = set(CAMPOS[:3]) - set(leitor.fieldnames or ())
+    if faltando:
+        raise LoteInvalido(f"Colunas obrigatórias ausentes: {', '.join(sorted(faltando))}")
+    return list(leitor)
+
+
+def ler_lote(conteudo, content_type):
+    """Converte o corpo da requisição em lista de dicionários"""
+    if content_type in ('text/csv', 'application/csv'):
+        itens = ler_csv(conteudo)
+    else:
+        itens = ler_json(conteudo)
+    if len(itens) > settings.TELEMETRIA_MAX_LEITURAS:
+        raise LoteInvalido(f'Envie no máximo {settings.TELEMETRIA_MAX_LEITURAS} leituras por lote')
+    return itens
+
+
+def _inteiro(valor, campo, minimo=0, maximo=None):
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} inválido')
+    if numero < minimo or (maximo is not None and numero > maximo):
+        raise ValueError(f'{campo} fora da faixa permitida')
+    return numero
+
+
+def validar(itens):
+    """
+    Valida os itens e devolve (leituras, erros). ``erros`` traz a posição do
+    item (1 = primeira leitura) e o motivo.
+    """
+    veiculos = {
+        normalizar_placa(placa): veiculo_id
+        for veiculo_id, placa in Veiculo.objects.values_list('id', 'placa')
+    }
+    limite = timezone.now() + TOLERANCIA_FUTURO
+
+    leituras, erros = [], []
+    for posicao, item in enumerate(itens, start=1):
+        try:
+            veiculo_id = veiculos.get(normalizar_placa(item.get('placa')))
+            if veiculo_id is None:
+                raise ValueError('Placa não cadastrada')
+
+            try:
+                data_hora = parse_datetime(str(item.get('data_hora') or ''))
+            except ValueError:
+                data_hora = None
+            if data_hora is None:
+                raise ValueError('data_hora inválida')
+            if timezone.is_naive(data_hora):
+                data_hora = timezone.make_aware(data_hora)
+            if data_hora > limite:
+                raise ValueError('data_hora no futuro')
+
+            nivel = item.get('nivel_combustivel')
+            leituras.append(LeituraTelemetria(
+                veiculo_id=veiculo_id,
+                data_hora=data_hora,
+                km_odometro=_inteiro(item.get('km_odometro'), 'km_odometro', maximo=KM_MAXIMO),
+                nivel_combustivel=(
+                    None if nivel in (None, '') else _inteiro(nivel, 'nivel_combustivel', maximo=100)
+                ),
+            ))
+        except ValueError as erro:
+            erros.append({'item': posicao, 'erro': str(erro)})
+    return leituras, erros
+
+
+def _inserir_copy(leituras):
+    """COPY para uma tabela temporária e INSERT ... ON CONFLICT DO NOTHING"""
+    tabela = LeituraTelemetria._meta.db_table
+    colunas = 'veiculo_id, data_hora, km_odometro, nivel_combustivel'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMPORARY TABLE telemetria_carga ('
+            'veiculo_id bigint, data_hora timestamp with time zone, '
+            'km_odometro integer, nivel_combustivel smallint'
+            ') ON COMMIT DROP'
+        )
+        with cursor.copy(f'COPY telemetria_carga ({colunas}) FROM STDIN') as copia:
+            for leitura in leituras:
+                copia.write_row((
+                    leitura.veiculo_id, leitura.data_hora,
+                    leitura.km_odometro, leitura.nivel_combustivel,
+                ))
+        cursor.execute(
+            f'INSERT INTO "{tabela}" ({colunas}) SELECT {colunas} FROM telemetria_carga '
+            f'ON CONFLICT (veiculo_id, data_hora) DO NOTHING'
+        )
+        return cursor.rowcount
+
+
+def _inserir_bulk(leituras, lote):
+    existentes = LeituraTelemetria.objects.filter(
+        veiculo_id__in={leitura.veiculo_id for leitura in leituras},
+        data_hora__gte=min(leitura.data_hora for leitura in leituras),
+        data_hora__lte=max(leitura.data_hora for leitura in leituras),
+    )
+    with transaction.atomic():
+        antes = existentes.count()
+        LeituraTelemetria.objects.bulk_create(leituras, batch_size=lote, ignore_conflicts=True)
+        return existentes.count() - antes
+
+
+def _suporta_copy():
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def inserir(leituras, lote=1000):
+    """Grava as leituras ignorando repetidas; retorna quantas foram inseridas"""
+    if not leituras:
+        return 0
+    if _suporta_copy():
+        inseridas = _inserir_copy(leituras)
+    else:
+        inseridas = _inserir_bulk(leituras, lote)
+
+    # Última leitura de cada veículo do lote (só substitui se for mais recente)
+    ultimas = {}
+    for leitura in leituras:
+        atual = ultimas.get(leitura.veiculo_id)
+        if atual is None or leitura.data_hora > atual.data_hora:
+            ultimas[leitura.veiculo_id] = leitura
+    for leitura in ultimas.values():
+        odometro.registrar(leitura.veiculo_id, leitura.data_hora, leitura.km_odometro, leitura.nivel_combustivel)
+    return inseridas
+
+
+def conferir_registros(registros, janela=timedelta(minutes=30)):
+    """
+    Compara o KM digitado em cada registro com a leitura de telemetria mais
+    próxima (até ``janela`` de distância) do veículo atual do motorista.
+    Retorna uma lista de (registro, leitura ou None).
+    """
+    registros = list(registros)
+    if not registros:
+        return []
+
+    veiculo_de = {registro.pk: registro.motorista.veiculo_id for registro in registros}
+    leituras = LeituraTelemetria.objects.filter(
+        veiculo_id__in=set(veiculo_de.values()),
+        data_hora__gte=min(registro.data_hora for registro in registros) - janela,
+        data_hora__lte=max(registro.data_hora for registro in registros) + janela,
+    ).order_by('veiculo_id', 'data_hora')
+
+    por_veiculo = defaultdict(list)
+    for leitura in leituras.iterator(chunk_size=5000):
+        por_veiculo[leitura.veiculo_id].append(leitura)
+    instantes = {
+        veiculo_id: [leitura.data_hora for leitura in lista]
+        for veiculo_id, lista in por_veiculo.items()
+    }
+
+    resultado = []
+    for registro in registros:
+        veiculo_id = veiculo_de[registro.pk]
+        lista = por_veiculo.get(veiculo_id, [])
+        posicao = bisect.bisect_left(instantes.get(veiculo_id, []), registro.data_hora)
+        candidatas = lista[max(posicao - 1, 0):posicao + 1]
+        mais_proxima = min(
+            candidatas,
+            key=lambda leitura: abs(leitura.data_hora - registro.data_hora),
+            default=None,
+        )
+        if mais_proxima and abs(mais_proxima.data_hora - registro.data_hora) > janela:
+            mais_proxima = None
+        resultado.append((registro, mais_proxima))
+    return resultado
+
+
+def divergencias(data_inicio=None, data_fim=None, tolerancia_km=20, janela=timedelta(minutes=30)):
+    """Registros do período cujo KM difere da telemetria mais de ``tolerancia_km``"""
+    registros = RegistroPonto.objects.no_periodo(data_inicio, data_fim).select_related(
+        'motorista', 'motorista__veiculo'
+    ).order_by('data_hora')
+    return [
+        (registro, leitura)
+        for registro, leitura in conferir_registros(registros, janela)
+        if leitura and abs(registro.km_odometro - leitura.km_odometro) > tolerancia_km
+    ]
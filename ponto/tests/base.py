@@ -0,0 +1,76 @@
+"""Cadastros mínimos e ambiente de mídia usados pelos testes"""
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import override_settings
+
+from ponto.models import Mercado, Motorista, RegistroPonto, Veiculo
+
+CACHE_LOCAL = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Páginas renderizadas sem rodar ``collectstatic`` (o manifesto não existe nos testes)
+ESTATICOS_SIMPLES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def criar_motorista(nome, mercado=None, placa=None):
+    mercado = mercado or Mercado.objects.create(nome=f'Mercado {nome}')
+    veiculo = Veiculo.objects.create(placa=placa or nome.upper()[:3] + '1234', modelo='Fiorino', cor='Branco')
+    return Motorista.objects.create(
+        user=User.objects.create(username=nome),
+        nome_completo=f'{nome} Silva',
+        cpf=nome,
+        telefone='11999999999',
+        valor_dia=100,
+        veiculo=veiculo,
+        mercado=mercado,
+    )
+
+
+def criar_registro(motorista, tipo='entrada', km=1000, **campos):
+    return RegistroPonto.objects.create(
+        motorista=motorista, tipo=tipo, km_odometro=km, nivel_combustivel=50, **campos
+    )
+
+
+def jpeg(cor, tamanho=(64, 48), desenho=None):
+    """Bytes de um JPEG de uma cor (``desenho(draw)`` acrescenta formas)"""
+    from PIL import Image, ImageDraw
+
+    imagem = Image.new('RGB', tamanho, cor)
+    if desenho:
+        desenho(ImageDraw.Draw(imagem))
+    saida = io.BytesIO()
+    imagem.save(saida, 'JPEG', quality=95)
+    return saida.getvalue()
+
+
+def criar_registro_com_fotos(motorista, tipo='entrada', km=1000, odometro=None, combustivel=None, **campos):
+    registro = RegistroPonto(motorista=motorista, tipo=tipo, km_odometro=km, nivel_combustivel=50, **campos)
+    registro.foto_odometro.save('odometro.jpg', ContentFile(odometro or jpeg((200, 0, 0))), save=False)
+    registro.foto_combustivel.save('combustivel.jpg', ContentFile(combustivel or jpeg((0, 0, 200))), save=False)
+    registro.save()
+    return registro
+
+
+class MidiaTemporaria:
+    """Mixin: fotos (armazenamento local) e pacotes num diretório apagado no fim do teste"""
+
+    def setUp(self):
+        super().setUp()
+        raiz = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, raiz, ignore_errors=True)
+        self.media_root = raiz / 'media'
+        configuracao = override_settings(
+            MEDIA_ROOT=self.media_root,
+            ARQUIVO_ROOT=raiz / 'arquivo',
+            STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'}},
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
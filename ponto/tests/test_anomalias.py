@@ -0,0 +1,157 @@
+import io
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ponto import anomalias
+
+from .base import criar_motorista, criar_registro
+
+HORA = 3600.0
+
+
+def serie(*linhas):
+    """Dados no formato de ``anomalias.carregar``: (veículo, motorista, hora, tipo, km, nível)"""
+    veiculos, motoristas, horas, tipos, km, nivel = zip(*linhas)
+    return {
+        'id': np.arange(1, len(linhas) + 1, dtype=np.int64),
+        'veiculo': np.array(veiculos, dtype=np.int64),
+        'motorista': np.array(motoristas, dtype=np.int64),
+        'instante': np.array(horas, dtype=np.float64) * HORA,
+        'entrada': np.array(tipos, dtype=object) == 'entrada',
+        'km': np.array(km, dtype=np.int64),
+        'nivel': np.array(nivel, dtype=np.int64),
+    }
+
+
+def turnos_da_frota(km, consumo):
+    """Um turno por veículo (8 h às 17 h), sem intervalos entre veículos"""
+    linhas = []
+    for veiculo, (rodado, gasto) in enumerate(zip(km, consumo), start=1):
+        linhas.append((veiculo, veiculo, 8, 'entrada', 1000, 80))
+        linhas.append((veiculo, veiculo, 17, 'saida', 1000 + rodado, 80 - gasto))
+    return serie(*linhas)
+
+
+class RegrasTests(SimpleTestCase):
+    def _registros(self, dados, regra):
+        indices, _ = anomalias.detectar(dados).get(regra, (np.array([], dtype=np.int64), None))
+        return dados['id'][indices].tolist()
+
+    def test_km_regrediu(self):
+        dados = serie((1, 1, 8, 'entrada', 1000, 50), (1, 1, 17, 'saida', 990, 40))
+        indices, valores = anomalias.detectar(dados)['km_regrediu']
+        self.assertEqual(indices.tolist(), [1])
+        self.assertEqual(valores.tolist(), [-10])
+
+    def test_velocidade_impossivel(self):
+        dados = serie((1, 1, 8, 'entrada', 1000, 50), (1, 1, 9, 'saida', 1200, 40))
+        indices, valores = anomalias.detectar(dados)['velocidade_impossivel']
+        self.assertEqual(indices.tolist(), [1])
+        self.assertEqual(valores.tolist(), [200.0])
+
+    def test_mesmo_instante_nao_divide_por_zero(self):
+        dados = serie((1, 1, 8, 'entrada', 1000, 50), (1, 1, 8, 'saida', 1001, 50))
+        # 1 km em "um minuto" = 60 km/h
+        self.assertNotIn('velocidade_impossivel', anomalias.detectar(dados))
+
+    def test_km_fora_do_turno(self):
+        dados = serie(
+            (1, 1, 8, 'entrada', 1000, 50), (1, 1, 17, 'saida', 1100, 40),
+            (1, 1, 32, 'entrada', 1100 + anomalias.KM_FORA_TURNO_MAX, 40),
+            (1, 1, 41, 'saida', 1200, 30),
+            (1, 1, 56, 'entrada', 1300, 30),
+        )
+        self.assertEqual(self._registros(dados, 'km_fora_do_turno'), [5])
+
+    def test_combustivel_subiu_so_no_turno(self):
+        dados = serie(
+            (1, 1, 8, 'entrada', 1000, 30), (1, 1, 17, 'saida', 1100, 30 + anomalias.COMBUSTIVEL_SUBIDA_MAX),
+            # Abastecido entre os turnos: não é anomalia
+            (1, 1, 32, 'entrada', 1100, 90), (1, 1, 41, 'saida', 1200, 100),
+        )
+        self.assertEqual(self._registros(dados, 'combustivel_subiu'), [4])
+
+    def test_veiculos_diferentes_nao_sao_comparados(self):
+        dados = serie((1, 1, 8, 'entrada', 5000, 10), (2, 1, 8, 'saida', 10, 90))
+        self.assertEqual(anomalias.detectar(dados), {})
+
+    def test_troca_de_motorista_nao_e_turno(self):
+        dados = serie((1, 1, 8, 'entrada', 1000, 30), (1, 2, 17, 'saida', 1100, 90))
+        self.assertNotIn('combustivel_subiu', anomalias.detectar(dados))
+
+    def test_km_turno_atipico(self):
+        km = [90 + i % 20 for i in range(anomalias.AMOSTRA_MINIMA)] + [900]
+        dados = turnos_da_frota(km, [10] * len(km))
+        self.assertEqual(self._registros(dados, 'km_turno_atipico'), [2 * len(km)])
+
+    def test_consumo_atipico(self):
+        consumo = [8 + i % 5 for i in range(anomalias.AMOSTRA_MINIMA)] + [70]
+        dados = turnos_da_frota([100] * len(consumo), consumo)
+        indices, valores = anomalias.detectar(dados)['consumo_atipico']
+        self.assertEqual(dados['id'][indices].tolist(), [2 * len(consumo)])
+        self.assertAlmostEqual(valores[0], 0.7)
+
+    def test_amostra_pequena_sem_regras_estatisticas(self):
+        km = [100] * (anomalias.AMOSTRA_MINIMA - 2) + [900]
+        resultado = anomalias.detectar(turnos_da_frota(km, [10] * len(km)))
+        self.assertNotIn('km_turno_atipico', resultado)
+
+    def test_z_robusto(self):
+        self.assertEqual(anomalias.z_robusto([5, 5, 5]).tolist(), [0, 0, 0])
+        # MAD zero (maioria igual): usa o desvio absoluto médio
+        z = anomalias.z_robusto([10, 10, 10, 10, 50])
+        self.assertEqual(z[:4].tolist(), [0, 0, 0, 0])
+        self.assertGreater(z[4], anomalias.Z_LIMITE)
+        self.assertEqual(anomalias.z_robusto([]).size, 0)
+
+
+class RelatorioTests(TestCase):
+    def setUp(self):
+        self.motorista = criar_motorista('ana')
+        self.ontem = timezone.localdate() - timedelta(days=1)
+
+    def _registro(self, dia, hora, tipo, km):
+        return criar_registro(
+            self.motorista, tipo, km, data_hora=timezone.make_aware(datetime.combine(dia, time(hora)))
+        )
+
+    def test_compara_com_o_dia_anterior_ao_periodo(self):
+        anteontem = self.ontem - timedelta(days=1)
+        self._registro(anteontem, 8, 'entrada', 1000)
+        saida = self._registro(anteontem, 17, 'saida', 1100)
+        entrada = self._registro(self.ontem, 8, 'entrada', 1050)
+
+        encontradas = anomalias.relatorio(self.ontem, self.ontem)
+        self.assertEqual([a['regra'] for a in encontradas], ['km_regrediu'])
+        anomalia = encontradas[0]
+        self.assertEqual((anomalia['registro_id'], anomalia['anterior_id']), (entrada.pk, saida.pk))
+        self.assertEqual((anomalia['km_anterior'], anomalia['km'], anomalia['valor']), (1100, 1050, -50))
+        self.assertEqual(anomalia['placa'], self.motorista.veiculo.placa)
+        self.assertEqual(anomalia['motorista'], 'ana Silva')
+        self.assertEqual(anomalia['data_hora'], entrada.data_hora)
+
+        # A regressão de ontem fica fora de um período que termina anteontem
+        self.assertEqual(anomalias.relatorio(anteontem, anteontem), [])
+
+    def test_filtro_por_regra_e_ordem(self):
+        self._registro(self.ontem, 8, 'entrada', 1000)
+        self._registro(self.ontem, 9, 'saida', 1500)
+        self._registro(self.ontem, 10, 'entrada', 1400)
+
+        regras = [a['regra'] for a in anomalias.relatorio(self.ontem, self.ontem)]
+        self.assertEqual(regras, ['km_regrediu', 'velocidade_impossivel'])
+        self.assertEqual(
+            [a['regra'] for a in anomalias.relatorio(self.ontem, self.ontem, 'km_regrediu')], ['km_regrediu']
+        )
+
+    def test_comando(self):
+        self._registro(self.ontem, 8, 'entrada', 1000)
+        self._registro(self.ontem, 17, 'saida', 900)
+        saida = io.StringIO()
+        call_command('detectar_anomalias', data_inicio=self.ontem, data_fim=self.ontem, stdout=saida)
+        self.assertIn('Odômetro menor que no registro anterior: km 1000 -> 900', saida.getvalue())
+        self.assertIn('1 anomalia(s)', saida.getvalue())
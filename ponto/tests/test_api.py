@@ -0,0 +1,63 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .base import criar_motorista, criar_registro
+
+
+class ApiAdministracaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        cls.ana = criar_motorista('ana')
+        cls.beto = criar_motorista('beto', mercado=cls.ana.mercado)
+        hoje = timezone.localdate()
+        cls.entrada = criar_registro(cls.ana, km=1000, data_hora=timezone.make_aware(datetime.combine(hoje, time(0, 1))))
+        cls.saida = criar_registro(
+            cls.ana, 'saida', km=1150, data_hora=cls.entrada.data_hora + timedelta(hours=8, minutes=30),
+        )
+
+    def _urls(self):
+        return [
+            reverse('detalhe_registro', args=[self.saida.pk]),
+            reverse('api_status_motoristas_hoje'),
+            reverse('api_tendencias_mercados'),
+            reverse('api_registro_fotos', args=[self.saida.pk]),
+        ]
+
+    async def test_so_administradores(self):
+        for url in self._urls():
+            with self.subTest(url=url):
+                resposta = await self.async_client.get(url)
+                self.assertEqual(resposta.status_code, 302)
+
+        await self.async_client.aforce_login(self.ana.user)
+        for url in self._urls():
+            with self.subTest(url=url):
+                resposta = await self.async_client.get(url)
+                self.assertEqual(resposta.status_code, 403)
+                self.assertEqual(resposta.json(), {'error': 'Acesso negado'})
+
+    async def test_detalhe_registro_calcula_o_turno(self):
+        await self.async_client.aforce_login(self.admin)
+        resposta = await self.async_client.get(reverse('detalhe_registro', args=[self.saida.pk]))
+        registro = resposta.json()['registro']
+        self.assertEqual((registro['km_rodados'], registro['horas_trabalhadas']), (150, 8.5))
+
+        resposta = await self.async_client.get(reverse('detalhe_registro', args=[self.saida.pk + 100]))
+        self.assertEqual(resposta.status_code, 404)
+
+    async def test_status_dos_motoristas_hoje(self):
+        await self.async_client.aforce_login(self.admin)
+        resposta = await self.async_client.get(reverse('api_status_motoristas_hoje'))
+        status = {motorista['nome']: motorista['status'] for motorista in resposta.json()['motoristas']}
+        self.assertEqual(status, {'ana Silva': 'finalizado', 'beto Silva': 'nao_iniciou'})
+
+    def test_tendencias_valida_dias(self):
+        self.client.force_login(self.admin)
+        url = reverse('api_tendencias_mercados')
+        self.assertEqual(self.client.get(url, {'dias': 'x'}).status_code, 400)
+        self.assertEqual(len(self.client.get(url, {'dias': 5000}).json()['datas']), 366)
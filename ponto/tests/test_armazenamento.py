@@ -0,0 +1,128 @@
+import importlib.util
+import os
+import unittest
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ponto.armazenamento import MB, ArmazenamentoS3
+
+from .base import criar_motorista, criar_registro_com_fotos, jpeg
+
+BUCKET = 'fotos-ponto'
+OPCOES = {
+    'bucket': BUCKET, 'regiao': 'us-east-1', 'chave_acesso': 'teste', 'chave_secreta': 'teste',
+    'prefixo': 'media', 'endpoint_publico': 'https://fotos.exemplo.com.br', 'expiracao_url': 600,
+}
+
+
+class BucketFalso:
+    """Bucket S3 em memória (moto) criado no início de cada teste"""
+
+    def setUp(self):
+        super().setUp()
+        from moto import mock_aws
+
+        simulacao = mock_aws()
+        simulacao.start()
+        self.addCleanup(simulacao.stop)
+        self.armazenamento = ArmazenamentoS3(**OPCOES)
+        self.armazenamento.cliente.create_bucket(Bucket=BUCKET)
+
+    def objeto(self, chave):
+        return self.armazenamento.cliente.get_object(Bucket=BUCKET, Key=chave)
+
+
+@unittest.skipUnless(importlib.util.find_spec('moto'), 'moto não instalado')
+class ArmazenamentoS3Tests(BucketFalso, SimpleTestCase):
+    def test_gravar_ler_e_apagar(self):
+        nome = self.armazenamento.save('registros/2026/10/odometro.jpg', ContentFile(b'foto'))
+        self.assertEqual(nome, 'registros/2026/10/odometro.jpg')
+        objeto = self.objeto('media/registros/2026/10/odometro.jpg')
+        self.assertEqual(objeto['ContentType'], 'image/jpeg')
+
+        self.assertTrue(self.armazenamento.exists(nome))
+        self.assertEqual(self.armazenamento.size(nome), 4)
+        self.assertEqual(self.armazenamento.get_modified_time(nome).utcoffset(), timedelta(0))
+        with self.armazenamento.open(nome) as arquivo:
+            self.assertEqual(arquivo.read(), b'foto')
+        self.assertEqual(self.armazenamento.abrir_fluxo(nome).read(), b'foto')
+
+        self.armazenamento.delete(nome)
+        self.assertFalse(self.armazenamento.exists(nome))
+
+    def test_nome_em_uso_ganha_sufixo(self):
+        primeiro = self.armazenamento.save('fotos/a.jpg', ContentFile(b'1'))
+        segundo = self.armazenamento.save('fotos/a.jpg', ContentFile(b'2'))
+        self.assertNotEqual(primeiro, segundo)
+        self.assertCountEqual(
+            self.armazenamento.listdir('fotos')[1], [os.path.basename(primeiro), os.path.basename(segundo)]
+        )
+
+    def test_arquivo_grande_vai_em_partes(self):
+        conteudo = os.urandom(6 * MB)
+        armazenamento = ArmazenamentoS3(**dict(OPCOES, parte_mb=5, envios_paralelos=2))
+        armazenamento.save('grande.bin', ContentFile(conteudo))
+        objeto = self.objeto('media/grande.bin')
+        # ETag de multipart: "<md5>-<partes>"
+        self.assertTrue(objeto['ETag'].strip('"').endswith('-2'))
+        with armazenamento.open('grande.bin') as arquivo:
+            self.assertEqual(arquivo.read(), conteudo)
+
+    def test_ausente(self):
+        self.assertFalse(self.armazenamento.exists('nao/existe.jpg'))
+        for operacao in (self.armazenamento.open, self.armazenamento.size, self.armazenamento.abrir_fluxo):
+            with self.subTest(operacao=operacao.__name__), self.assertRaises(FileNotFoundError):
+                operacao('nao/existe.jpg')
+
+    def test_listdir(self):
+        for nome in ('registros/2026/a.jpg', 'registros/2026/b.jpg', 'registros/c.jpg'):
+            self.armazenamento.save(nome, ContentFile(b'x'))
+        self.assertEqual(self.armazenamento.listdir('registros'), (['2026'], ['c.jpg']))
+        self.assertEqual(self.armazenamento.listdir('registros/2026/'), ([], ['a.jpg', 'b.jpg']))
+
+    def test_url_assinada_no_endereco_publico(self):
+        url = urlsplit(self.armazenamento.url('registros/a.jpg'))
+        self.assertEqual((url.scheme, url.netloc), ('https', 'fotos.exemplo.com.br'))
+        self.assertEqual(url.path, f'/{BUCKET}/media/registros/a.jpg')
+        parametros = parse_qs(url.query)
+        self.assertEqual(parametros['X-Amz-Expires'], ['600'])
+        self.assertIn('X-Amz-Signature', parametros)
+
+    def test_somente_leitura_e_bucket_obrigatorio(self):
+        with self.assertRaises(ValueError):
+            self.armazenamento.open('a.jpg', 'wb')
+        with self.assertRaises(ImproperlyConfigured):
+            ArmazenamentoS3()
+
+
+@unittest.skipUnless(importlib.util.find_spec('moto'), 'moto não instalado')
+class FotoNoBucketTests(BucketFalso, TestCase):
+    def setUp(self):
+        configuracao = override_settings(STORAGES={
+            **settings.STORAGES,
+            'default': {'BACKEND': 'ponto.armazenamento.ArmazenamentoS3', 'OPTIONS': OPCOES},
+        })
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        super().setUp()
+
+    def test_foto_redireciona_para_o_bucket(self):
+        motorista = criar_motorista('ana')
+        foto = jpeg((10, 120, 200))
+        registro = criar_registro_com_fotos(motorista, odometro=foto)
+        self.assertEqual(self.objeto(f'media/{registro.foto_odometro.name}')['Body'].read(), foto)
+
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        resposta = self.client.get(reverse('foto_registro', args=[registro.pk, 'foto_odometro']))
+        self.assertEqual(resposta.status_code, 302)
+        destino = urlsplit(resposta['Location'])
+        self.assertEqual(destino.netloc, 'fotos.exemplo.com.br')
+        self.assertEqual(destino.path, f'/{BUCKET}/media/{registro.foto_odometro.name}')
+        self.assertEqual(resposta['Cache-Control'], 'private, max-age=540')
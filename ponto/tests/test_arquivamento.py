@@ -0,0 +1,91 @@
+import io
+import zipfile
+from datetime import date, datetime, time
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ponto import arquivamento
+from ponto.models import RegistroPonto
+
+from .base import MidiaTemporaria, criar_motorista, criar_registro_com_fotos, jpeg
+
+
+class ArquivamentoTests(MidiaTemporaria, TestCase):
+    CHAVE = '2025-01'
+
+    def setUp(self):
+        super().setUp()
+        self.motorista = criar_motorista('ana')
+        self.fotos = {'foto_odometro': jpeg((10, 20, 30)), 'foto_combustivel': jpeg((30, 20, 10))}
+        self.registro = criar_registro_com_fotos(
+            self.motorista,
+            odometro=self.fotos['foto_odometro'],
+            combustivel=self.fotos['foto_combustivel'],
+            data_hora=timezone.make_aware(datetime(2025, 1, 10, 8)),
+        )
+
+    def _arquivar(self, *registros):
+        with self.captureOnCommitCallbacks(execute=True):
+            return arquivamento.arquivar(self.CHAVE, registros)
+
+    def test_arquivar_ler_e_restaurar(self):
+        nomes = {campo: getattr(self.registro, campo).name for campo in arquivamento.CAMPOS_FOTO}
+        self.assertEqual(self._arquivar(self.registro), 1)
+
+        registro = RegistroPonto.objects.get(pk=self.registro.pk)
+        self.assertEqual(registro.arquivo, self.CHAVE)
+        for campo, nome in nomes.items():
+            self.assertFalse(default_storage.exists(nome))
+            with arquivamento.ler_foto(registro, campo) as foto:
+                self.assertEqual(foto.read(), self.fotos[campo])
+
+        with zipfile.ZipFile(arquivamento.caminho_pacote(self.CHAVE)) as pacote:
+            self.assertIn(f'dados/{registro.pk}.json', pacote.namelist())
+            self.assertIsNone(pacote.testzip())
+
+        arquivamento.restaurar(registro)
+        registro.refresh_from_db()
+        self.assertEqual(registro.arquivo, '')
+        for campo in arquivamento.CAMPOS_FOTO:
+            with getattr(registro, campo).open('rb') as foto:
+                self.assertEqual(foto.read(), self.fotos[campo])
+
+    def test_indice_regravado_e_relido(self):
+        self._arquivar(self.registro)
+        primeiro = RegistroPonto.objects.get(pk=self.registro.pk)
+        arquivamento.ler_foto(primeiro, 'foto_odometro').close()
+
+        outro = criar_registro_com_fotos(
+            self.motorista, 'saida', odometro=jpeg((1, 2, 3)),
+            data_hora=timezone.make_aware(datetime(2025, 1, 10, 17)),
+        )
+        self._arquivar(outro)
+        outro.refresh_from_db()
+        with arquivamento.ler_foto(outro, 'foto_odometro') as foto:
+            self.assertEqual(foto.read(), jpeg((1, 2, 3)))
+        # A foto do outro pode ter o mesmo nome (a primeira já saiu do MEDIA_ROOT)
+        with arquivamento.ler_foto(primeiro, 'foto_odometro') as foto:
+            self.assertEqual(foto.read(), self.fotos['foto_odometro'])
+
+    def test_ja_arquivado_nao_entra_de_novo(self):
+        self._arquivar(self.registro)
+        self.assertEqual(self._arquivar(RegistroPonto.objects.get(pk=self.registro.pk)), 0)
+
+    def test_foto_ausente(self):
+        self._arquivar(self.registro)
+        registro = RegistroPonto.objects.get(pk=self.registro.pk)
+        registro.pk += 1000
+        with self.assertRaises(FileNotFoundError):
+            arquivamento.ler_foto(registro, 'foto_odometro')
+
+    def test_comando_arquiva_meses_inteiros_antes_do_corte(self):
+        recente = criar_registro_com_fotos(
+            self.motorista, 'saida', data_hora=timezone.make_aware(datetime.combine(date(2025, 2, 3), time(9))),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('arquivar_registros', antes_de=date(2025, 2, 20), stdout=io.StringIO())
+        self.assertEqual(RegistroPonto.objects.get(pk=self.registro.pk).arquivo, self.CHAVE)
+        self.assertEqual(RegistroPonto.objects.get(pk=recente.pk).arquivo, '')
@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ponto import arquivamento
+
+from .base import MidiaTemporaria, criar_motorista, criar_registro_com_fotos, jpeg
+
+
+class FotoRegistroTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.motorista = criar_motorista('ana')
+        self.foto = jpeg((120, 30, 60))
+        self.registro = criar_registro_com_fotos(self.motorista, odometro=self.foto)
+        self.url = reverse('foto_registro', args=[self.registro.pk, 'foto_odometro'])
+
+    def test_permissoes(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+        self.client.force_login(criar_motorista('beto').user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_login(self.motorista.user)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_campo_ou_registro_inexistente(self):
+        self.client.force_login(self.motorista.user)
+        for args in ((self.registro.pk, 'motorista'), (self.registro.pk + 100, 'foto_odometro')):
+            with self.subTest(args=args):
+                self.assertEqual(self.client.get(reverse('foto_registro', args=args)).status_code, 404)
+
+    def test_django_entrega_com_cache(self):
+        self.client.force_login(self.motorista.user)
+        resposta = self.client.get(self.url)
+        self.assertEqual(b''.join(resposta.streaming_content), self.foto)
+        self.assertEqual(resposta['Cache-Control'], 'private, max-age=31536000, immutable')
+
+        repetida = self.client.get(self.url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(repetida.status_code, 304)
+        self.assertEqual(repetida['ETag'], resposta['ETag'])
+
+    @override_settings(MEDIA_SERVIDOR_ARQUIVOS='nginx', MEDIA_ACCEL_PREFIXO='/protegido/')
+    def test_nginx_x_accel_redirect(self):
+        self.client.force_login(self.motorista.user)
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta['X-Accel-Redirect'], '/protegido/' + self.registro.foto_odometro.name)
+        self.assertEqual(resposta.content, b'')
+        self.assertIn('ETag', resposta)
+
+    @override_settings(MEDIA_SERVIDOR_ARQUIVOS='apache')
+    def test_apache_x_sendfile(self):
+        self.client.force_login(self.motorista.user)
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta['X-Sendfile'], self.registro.foto_odometro.path)
+        self.assertEqual(resposta.content, b'')
+
+    def test_foto_arquivada_sai_do_pacote(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            arquivamento.arquivar(arquivamento.chave_mes(self.registro.data_hora), [self.registro])
+        self.client.force_login(self.motorista.user)
+        resposta = self.client.get(self.url)
+        self.assertEqual(b''.join(resposta.streaming_content), self.foto)
+        self.assertEqual(resposta['Content-Type'], 'image/jpeg')
@@ -0,0 +1,91 @@
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ponto import busca
+from ponto.models import Motorista, RegistroPonto
+
+from .base import ESTATICOS_SIMPLES, criar_motorista, criar_registro
+
+
+class TermosTests(SimpleTestCase):
+    def test_normalizar_tira_acentos(self):
+        self.assertEqual(busca.normalizar('  JOSÉ Conceição '), 'jose conceicao')
+
+    def test_termo_separado_em_nome_e_cpf(self):
+        self.assertEqual(busca._nome('joão 123.456-7'), 'joão')
+        self.assertEqual(busca._digitos('joão 123.456-7'), '1234567')
+        self.assertEqual(busca._placa('abc-1234'), 'ABC1234')
+
+
+@override_settings(STORAGES=ESTATICOS_SIMPLES)
+class BuscaTests(TestCase):
+    """Em bancos sem as extensões do PostgreSQL a busca cai para ``icontains``"""
+
+    def setUp(self):
+        self.joao = criar_motorista('joao', placa='ABC-1234')
+        self.maria = criar_motorista('maria', placa='XYZ-9876')
+        Motorista.objects.filter(pk=self.joao.pk).update(cpf='123.456.789-00')
+        self.anotado = criar_registro(self.maria, observacoes='Pneu furado na avenida')
+        criar_registro(self.joao, observacoes='Sem ocorrências')
+
+    def test_motoristas_por_nome_ou_trecho_do_cpf(self):
+        self.assertEqual(list(busca.motoristas('joao')), [self.joao])
+        self.assertEqual(list(busca.motoristas('456.789')), [self.joao])
+        self.assertEqual(list(busca.motoristas('silva')), [self.joao, self.maria])
+        self.assertEqual(list(busca.motoristas('pedro')), [])
+
+    def test_veiculos_pela_placa_com_ou_sem_hifen_e_modelo(self):
+        self.assertEqual(list(busca.veiculos('abc-12')), [self.joao.veiculo])
+        self.assertEqual(list(busca.veiculos('fiorino')), [self.joao.veiculo, self.maria.veiculo])
+
+    def test_registros_pelas_observacoes(self):
+        self.assertEqual(list(busca.registros('furado')), [self.anotado])
+
+    def test_filtrar_registros_por_motorista_ou_observacao(self):
+        queryset = RegistroPonto.objects.all()
+        self.assertEqual(list(busca.filtrar_registros(queryset, 'pneu')), [self.anotado])
+        self.assertEqual(
+            list(busca.filtrar_registros(queryset, 'maria')), [self.anotado]
+        )
+        self.assertEqual(busca.filtrar_registros(queryset, 'silva').count(), 2)
+
+    def test_termo_curto_nao_busca(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(busca.buscar(' j '), {'motoristas': [], 'veiculos': [], 'registros': []})
+
+    def test_pagina_de_busca(self):
+        url = reverse('busca')
+        self.client.force_login(self.joao.user)
+        self.assertRedirects(self.client.get(url, {'q': 'joao'}), reverse('motorista_dashboard'))
+
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        resposta = self.client.get(url, {'q': 'furado'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['resultados']['registros'], [self.anotado])
+        self.assertEqual(resposta.context['total'], 1)
+
+    def test_busca_do_admin(self):
+        self.client.force_login(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+        resposta = self.client.get(reverse('admin:ponto_motorista_changelist'), {'q': 'maria'})
+        self.assertEqual(list(resposta.context['cl'].result_list), [self.maria])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'índices de busca só existem no PostgreSQL')
+class BuscaPostgresTests(TestCase):
+    def setUp(self):
+        self.jose = criar_motorista('jose')
+        Motorista.objects.filter(pk=self.jose.pk).update(nome_completo='José da Conceição', cpf='123.456.789-00')
+        self.anotado = criar_registro(self.jose, observacoes='Os pneus estavam furados')
+
+    def test_nome_sem_acento_e_com_erro_de_digitacao(self):
+        self.assertEqual(list(busca.motoristas('jose conceicao')), [self.jose])
+        self.assertEqual(list(busca.motoristas('concecao')), [self.jose])
+        self.assertEqual(list(busca.motoristas('12345678900')), [self.jose])
+
+    def test_observacoes_pelo_radical(self):
+        self.assertEqual(list(busca.registros('pneu furado')), [self.anotado])
+        self.assertEqual(list(busca.registros('pneu -furado')), [])
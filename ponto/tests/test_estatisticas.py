@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ponto import estatisticas
+from ponto.models import Motorista, RegistroPonto, Veiculo
+
+from .base import CACHE_LOCAL, criar_motorista, criar_registro
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class EstatisticasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.motorista = criar_motorista('ana')
+
+    def _conferir(self):
+        hoje = RegistroPonto.objects.do_dia(timezone.localdate())
+        valores = estatisticas.obter_estatisticas()
+        self.assertEqual(valores['entradas_hoje'], hoje.filter(tipo='entrada').count())
+        self.assertEqual(valores['saidas_hoje'], hoje.filter(tipo='saida').count())
+        self.assertEqual(valores['total_motoristas'], Motorista.objects.filter(ativo=True).count())
+        self.assertEqual(valores['total_veiculos'], Veiculo.objects.filter(ativo=True).count())
+
+    def test_contadores_acompanham_registros(self):
+        self._conferir()
+        with self.captureOnCommitCallbacks(execute=True):
+            entrada = criar_registro(self.motorista)
+            criar_registro(self.motorista, 'saida', km=1050)
+        self._conferir()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entrada.delete()
+        self._conferir()
+
+    def test_registro_movido_de_dia(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registro = criar_registro(self.motorista)
+        self._conferir()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            registro.data_hora -= timedelta(days=1)
+            registro.save()
+        self._conferir()
+
+    def test_contadores_acompanham_cadastros(self):
+        self._conferir()
+        with self.captureOnCommitCallbacks(execute=True):
+            outro = criar_motorista('beto', mercado=self.motorista.mercado)
+        self._conferir()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outro.ativo = False
+            outro.save()
+            self.motorista.veiculo.ativo = False
+            self.motorista.veiculo.save()
+        self._conferir()
+
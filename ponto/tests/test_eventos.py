@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ponto import eventos
+from ponto.models import EventoSaida
+
+from .base import criar_motorista, criar_registro
+
+
+class DestinoFalso:
+    def __init__(self):
+        self.lotes = []
+        self.erro = None
+
+    def enviar(self, lote):
+        if self.erro:
+            raise self.erro
+        self.lotes.append(lote)
+
+    def entregues(self):
+        return [evento['id'] for lote in self.lotes for evento in lote]
+
+
+# Sem espera de commit: cada teste grava e despacha na mesma transação
+@override_settings(EVENTOS_DESTINOS=[{'tipo': 'arquivo', 'caminho': '/dev/null'}], EVENTOS_ESPERA_COMMIT=0)
+class EventosTests(TestCase):
+    def setUp(self):
+        self.ana = criar_motorista('ana')
+        self.beto = criar_motorista('beto')
+        self.destino = DestinoFalso()
+
+    def test_save_e_delete_gravam_eventos(self):
+        registro = criar_registro(self.ana)
+        registro.observacoes = 'pneu furado'
+        registro.save()
+        registro_id = registro.pk
+        registro.delete()
+
+        gravados = list(EventoSaida.objects.order_by('pk'))
+        self.assertEqual(
+            [evento.tipo for evento in gravados],
+            ['registro.criado', 'registro.alterado', 'registro.removido'],
+        )
+        self.assertTrue(all(evento.registro_id == registro_id for evento in gravados))
+        self.assertEqual(gravados[1].dados['observacoes'], 'pneu furado')
+
+    @override_settings(EVENTOS_DESTINOS=[])
+    def test_sem_destinos_nao_grava(self):
+        criar_registro(self.ana)
+        self.assertFalse(EventoSaida.objects.exists())
+
+    def test_despacha_em_ordem_e_marca_enviados(self):
+        ids = [criar_registro(motorista).pk for motorista in (self.ana, self.beto, self.ana)]
+        self.assertEqual(eventos.despachar([self.destino], tamanho=2), 2)
+        self.assertEqual(eventos.despachar([self.destino], tamanho=2), 1)
+        self.assertEqual(eventos.despachar([self.destino], tamanho=2), 0)
+
+        enviados = EventoSaida.objects.order_by('pk')
+        self.assertEqual(self.destino.entregues(), [evento.pk for evento in enviados])
+        self.assertEqual([evento.registro_id for evento in enviados], ids)
+        self.assertFalse(enviados.filter(enviado_em__isnull=True).exists())
+
+    def test_falha_agenda_nova_tentativa(self):
+        criar_registro(self.ana)
+        self.destino.erro = ConnectionError('recusado')
+
+        antes = timezone.now()
+        with self.assertLogs('ponto.eventos', 'WARNING'):
+            self.assertEqual(eventos.despachar([self.destino]), 0)
+        evento = EventoSaida.objects.get()
+        self.assertIsNone(evento.enviado_em)
+        self.assertEqual(evento.tentativas, 1)
+        self.assertGreaterEqual(evento.proxima_tentativa, antes + eventos.ESPERA_INICIAL)
+        self.assertIn('recusado', evento.ultimo_erro)
+
+        # Segunda falha: a espera dobra
+        EventoSaida.objects.update(proxima_tentativa=None)
+        antes = timezone.now()
+        with self.assertLogs('ponto.eventos', 'WARNING'):
+            eventos.despachar([self.destino])
+        evento.refresh_from_db()
+        self.assertEqual(evento.tentativas, 2)
+        self.assertGreaterEqual(evento.proxima_tentativa, antes + 2 * eventos.ESPERA_INICIAL)
+
+    def test_motorista_em_espera_nao_passa_a_frente(self):
+        primeiro = criar_registro(self.ana)
+        self.destino.erro = ConnectionError('fora do ar')
+        with self.assertLogs('ponto.eventos', 'WARNING'):
+            eventos.despachar([self.destino])
+        self.destino.erro = None
+
+        segundo = criar_registro(self.ana)
+        outro = criar_registro(self.beto)
+        self.assertEqual(eventos.despachar([self.destino]), 1)
+        self.assertEqual(
+            [evento['registro_id'] for evento in self.destino.lotes[0]], [outro.pk]
+        )
+
+        # Passada a espera, os dois da motorista saem na ordem em que foram gravados
+        EventoSaida.objects.update(proxima_tentativa=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(eventos.despachar([self.destino]), 2)
+        self.assertEqual(
+            [evento['registro_id'] for evento in self.destino.lotes[1]], [primeiro.pk, segundo.pk]
+        )
+
+    def test_limpar_remove_so_os_entregues_antigos(self):
+        criar_registro(self.ana)
+        criar_registro(self.beto)
+        eventos.despachar([self.destino], tamanho=1)
+        EventoSaida.objects.filter(enviado_em__isnull=False).update(
+            enviado_em=timezone.now() - timedelta(days=8)
+        )
+        self.assertEqual(eventos.limpar(7), 1)
+        self.assertTrue(EventoSaida.objects.filter(enviado_em__isnull=True).exists())
+
+    @override_settings(EVENTOS_DESTINOS=[{'tipo': 'kafka'}])
+    def test_destino_desconhecido(self):
+        with self.assertRaises(ImproperlyConfigured):
+            eventos.destinos()
+
+
+    @override_settings(EVENTOS_ESPERA_COMMIT=5)
+    def test_recentes_esperam_as_transacoes_abertas(self):
+        # Simula a transação com pk menor que fecha depois: seu evento ainda
+        # não é visível quando o seguinte já poderia sair
+        antigo = criar_registro(self.ana)
+        recente = criar_registro(self.ana, 'saida', km=1100)
+        self.assertEqual(eventos.despachar([self.destino]), 0)
+        EventoSaida.objects.filter(registro_id=antigo.pk).update(criado_em=timezone.now() - timedelta(seconds=6))
+        self.assertEqual(eventos.despachar([self.destino]), 1)
+
+        EventoSaida.objects.filter(registro_id=recente.pk).update(criado_em=timezone.now() - timedelta(seconds=6))
+        self.assertEqual(eventos.despachar([self.destino]), 1)
+        self.assertEqual(
+            [lote[0]['registro_id'] for lote in self.destino.lotes], [antigo.pk, recente.pk]
+        )
@@ -0,0 +1,137 @@
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ponto import planilhas
+
+from .base import criar_motorista, criar_registro
+
+
+def ler_planilha(conteudo):
+    """Linhas (tuplas de valores) da primeira aba do .xlsx"""
+    import openpyxl
+
+    planilha = openpyxl.load_workbook(io.BytesIO(conteudo), read_only=True).active
+    return planilha.title, [tuple(linha) for linha in planilha.iter_rows(values_only=True)]
+
+
+def pool_quebrado():
+    """Pool cujo processo morreu: qualquer tarefa nova falha com BrokenProcessPool"""
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('forkserver'))
+    try:
+        executor.submit(os._exit, 1).result()
+    except BrokenProcessPool:
+        return executor
+    raise AssertionError('o pool deveria estar quebrado')
+
+
+@override_settings(EXPORTACAO_PROCESSOS=1)
+class ExportacaoTests(TestCase):
+    DIA = date(2026, 10, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        cls.ana = criar_motorista('ana')
+        cls.beto = criar_motorista('beto', mercado=cls.ana.mercado)
+        cls.caio = criar_motorista('caio')
+        for motorista, km in ((cls.ana, 120), (cls.beto, 80), (cls.caio, 40)):
+            criar_registro(motorista, km=1000, data_hora=timezone.make_aware(datetime.combine(cls.DIA, time(8))))
+            criar_registro(
+                motorista, 'saida', km=1000 + km, data_hora=timezone.make_aware(datetime.combine(cls.DIA, time(17)))
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _pacote(self, agrupar):
+        resposta = self.client.get(reverse('exportar_relatorio_pacote'), {
+            'agrupar': agrupar, 'data_inicio': self.DIA.isoformat(), 'data_fim': self.DIA.isoformat(),
+        })
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'application/zip')
+        pacote = zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content)))
+        return {nome: ler_planilha(pacote.read(nome)) for nome in pacote.namelist()}
+
+    def test_planilha_unica(self):
+        resposta = self.client.get(reverse('exportar_relatorio_excel'), {'motorista': self.ana.pk})
+        self.assertEqual(resposta['Content-Type'], planilhas.CONTENT_TYPE_XLSX)
+        titulo, linhas = ler_planilha(resposta.content)
+        self.assertEqual(titulo, 'Relatório de Ponto')
+        self.assertEqual(linhas[0], tuple(planilhas.CABECALHOS))
+        self.assertEqual(linhas[1:], [(
+            'ana Silva', 'ana', str(self.ana.veiculo), 'Mercado ana', datetime(2026, 10, 15),
+            '08:00', '17:00', 9, 120, 100,
+        )])
+
+    def test_pacote_por_mercado(self):
+        planilhas_do_pacote = self._pacote('mercado')
+        self.assertEqual(sorted(planilhas_do_pacote), ['Mercado_ana.xlsx', 'Mercado_caio.xlsx'])
+        titulo, linhas = planilhas_do_pacote['Mercado_ana.xlsx']
+        self.assertEqual(titulo, 'Mercado ana')
+        self.assertEqual(linhas[0], tuple(planilhas.CABECALHOS))
+        self.assertEqual([(linha[0], linha[8]) for linha in linhas[1:]], [('ana Silva', 120), ('beto Silva', 80)])
+        self.assertEqual([linha[0] for linha in planilhas_do_pacote['Mercado_caio.xlsx'][1][1:]], ['caio Silva'])
+
+    def test_pacote_por_motorista(self):
+        planilhas_do_pacote = self._pacote('motorista')
+        self.assertEqual(
+            sorted(planilhas_do_pacote), ['ana_Silva_ana.xlsx', 'beto_Silva_beto.xlsx', 'caio_Silva_caio.xlsx']
+        )
+        self.assertEqual(len(planilhas_do_pacote['beto_Silva_beto.xlsx'][1]), 2)
+
+    def test_agrupamento_invalido_e_permissao(self):
+        url = reverse('exportar_relatorio_pacote')
+        self.assertEqual(self.client.get(url, {'agrupar': 'veiculo'}).status_code, 400)
+        self.client.force_login(self.ana.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(reverse('exportar_relatorio_excel')).status_code, 403)
+
+
+class PoolTests(SimpleTestCase):
+    GRUPOS = {'Norte': [('ana',)], 'Sul': [('beto',)]}
+
+    def setUp(self):
+        self.addCleanup(setattr, planilhas, '_pool', planilhas._pool)
+
+    def _zip(self):
+        return zipfile.ZipFile(io.BytesIO(b''.join(planilhas.gerar_zip(self.GRUPOS, 1))))
+
+    def test_nomes_unicos_no_zip(self):
+        usados = set()
+        self.assertEqual(
+            [planilhas.nome_arquivo(nome, usados) for nome in ('São Paulo / Centro', 'São Paulo - Centro', '??')],
+            ['São_Paulo_Centro.xlsx', 'São_Paulo_-_Centro.xlsx', 'sem_nome.xlsx'],
+        )
+        self.assertEqual(planilhas.nome_arquivo('sem nome', {'sem_nome.xlsx'} | usados), 'sem_nome_2.xlsx')
+
+    def test_pool_quebrado_e_recriado(self):
+        quebrado = pool_quebrado()
+        planilhas._pool = quebrado
+        with self.assertLogs('ponto.planilhas', 'WARNING'):
+            pacote = self._zip()
+        self.assertEqual(sorted(pacote.namelist()), ['Norte.xlsx', 'Sul.xlsx'])
+        self.assertIsNot(planilhas.pool(), quebrado)
+
+    def test_quebrado_de_novo_propaga(self):
+        quebrados = [pool_quebrado(), pool_quebrado()]
+        planilhas._pool = quebrados[0]
+        original = planilhas.pool
+
+        def proximo(processos=None):
+            return quebrados.pop(0) if quebrados else original(processos)
+
+        planilhas.pool = proximo
+        self.addCleanup(setattr, planilhas, 'pool', original)
+        with self.assertLogs('ponto.planilhas', 'WARNING') as logs, self.assertRaises(BrokenProcessPool):
+            self._zip()
+        self.assertEqual(len(logs.records), 2)
@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import time
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+
+from ponto import fotos_orfas
+
+from .base import MidiaTemporaria, criar_motorista, criar_registro_com_fotos
+
+DIA = 'registros/2026/10/01'
+IDADE = timedelta(hours=24)
+
+
+class FotosOrfas(MidiaTemporaria):
+    """Fotos do registro (dia de hoje), duas órfãs antigas em outros dias e uma órfã recente"""
+
+    def setUp(self):
+        super().setUp()
+        self.registro = criar_registro_com_fotos(criar_motorista('ana'))
+        self.usadas = {self.registro.foto_odometro.name, self.registro.foto_combustivel.name}
+        self.antiga = self._foto(f'{DIA}/antiga.jpg', horas=48)
+        self.recente = self._foto(f'{DIA}/recente.jpg', horas=1)
+        self.outro_dia = self._foto('registros/2026/09/30/antiga.jpg', horas=72)
+        for nome in self.usadas:
+            self._envelhecer(nome, horas=48)
+
+    def _foto(self, nome, horas):
+        nome = default_storage.save(nome, ContentFile(b'foto'))
+        self._envelhecer(nome, horas)
+        return nome
+
+    def _envelhecer(self, nome, horas):
+        momento = time.time() - horas * 3600
+        os.utime(default_storage.path(nome), (momento, momento))
+
+    def existentes(self):
+        todas = (self.antiga, self.recente, self.outro_dia, *self.usadas)
+        return {nome for nome in todas if default_storage.exists(nome)}
+
+
+class VarrerDiaTests(FotosOrfas, TestCase):
+    def test_dias_em_ordem(self):
+        dia_registro = self.registro.foto_odometro.name.rsplit('/', 1)[0]
+        self.assertEqual(fotos_orfas.dias(), sorted({'registros/2026/09/30', DIA, dia_registro}))
+
+    def test_referenciados(self):
+        nomes = [self.antiga, *self.usadas]
+        self.assertEqual(fotos_orfas.referenciados(nomes), self.usadas)
+
+    def test_dry_run_so_lista(self):
+        arquivos, orfas = fotos_orfas.varrer_dia(DIA, IDADE)
+        self.assertEqual((arquivos, orfas), (2, [self.antiga]))
+        self.assertIn(self.antiga, self.existentes())
+
+    def test_remover_apaga_so_as_orfas_antigas(self):
+        for dia in fotos_orfas.dias():
+            fotos_orfas.varrer_dia(dia, IDADE, remover=True)
+        self.assertEqual(self.existentes(), {self.recente, *self.usadas})
+
+    def test_sem_diretorio_de_registros(self):
+        self.assertEqual(fotos_orfas.dias(default_storage.__class__(location=self.media_root / 'vazio')), [])
+
+
+class ComandoTests(FotosOrfas, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.estado = self.media_root.parent / 'estado.json'
+
+    def _comando(self, *argumentos, **opcoes):
+        saida = io.StringIO()
+        call_command('limpar_fotos_orfas', *argumentos, estado=self.estado, stdout=saida, **opcoes)
+        return saida.getvalue()
+
+    def test_dry_run_e_depois_remover(self):
+        saida = self._comando('--dry-run', verbosity=2)
+        self.assertIn(f'  {self.antiga}', saida)
+        self.assertIn('2 foto(s) órfã(s) encontrada(s) em 5 arquivo(s).', saida)
+        self.assertEqual(len(self.existentes()), 5)
+        self.assertFalse(self.estado.exists())
+
+        saida = self._comando()
+        self.assertIn('2 foto(s) órfã(s) removida(s)', saida)
+        self.assertEqual(self.existentes(), {self.recente, *self.usadas})
+
+    def test_retoma_depois_do_ultimo_dia(self):
+        self.estado.write_text(json.dumps({
+            'modo': 'remover', 'ultimo_dia': 'registros/2026/09/30', 'arquivos': 1, 'orfas': 1,
+        }))
+        saida = self._comando()
+        self.assertIn('Retomando depois de registros/2026/09/30.', saida)
+        self.assertIn('2 foto(s) órfã(s) removida(s) em 5 arquivo(s).', saida)
+        # O dia já concluído não é varrido de novo
+        self.assertIn(self.outro_dia, self.existentes())
+        self.assertNotIn(self.antiga, self.existentes())
+
+    def test_progresso_de_outro_modo(self):
+        self.estado.write_text(json.dumps({'modo': 'dry-run', 'ultimo_dia': DIA, 'arquivos': 0, 'orfas': 0}))
+        with self.assertRaises(CommandError):
+            self._comando()
+        self.assertEqual(len(self.existentes()), 5)
+        self.assertIn('2 foto(s) órfã(s) removida(s)', self._comando('--recomecar'))
@@ -0,0 +1,165 @@
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from ponto import fotos_repetidas
+from ponto.models import FotoRepetida, HashFoto, RegistroPonto
+
+from .base import MidiaTemporaria, criar_motorista, criar_registro_com_fotos, jpeg
+
+
+def grade(semente):
+    """Desenho em grade 9x8 (a da miniatura do dHash) com tons que variam pela semente"""
+    def desenho(draw):
+        largura = 320 / 9
+        altura = 240 * (1 - fotos_repetidas.CORTE_INFERIOR) / 8
+        for linha in range(8):
+            for coluna in range(9):
+                tom = 30 + ((linha * 9 + coluna) * semente * 37 + coluna * 53) % 190
+                draw.rectangle(
+                    (coluna * largura, linha * altura, (coluna + 1) * largura, (linha + 1) * altura),
+                    fill=(tom, tom, tom),
+                )
+    return desenho
+
+
+def painel(semente):
+    return jpeg((235, 235, 235), (320, 240), grade(semente))
+
+
+ODOMETRO, COMBUSTIVEL = 1, 3
+
+
+def reenviada(dados, tamanho=(640, 480), brilho=12):
+    """A mesma foto ampliada, mais clara e recomprimida"""
+    from PIL import Image, ImageEnhance
+
+    with Image.open(io.BytesIO(dados)) as imagem:
+        imagem = ImageEnhance.Brightness(imagem.resize(tamanho)).enhance(1 + brilho / 100)
+        saida = io.BytesIO()
+        imagem.save(saida, 'JPEG', quality=60)
+    return saida.getvalue()
+
+
+def hash_de(dados):
+    return fotos_repetidas.calcular_hash(io.BytesIO(dados))
+
+
+class HashTests(SimpleTestCase):
+    def test_resiste_a_recompressao_e_brilho(self):
+        original = painel(ODOMETRO)
+        self.assertLessEqual(
+            fotos_repetidas.distancia(hash_de(original), hash_de(reenviada(original))),
+            fotos_repetidas.DISTANCIA_MAX,
+        )
+
+    def test_fotos_diferentes(self):
+        self.assertGreater(
+            fotos_repetidas.distancia(hash_de(painel(ODOMETRO)), hash_de(painel(COMBUSTIVEL))),
+            fotos_repetidas.DISTANCIA_MAX * 4,
+        )
+
+    def test_ignora_a_faixa_da_marca_dagua(self):
+        def com_marca(draw):
+            grade(ODOMETRO)(draw)
+            draw.rectangle((0, 215, 320, 240), fill=(0, 0, 0))
+            draw.text((10, 220), '19/10/2026 08:00', fill=(255, 255, 255))
+
+        self.assertEqual(hash_de(painel(ODOMETRO)), hash_de(jpeg((235, 235, 235), (320, 240), com_marca)))
+
+    def test_foto_ilegivel(self):
+        with self.assertLogs('ponto.fotos_repetidas', 'WARNING'):
+            self.assertIsNone(hash_de(b'nao e imagem'))
+
+    def test_faixas_e_sinal(self):
+        valor = (1 << 64) - 1
+        self.assertEqual(fotos_repetidas.faixas(valor), [0xFFFF] * 4)
+        # Gravado com sinal no BigIntegerField, comparado sem sinal
+        self.assertEqual(fotos_repetidas.para_banco(valor), -1)
+        self.assertEqual(fotos_repetidas.faixas(-1), [0xFFFF] * 4)
+        self.assertEqual(fotos_repetidas.distancia(valor, -1), 0)
+
+
+class BuscaPorSemelhancaTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.motorista = criar_motorista('ana')
+
+    def _registro(self, foto_odometro=None, foto_combustivel=None, **campos):
+        with self.captureOnCommitCallbacks(execute=True):
+            return criar_registro_com_fotos(
+                self.motorista,
+                odometro=foto_odometro or painel(ODOMETRO),
+                combustivel=foto_combustivel or painel(COMBUSTIVEL),
+                **campos,
+            )
+
+    def test_casa_dos_pombos(self):
+        registro = self._registro()
+        HashFoto.objects.all().delete()
+        base = 0x0123_4567_89AB_CDEF
+        for registro_id, valor in enumerate((
+            base ^ 0b1,                                        # 1 bit
+            base ^ (1 | 1 << 16 | 1 << 32),                    # 3 bits em três faixas
+            base ^ (1 | 1 << 16 | 1 << 32 | 1 << 48),          # 4 bits: uma em cada faixa
+            base ^ 0xF,                                        # 4 bits numa faixa só
+        ), start=registro.pk + 1):
+            HashFoto.objects.create(
+                registro_id=registro_id, campo='foto_odometro', hash=fotos_repetidas.para_banco(valor),
+                data_hora=registro.data_hora,
+                **{f'faixa{i}': faixa for i, faixa in enumerate(fotos_repetidas.faixas(valor))},
+            )
+
+        encontrados = fotos_repetidas.semelhantes(base)
+        self.assertEqual(
+            [(d, h.registro_id) for d, h in encontrados],
+            [(1, registro.pk + 1), (3, registro.pk + 2)],
+        )
+        self.assertEqual(
+            [h.registro_id for _, h in fotos_repetidas.semelhantes(base, excluir_registro=registro.pk + 1)],
+            [registro.pk + 2],
+        )
+
+    def test_foto_reenviada_e_sinalizada(self):
+        original = self._registro()
+        self.assertEqual(HashFoto.objects.filter(registro=original).count(), 2)
+        # As duas fotos do mesmo registro não se comparam entre si
+        self.assertFalse(FotoRepetida.objects.exists())
+
+        repetido = self._registro(
+            foto_odometro=reenviada(painel(ODOMETRO)), foto_combustivel=painel(7),
+            tipo='saida', km=1100,
+        )
+        sinalizada = FotoRepetida.objects.get()
+        self.assertEqual((sinalizada.registro, sinalizada.campo), (repetido, 'foto_odometro'))
+        self.assertEqual((sinalizada.original, sinalizada.campo_original), (original, 'foto_odometro'))
+        self.assertLessEqual(sinalizada.distancia, fotos_repetidas.DISTANCIA_MAX)
+
+    def test_foto_ausente_ou_registro_arquivado(self):
+        registro = RegistroPonto.objects.get(pk=self._registro().pk)
+        HashFoto.objects.all().delete()
+        registro.foto_odometro.storage.delete(registro.foto_odometro.name)
+        with self.assertLogs('ponto.fotos_repetidas', 'WARNING'):
+            fotos_repetidas.indexar(registro)
+        self.assertEqual(list(HashFoto.objects.values_list('campo', flat=True)), ['foto_combustivel'])
+
+        HashFoto.objects.all().delete()
+        RegistroPonto.objects.filter(pk=registro.pk).update(arquivo='pacote.zip')
+        registro.refresh_from_db()
+        self.assertEqual(fotos_repetidas.indexar(registro), [])
+        self.assertFalse(HashFoto.objects.exists())
+
+    def test_comando_indexa_as_pendentes_em_ordem(self):
+        original = self._registro()
+        repetido = self._registro(foto_odometro=reenviada(painel(ODOMETRO)), tipo='saida', km=1100)
+        HashFoto.objects.all().delete()
+        FotoRepetida.objects.all().delete()
+
+        saida = io.StringIO()
+        call_command('indexar_fotos', processos=1, stdout=saida)
+        self.assertIn('4 foto(s) indexada(s)', saida.getvalue())
+        self.assertTrue(FotoRepetida.objects.filter(registro=repetido, original=original).exists())
+
+        call_command('indexar_fotos', processos=1, stdout=saida)
+        self.assertIn('0 foto(s) a indexar', saida.getvalue())
@@ -0,0 +1,129 @@
+import random
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ponto import geo
+from ponto.models import Mercado
+from ponto.views import relatorios
+
+from .base import ESTATICOS_SIMPLES, criar_motorista, criar_registro
+
+CENTRO = (-23.5505, -46.6333)
+
+
+class GeoTests(SimpleTestCase):
+    def test_codificar_valor_conhecido(self):
+        self.assertEqual(geo.codificar(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_decodificar_volta_para_a_celula(self):
+        sorteio = random.Random(4)
+        for _ in range(200):
+            latitude, longitude = sorteio.uniform(-90, 90), sorteio.uniform(-180, 180)
+            geohash = geo.codificar(latitude, longitude)
+            centro_lat, centro_lon = geo.decodificar(geohash)
+            altura, largura = geo.tamanho_celula(len(geohash))
+            self.assertLessEqual(abs(centro_lat - latitude), altura / 2)
+            self.assertLessEqual(abs(centro_lon - longitude), largura / 2)
+            self.assertEqual(geo.codificar(centro_lat, centro_lon), geohash)
+
+    def _conferir_cobertura(self, latitude, longitude, raio, sorteio, amostras=50):
+        prefixos = geo.prefixos_na_area(latitude, longitude, raio)
+        self.assertLessEqual(len(prefixos), 9)
+        tamanho = len(prefixos[0])
+        for _ in range(amostras):
+            # Ponto a até ``raio`` metros do centro, em qualquer direção
+            angulo = sorteio.uniform(0, 360)
+            distancia = raio * sorteio.random() ** 0.5
+            dlat = distancia * geo.math.cos(geo.math.radians(angulo)) / geo.METROS_POR_GRAU
+            dlon = distancia * geo.math.sin(geo.math.radians(angulo)) / (
+                geo.METROS_POR_GRAU * geo.math.cos(geo.math.radians(latitude))
+            )
+            lat = latitude + dlat
+            lon = (longitude + dlon + 180) % 360 - 180
+            if geo.distancia_metros(latitude, longitude, lat, lon) > raio:
+                continue
+            self.assertIn(geo.codificar(lat, lon, tamanho), prefixos, (latitude, longitude, raio, lat, lon))
+
+    def test_prefixos_cobrem_a_area_na_borda_da_celula(self):
+        sorteio = random.Random(9)
+        for precisao in (4, 5, 6, 7):
+            # Centro exatamente num canto de célula: o círculo toca quatro células
+            geohash = geo.codificar(-23.5505, -46.6333, precisao)
+            centro_lat, centro_lon = geo.decodificar(geohash)
+            altura, largura = geo.tamanho_celula(precisao)
+            canto_lat, canto_lon = centro_lat + altura / 2, centro_lon + largura / 2
+            for raio in (5, 50, 500, 5000):
+                self._conferir_cobertura(canto_lat, canto_lon, raio, sorteio)
+                self._conferir_cobertura(canto_lat - 1e-9, canto_lon - 1e-9, raio, sorteio)
+
+    def test_prefixos_no_antimeridiano(self):
+        sorteio = random.Random(1)
+        self._conferir_cobertura(0.5, 179.9999, 200, sorteio)
+        self._conferir_cobertura(-16.5, -179.9999, 200, sorteio)
+
+    def test_cerca(self):
+        mercado = Mercado(nome='M', latitude=-23.55, longitude=-46.63, raio_metros=100)
+        self.assertEqual(geo.verificar_cerca(mercado, -23.55, -46.63), (0, True))
+        distancia, dentro = geo.verificar_cerca(mercado, -23.5515, -46.63)
+        self.assertFalse(dentro)
+        # A imprecisão do GPS conta, até TOLERANCIA_MAXIMA_METROS
+        self.assertTrue(geo.verificar_cerca(mercado, -23.5515, -46.63, precisao_metros=distancia - 100)[1])
+        self.assertEqual(geo.verificar_cerca(Mercado(nome='Sem'), -23.55, -46.63), (None, None))
+
+
+
+@override_settings(STORAGES=ESTATICOS_SIMPLES)
+class BuscaPorRaioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        motorista = criar_motorista('ana')
+        # A 0, ~110 m, ~1,1 km e ~11 km ao norte do centro
+        for km, dlat in enumerate((0, 0.001, 0.01, 0.1)):
+            latitude, longitude = CENTRO[0] + dlat, CENTRO[1]
+            criar_registro(
+                motorista, km=1000 + km, latitude=Decimal(f'{latitude:.6f}'), longitude=Decimal(f'{longitude:.6f}'),
+                geohash=geo.codificar(latitude, longitude),
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _buscar(self, **parametros):
+        resposta = self.client.get(reverse('localizacao_registros'), {
+            'latitude': CENTRO[0], 'longitude': CENTRO[1], **parametros,
+        })
+        self.assertEqual(resposta.status_code, 200)
+        return resposta
+
+    def test_so_os_registros_no_raio(self):
+        resposta = self._buscar(raio=500)
+        self.assertEqual(resposta.context['area']['total'], 2)
+        self.assertEqual([r.distancia_busca for r in resposta.context['registros']], [111, 0])
+        self.assertEqual(self._buscar(raio=2000).context['area']['total'], 3)
+
+    def test_raio_limitado(self):
+        area = self._buscar(raio=50_000).context['area']
+        self.assertEqual(area['raio'], relatorios.LOCALIZACAO_RAIO_MAX)
+        # O registro a ~11 km fica de fora
+        self.assertEqual(area['total'], 3)
+
+    def test_nan_e_inf_recusados(self):
+        for parametros in ({'raio': 'nan'}, {'raio': 'inf'}, {'latitude': 'nan'}, {'longitude': '-inf'}):
+            with self.subTest(**parametros):
+                resposta = self._buscar(**parametros)
+                self.assertIsNone(resposta.context['area'])
+                self.assertEqual([str(m) for m in resposta.context['messages']], ['Coordenadas inválidas!'])
+
+    def test_candidatos_limitados(self):
+        with mock.patch.object(relatorios, 'LOCALIZACAO_MAX_CANDIDATOS', 2):
+            resposta = self._buscar(raio=2000)
+        area = resposta.context['area']
+        self.assertTrue(area['truncado'])
+        self.assertEqual(area['total'], 2)
+        self.assertContains(resposta, 'só os 2 mais recentes foram conferidos')
+        self.assertFalse(self._buscar(raio=2000).context['area']['truncado'])
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from ponto import metricas
+
+from .base import ESTATICOS_SIMPLES, criar_motorista, criar_registro
+
+
+def medidas(view):
+    """(requisições, consultas) já observadas em ``ponto_requisicao_consultas``"""
+    rotulos = {'view': view}
+    return (
+        REGISTRY.get_sample_value('ponto_requisicao_consultas_count', rotulos) or 0,
+        REGISTRY.get_sample_value('ponto_requisicao_consultas_sum', rotulos) or 0,
+    )
+
+
+def diferenca(depois, antes):
+    return tuple(d - a for d, a in zip(depois, antes))
+
+
+@override_settings(STORAGES=ESTATICOS_SIMPLES)
+class ConsultasPorRequisicaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        criar_registro(criar_motorista('ana'))
+
+    async def test_view_async_conta_as_consultas_das_threads(self):
+        await self.async_client.aforce_login(self.admin)
+        antes = medidas('api_status_motoristas_hoje')
+        resposta = await self.async_client.get(reverse('api_status_motoristas_hoje'))
+        self.assertEqual(resposta.status_code, 200)
+        requisicoes, consultas = diferenca(medidas('api_status_motoristas_hoje'), antes)
+        self.assertEqual(requisicoes, 1)
+        # Sessão, usuário e os registros do dia, todos fora da thread do event loop
+        self.assertGreaterEqual(consultas, 3)
+
+    def test_view_sincrona(self):
+        self.client.force_login(criar_motorista('beto').user)
+        antes = medidas('motorista_dashboard')
+        self.assertEqual(self.client.get(reverse('motorista_dashboard')).status_code, 200)
+        requisicoes, consultas = diferenca(medidas('motorista_dashboard'), antes)
+        self.assertEqual(requisicoes, 1)
+        self.assertGreater(consultas, 0)
+
+    def test_conexao_recebe_o_contador_uma_vez(self):
+        metricas.instalar_contador(None, connection)
+        self.assertEqual(connection.execute_wrappers.count(metricas.contar_consulta), 1)
+        # Fora de requisição não há contador
+        self.assertIsNone(metricas._consultas.get())
+        User.objects.exists()
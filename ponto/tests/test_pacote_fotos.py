@@ -0,0 +1,99 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ponto import arquivamento
+
+from .base import MidiaTemporaria, criar_motorista, criar_registro_com_fotos, jpeg
+
+
+class PacoteFotosTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.ana = criar_motorista('ana')
+        self.ana.nome_completo = 'Ana Conceição'
+        self.ana.save()
+        self.fotos = {'foto_odometro': jpeg((200, 10, 10)), 'foto_combustivel': jpeg((10, 10, 200))}
+        self.entrada = criar_registro_com_fotos(
+            self.ana, 'entrada', 1000,
+            odometro=self.fotos['foto_odometro'], combustivel=self.fotos['foto_combustivel'],
+            data_hora=timezone.make_aware(datetime(2026, 10, 1, 8, 5)),
+        )
+        self.saida = criar_registro_com_fotos(
+            self.ana, 'saida', 1100, data_hora=timezone.make_aware(datetime(2026, 10, 1, 17, 30)),
+        )
+        self.outro = criar_registro_com_fotos(criar_motorista('beto'))
+
+    def _baixar(self, **filtros):
+        self.client.force_login(self.admin)
+        resposta = self.client.get(reverse('baixar_fotos_registros'), filtros)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content)))
+
+    def _manifesto(self, pacote):
+        texto = pacote.read('manifesto.csv').decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(texto)))
+
+    def test_fotos_e_manifesto(self):
+        pacote = self._baixar(motorista=self.ana.pk)
+        pasta = 'Ana_Conceição_ana'
+        esperados = [
+            f'{pasta}/2026-10-01_0805_entrada_odometro_{self.entrada.pk}.jpg',
+            f'{pasta}/2026-10-01_0805_entrada_combustivel_{self.entrada.pk}.jpg',
+            f'{pasta}/2026-10-01_1730_saida_odometro_{self.saida.pk}.jpg',
+            f'{pasta}/2026-10-01_1730_saida_combustivel_{self.saida.pk}.jpg',
+        ]
+        self.assertEqual(pacote.namelist(), esperados + ['manifesto.csv'])
+        self.assertEqual(pacote.read(esperados[0]), self.fotos['foto_odometro'])
+        self.assertEqual(pacote.read(esperados[1]), self.fotos['foto_combustivel'])
+        # Fotos entram sem nova compressão
+        self.assertEqual({info.compress_type for info in pacote.infolist()}, {zipfile.ZIP_STORED})
+
+        linhas = self._manifesto(pacote)
+        self.assertEqual([linha['arquivo'] for linha in linhas], esperados)
+        self.assertEqual(linhas[0], {
+            'arquivo': esperados[0], 'registro_id': str(self.entrada.pk), 'motorista': 'Ana Conceição',
+            'cpf': 'ana', 'mercado': 'Mercado ana', 'veiculo': str(self.ana.veiculo), 'tipo': 'entrada',
+            'data_hora': timezone.localtime(self.entrada.data_hora).isoformat(), 'km_odometro': '1000',
+            'nivel_combustivel': '50', 'foto': 'foto_odometro', 'situacao': 'ok',
+        })
+
+    def test_foto_ausente_fica_no_manifesto(self):
+        default_storage.delete(self.saida.foto_combustivel.name)
+        with self.assertLogs('ponto.pacote_fotos', 'WARNING'):
+            pacote = self._baixar(motorista=self.ana.pk)
+        self.assertEqual(len(pacote.namelist()), 4)
+        ausente = self._manifesto(pacote)[-1]
+        self.assertEqual((ausente['arquivo'], ausente['foto'], ausente['situacao']), ('', 'foto_combustivel', 'ausente'))
+
+    def test_registro_arquivado_sai_do_pacote_mensal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            arquivamento.arquivar('2026-10', [self.entrada])
+        self.entrada.refresh_from_db()
+        self.assertTrue(self.entrada.arquivado)
+
+        pacote = self._baixar(motorista=self.ana.pk, data_inicio='2026-10-01', data_fim='2026-10-01', tipo='entrada')
+        nomes = pacote.namelist()
+        self.assertEqual(len(nomes), 3)
+        self.assertEqual(pacote.read(nomes[0]), self.fotos['foto_odometro'])
+
+    def test_permissao_e_acao_do_admin(self):
+        self.client.force_login(self.ana.user)
+        self.assertEqual(self.client.get(reverse('baixar_fotos_registros')).status_code, 403)
+
+        self.client.force_login(self.admin)
+        resposta = self.client.post(reverse('admin:ponto_registroponto_changelist'), {
+            'action': 'baixar_fotos', '_selected_action': [self.outro.pk],
+        })
+        self.assertEqual(resposta['Content-Type'], 'application/zip')
+        pacote = zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content)))
+        self.assertEqual([linha['registro_id'] for linha in self._manifesto(pacote)], [str(self.outro.pk)] * 2)
@@ -0,0 +1,170 @@
+import io
+import unittest
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ponto import particionamento
+from ponto.admin import PaginadorEstimado
+from ponto.models import RegistroPonto, inicio_do_dia
+
+from .base import criar_motorista, criar_registro
+
+
+def local(dia, hora=time.min):
+    return timezone.make_aware(datetime.combine(dia, hora))
+
+
+class LimitesTests(SimpleTestCase):
+    def test_proximo_mes_vira_o_ano(self):
+        self.assertEqual(particionamento.proximo_mes(date(2025, 12, 1)), date(2026, 1, 1))
+        self.assertEqual(particionamento.proximo_mes(date(2026, 1, 31)), date(2026, 2, 1))
+
+    def test_limites_na_meia_noite_local(self):
+        inicio, fim = particionamento.limites(date(2026, 10, 15))
+        self.assertEqual(datetime.fromisoformat(inicio), local(date(2026, 10, 1)))
+        self.assertEqual(datetime.fromisoformat(fim), local(date(2026, 11, 1)))
+
+    def test_mes_local_usa_o_fuso(self):
+        # 01/11 02:00 UTC ainda é outubro em São Paulo
+        valor = datetime(2026, 11, 1, 2, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(particionamento.mes_local(valor), date(2026, 10, 1))
+
+    def test_nomes_no_plano(self):
+        plano = (
+            'Append -> Seq Scan on ponto_registroponto_y2026m10 '
+            '-> Seq Scan on ponto_registroponto_default -> Index Scan on ponto_registroponto_y2026m10'
+        )
+        self.assertEqual(
+            particionamento.particoes_no_plano(plano),
+            ['ponto_registroponto_default', 'ponto_registroponto_y2026m10'],
+        )
+
+
+class NoPeriodoTests(TestCase):
+    def test_periodo_inclui_os_dias_inteiros(self):
+        motorista = criar_motorista('ana')
+        dia = date(2026, 10, 31)
+        dentro = [
+            criar_registro(motorista, data_hora=local(dia)),
+            criar_registro(motorista, 'saida', data_hora=local(dia, time(23, 59, 59))),
+        ]
+        criar_registro(motorista, data_hora=local(dia) - timedelta(microseconds=1))
+        criar_registro(motorista, 'saida', data_hora=local(dia + timedelta(days=1)))
+
+        self.assertCountEqual(RegistroPonto.objects.do_dia(dia), dentro)
+        self.assertCountEqual(RegistroPonto.objects.no_periodo(dia.isoformat(), dia.isoformat()), dentro)
+        self.assertEqual(RegistroPonto.objects.no_periodo(data_inicio=dia).count(), 3)
+        self.assertEqual(RegistroPonto.objects.no_periodo(data_fim=dia).count(), 3)
+
+    def test_inicio_do_dia_aceita_texto(self):
+        self.assertEqual(inicio_do_dia('2026-10-01'), local(date(2026, 10, 1)))
+
+
+def catalogo(total, sem_estatistica):
+    """Conexão PostgreSQL falsa cuja consulta ao catálogo devolve a linha dada"""
+    conexao = mock.MagicMock(vendor='postgresql')
+    cursor = conexao.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = (total, sem_estatistica)
+    return conexao, cursor
+
+
+class LinhasEstimadasTests(SimpleTestCase):
+    def test_particoes_sem_estatistica_contam_como_zero(self):
+        conexao, cursor = catalogo(1_250_000.0, False)
+        self.assertEqual(particionamento.linhas_estimadas(conexao), 1_250_000)
+        sql = cursor.execute.call_args.args[0]
+        self.assertIn('SUM(GREATEST(c.reltuples, 0))', sql)
+        self.assertIn('bool_and(c.reltuples < 0)', sql)
+
+    def test_nenhuma_particao_analisada(self):
+        self.assertIsNone(particionamento.linhas_estimadas(catalogo(0.0, True)[0]))
+        self.assertIsNone(particionamento.linhas_estimadas(catalogo(None, None)[0]))
+
+    def test_outros_bancos(self):
+        self.assertIsNone(particionamento.linhas_estimadas(mock.MagicMock(vendor='sqlite')))
+
+
+class PaginadorEstimadoTests(TestCase):
+    def setUp(self):
+        motorista = criar_motorista('ana')
+        for km in range(5):
+            criar_registro(motorista, km=km)
+        self.registros = RegistroPonto.objects.order_by('pk')
+
+    def _paginador(self, estimativa, registros=None):
+        with mock.patch.object(particionamento, 'linhas_estimadas', return_value=estimativa):
+            paginador = PaginadorEstimado(registros if registros is not None else self.registros, 2)
+            paginador.estimativa
+        return paginador
+
+    def test_usa_a_estimativa_acima_do_limiar(self):
+        paginador = self._paginador(PaginadorEstimado.LIMIAR + 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginador.count, PaginadorEstimado.LIMIAR + 1)
+
+    def test_conta_de_verdade_abaixo_do_limiar_ou_com_filtro(self):
+        self.assertEqual(self._paginador(PaginadorEstimado.LIMIAR).count, 5)
+        self.assertEqual(self._paginador(None).count, 5)
+        filtrados = self.registros.filter(km_odometro__lt=3)
+        self.assertEqual(self._paginador(PaginadorEstimado.LIMIAR + 1, filtrados).count, 3)
+
+    def test_pagina_alem_do_total_real_volta_para_a_ultima(self):
+        paginador = self._paginador(PaginadorEstimado.LIMIAR + 1)
+        pagina = paginador.page(10)
+        self.assertEqual(pagina.number, 3)
+        self.assertEqual([r.km_odometro for r in pagina.object_list], [4])
+        self.assertEqual(paginador.count, 5)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'particionamento só existe no PostgreSQL')
+class ParticoesPostgresTests(TestCase):
+    MES = date(2099, 1, 1)
+
+    def _particao_de(self, registro):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT tableoid::regclass::text FROM "{particionamento.TABELA}" WHERE id = %s',
+                [registro.pk],
+            )
+            return cursor.fetchone()[0].strip('"')
+
+    def test_tabela_particionada_pela_migracao(self):
+        with connection.cursor() as cursor:
+            self.assertTrue(particionamento.tabela_particionada(cursor))
+            self.assertIn(timezone.localdate().replace(day=1), particionamento.particoes_existentes(cursor))
+
+    def test_garantir_particoes_move_linhas_da_padrao(self):
+        registro = criar_registro(criar_motorista('ana'), data_hora=local(self.MES, time(12)))
+        self.assertEqual(self._particao_de(registro), particionamento.PARTICAO_PADRAO)
+
+        criadas = particionamento.garantir_particoes(self.MES, self.MES)
+        self.assertEqual(criadas, [particionamento.nome_particao(self.MES)])
+        self.assertEqual(self._particao_de(registro), criadas[0])
+        # Já existe: nada a criar
+        self.assertEqual(particionamento.garantir_particoes(self.MES, self.MES), [])
+
+    def test_consulta_do_mes_toca_uma_particao(self):
+        particionamento.garantir_particoes(self.MES, particionamento.proximo_mes(self.MES))
+        plano = RegistroPonto.objects.no_periodo(self.MES, date(2099, 1, 31)).explain()
+        self.assertEqual(particionamento.particoes_no_plano(plano), [particionamento.nome_particao(self.MES)])
+
+    def test_estimativa_com_particao_futura_nao_analisada(self):
+        criar_registro(criar_motorista('ana'))
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE "{particionamento.nome_particao(timezone.localdate().replace(day=1))}"')
+        particionamento.garantir_particoes(self.MES, self.MES)
+        self.assertIsNotNone(particionamento.linhas_estimadas())
+
+    def test_comando_criar_particoes(self):
+        call_command('criar_particoes', meses=2, stdout=io.StringIO())
+        with connection.cursor() as cursor:
+            existentes = particionamento.particoes_existentes(cursor)
+        mes = timezone.localdate().replace(day=1)
+        for _ in range(3):
+            self.assertIn(mes, existentes)
+            mes = particionamento.proximo_mes(mes)
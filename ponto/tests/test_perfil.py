@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+
+from ponto import perfil
+
+
+def view(request):
+    return HttpResponse('ok')
+
+
+class PerfilMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        diretorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        configuracao = override_settings(
+            PERFIL_ATIVO=True, PERFIL_AMOSTRA=0, PERFIL_URLS=['admin_dashboard'],
+            PERFIL_MIN_MS=0, PERFIL_DIR=diretorio,
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        processo = mock.patch.object(perfil, 'PERFIL_DO_PROCESSO', True)
+        processo.start()
+        self.addCleanup(processo.stop)
+
+    def _requisitar(self, durante=lambda: None):
+        """Passa uma requisição pelo middleware; ``durante`` roda com a view"""
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            durante()
+            return view(request)
+
+        middleware = perfil.PerfilMiddleware(get_response)
+        request = RequestFactory().get('/admin/')
+        request.resolver_match = resolve('/admin/')
+        middleware(request)
+        return perfil.listar()
+
+    def test_requisicao_sozinha_e_perfilada(self):
+        perfis = self._requisitar()
+        self.assertEqual(len(perfis), 1)
+        self.assertEqual(perfis[0]['url_nome'], 'admin_dashboard')
+        self.assertIs(perfis[0]['exclusivo'], True)
+        self.assertFalse(perfil._trava.locked())
+
+    def test_outra_requisicao_em_andamento(self):
+        perfil._entrar()
+        try:
+            self.assertEqual(self._requisitar(), [])
+        finally:
+            perfil._sair()
+        self.assertFalse(perfil._trava.locked())
+
+    def test_outra_requisicao_durante_o_perfil(self):
+        def outra():
+            perfil._entrar()
+            perfil._sair()
+
+        perfis = self._requisitar(outra)
+        self.assertEqual(len(perfis), 1)
+        self.assertIs(perfis[0]['exclusivo'], False)
+
+    def test_perfilador_por_thread_ignora_concorrencia(self):
+        with mock.patch.object(perfil, 'PERFIL_DO_PROCESSO', False):
+            perfil._entrar()
+            try:
+                perfis = self._requisitar()
+            finally:
+                perfil._sair()
+        self.assertIs(perfis[0]['exclusivo'], True)
+
+    def test_desligado(self):
+        with override_settings(PERFIL_ATIVO=False):
+            with self.assertRaises(perfil.MiddlewareNotUsed):
+                perfil.PerfilMiddleware(view)
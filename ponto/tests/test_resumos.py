@@ -0,0 +1,67 @@
+from datetime import datetime, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ponto import resumos
+from ponto.models import Mercado, ResumoDiarioMercado
+
+from .base import criar_motorista, criar_registro
+
+
+class ResumosTests(TestCase):
+    def _resumos(self):
+        return sorted(ResumoDiarioMercado.objects.values_list('mercado_id', 'data', 'turnos_concluidos'))
+
+    def test_troca_de_mercado_refaz_os_dias(self):
+        motorista = criar_motorista('ana')
+        novo = Mercado.objects.create(nome='Novo')
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_registro(motorista, data_hora=timezone.now() - timedelta(days=1, hours=2))
+            criar_registro(motorista, 'saida', km=1100, data_hora=timezone.now() - timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            motorista.mercado = novo
+            motorista.save()
+        incremental = self._resumos()
+
+        resumos.reconstruir()
+        self.assertEqual(incremental, self._resumos())
+        self.assertEqual({mercado for mercado, _, turnos in incremental if turnos}, {novo.pk})
+
+
+    def test_incremental_igual_a_reconstrucao(self):
+        ana = criar_motorista('ana')
+        beto = criar_motorista('beto', mercado=ana.mercado)
+        ontem = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=1), time(17)))
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_registro(ana, km=1000, data_hora=ontem - timedelta(hours=8))
+            saida = criar_registro(ana, 'saida', km=1120, data_hora=ontem)
+            criar_registro(beto, km=5000, data_hora=ontem - timedelta(hours=3))
+
+        resumo = ResumoDiarioMercado.objects.get()
+        self.assertEqual((resumo.motoristas_ativos, resumo.turnos_concluidos, resumo.km_rodados), (2, 1, 120))
+
+        # Saída corrigida para o dia seguinte: o turno de ontem fica aberto
+        with self.captureOnCommitCallbacks(execute=True):
+            saida.data_hora += timedelta(days=1)
+            saida.save()
+        incremental = self._resumos()
+        resumos.reconstruir()
+        self.assertEqual(incremental, self._resumos())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            saida.delete()
+        incremental = self._resumos()
+        resumos.reconstruir()
+        self.assertEqual(incremental, self._resumos())
+        self.assertEqual(len(incremental), 1)
+
+    def test_tendencias_preenche_dias_sem_registro(self):
+        motorista = criar_motorista('ana')
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_registro(motorista)
+        dados = resumos.tendencias(dias=7)
+        self.assertEqual(len(dados['datas']), 7)
+        serie, = dados['series']
+        self.assertEqual(serie['motoristas_ativos'], [0] * 6 + [1])
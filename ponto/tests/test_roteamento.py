@@ -0,0 +1,81 @@
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ponto.models import RegistroPonto
+from ponto.roteamento import CHAVE_SESSAO, REPLICA, EscritaRecenteMiddleware, ReplicaRouter, leitura_replica
+
+
+@mock.patch('ponto.roteamento.replica_configurada', return_value=True)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def _request(self, metodo='get', usuario=None):
+        request = getattr(self.factory, metodo)('/')
+        request.session = SessionStore()
+        request.user = usuario or AnonymousUser()
+        return request
+
+    def _alias_na_view(self, request):
+        @leitura_replica
+        def view(request):
+            return self.router.db_for_read(RegistroPonto)
+        return view(request)
+
+    def test_view_marcada_le_da_replica(self, _):
+        self.assertEqual(self._alias_na_view(self._request()), REPLICA)
+
+    def test_fora_da_view_marcada_usa_o_padrao(self, _):
+        self._alias_na_view(self._request())
+        self.assertIsNone(self.router.db_for_read(RegistroPonto))
+
+    def test_so_modelos_do_ponto_vao_para_a_replica(self, _):
+        @leitura_replica
+        def view(request):
+            return self.router.db_for_read(User)
+        self.assertIsNone(view(self._request()))
+
+    def test_escritas_sempre_no_primario(self, _):
+        @leitura_replica
+        def view(request):
+            return self.router.db_for_write(RegistroPonto)
+        self.assertEqual(view(self._request()), DEFAULT_DB_ALIAS)
+
+    def test_view_async_le_da_replica(self, _):
+        @leitura_replica
+        async def view(request):
+            return self.router.db_for_read(RegistroPonto)
+        self.assertEqual(async_to_sync(view)(self._request()), REPLICA)
+
+    def test_escrita_prende_as_leituras_no_primario(self, _):
+        usuario = mock.Mock(is_authenticated=True)
+        escrita = self._request('post', usuario)
+        EscritaRecenteMiddleware(lambda request: HttpResponse())(escrita)
+        self.assertIn(CHAVE_SESSAO, escrita.session)
+
+        leitura = self._request(usuario=usuario)
+        leitura.session = escrita.session
+        self.assertIsNone(self._alias_na_view(leitura))
+
+    @override_settings(REPLICA_JANELA_PRIMARIO=10)
+    def test_volta_para_a_replica_depois_da_janela(self, _):
+        request = self._request()
+        request.session[CHAVE_SESSAO] = time.time() - 11
+        self.assertEqual(self._alias_na_view(request), REPLICA)
+
+    def test_leitura_e_anonimo_nao_marcam_escrita(self, _):
+        middleware = EscritaRecenteMiddleware(lambda request: HttpResponse())
+        leitura = self._request(usuario=mock.Mock(is_authenticated=True))
+        anonimo = self._request('post')
+        middleware(leitura)
+        middleware(anonimo)
+        self.assertNotIn(CHAVE_SESSAO, leitura.session)
+        self.assertNotIn(CHAVE_SESSAO, anonimo.session)
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ponto.models import RegistroPonto, Veiculo
+
+from .base import MidiaTemporaria, criar_motorista, jpeg
+
+
+class SincronizacaoTests(MidiaTemporaria, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.motorista = criar_motorista('ana')
+        self.client.force_login(self.motorista.user)
+        self.url = reverse('sincronizar_registros')
+        ontem = timezone.localdate() - timedelta(days=1)
+        self.entrada_em = timezone.make_aware(datetime.combine(ontem, time(8)))
+        self.saida_em = timezone.make_aware(datetime.combine(ontem, time(17)))
+
+    def _item(self, item_id, tipo, capturado_em, km, **campos):
+        return {
+            'id': item_id, 'tipo': tipo, 'capturado_em': capturado_em.isoformat(),
+            'km_odometro': km, 'nivel_combustivel': 70, **campos,
+        }
+
+    def _enviar(self, *itens):
+        dados = {'itens': json.dumps(list(itens))}
+        for item in itens:
+            for campo in ('foto_odometro', 'foto_combustivel'):
+                dados[f'{campo}_{item["id"]}'] = SimpleUploadedFile(
+                    f'{campo}.jpg', jpeg((90, 90, 90), (320, 240)), content_type='image/jpeg'
+                )
+        resposta = self.client.post(self.url, dados)
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        return {resultado['id']: resultado for resultado in resposta.json()['resultados']}
+
+    def test_ordem_pelo_instante_e_nao_pelo_texto(self):
+        # A entrada vem num fuso em que o texto fica "depois" do da saída
+        entrada = self._item('1', 'entrada', self.entrada_em.astimezone(ZoneInfo('Asia/Tokyo')), 1000)
+        saida = self._item('2', 'saida', self.saida_em, 1100)
+        self.assertGreater(entrada['capturado_em'], saida['capturado_em'])
+
+        resultados = self._enviar(saida, entrada)
+        self.assertEqual({item_id: r['status'] for item_id, r in resultados.items()}, {'1': 'ok', '2': 'ok'})
+        registro = RegistroPonto.objects.get(pk=resultados['1']['registro_id'])
+        self.assertEqual(registro.data_hora, self.entrada_em)
+
+    def test_reenvio_e_duplicado(self):
+        item = self._item('1', 'entrada', self.entrada_em, 1000)
+        primeiro = self._enviar(item)['1']
+        repetido = self._enviar(item)['1']
+        self.assertEqual(repetido['status'], 'duplicado')
+        self.assertEqual(repetido['registro_id'], primeiro['registro_id'])
+        self.assertEqual(RegistroPonto.objects.count(), 1)
+
+    def test_itens_rejeitados(self):
+        agora = timezone.now()
+        casos = {
+            'tipo': self._item('tipo', 'almoco', self.entrada_em, 1000),
+            'sem fuso': dict(self._item('sem_fuso', 'entrada', self.entrada_em, 1000), capturado_em='2026-10-01T08:00:00'),
+            'futuro': self._item('futuro', 'entrada', agora + timedelta(hours=1), 1000),
+            'antigo': self._item('antigo', 'entrada', agora - timedelta(days=8), 1000),
+            'saída sem entrada': self._item('saida', 'saida', self.saida_em, 1000),
+        }
+        resultados = self._enviar(*casos.values())
+        for caso, item in casos.items():
+            with self.subTest(caso):
+                self.assertEqual(resultados[item['id']]['status'], 'rejeitado')
+        self.assertFalse(RegistroPonto.objects.exists())
+
+    def test_km_conferido_no_horario_da_captura(self):
+        # 2000 km em 10 h (da última leitura até a captura) não é possível;
+        # contado até agora (30 h) seria
+        Veiculo.objects.filter(pk=self.motorista.veiculo_id).update(
+            ultimo_km=1000, ultima_leitura_em=self.entrada_em - timedelta(hours=10),
+        )
+        item = self._item('1', 'entrada', self.entrada_em, 3000)
+        resultado = self._enviar(item)['1']
+        self.assertEqual(resultado['status'], 'rejeitado')
+        self.assertIn('não é possível', resultado['mensagem'])
+
+        item['confirmar_leitura'] = True
+        self.assertEqual(self._enviar(item)['1']['status'], 'ok')
+
+    def test_foto_recebe_marca_dagua(self):
+        resultado = self._enviar(self._item('1', 'entrada', self.entrada_em, 1000))['1']
+        registro = RegistroPonto.objects.get(pk=resultado['registro_id'])
+        self.assertIn('marca_dagua', registro.foto_odometro.name)
+        with registro.foto_odometro.open('rb') as foto:
+            self.assertNotEqual(foto.read(), jpeg((90, 90, 90), (320, 240)))
+
+    def test_lote_invalido(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertEqual(self.client.post(self.url, {'itens': '{'}).status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'itens': '{"id": 1}'}).status_code, 400)
+        itens = [self._item(str(i), 'entrada', self.entrada_em, 1000) for i in range(21)]
+        self.assertEqual(self.client.post(self.url, {'itens': json.dumps(itens)}).status_code, 400)
+
+    def test_so_motoristas(self):
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        item = self._item('1', 'entrada', self.entrada_em.astimezone(dt_timezone.utc), 1000)
+        self.assertEqual(self.client.post(self.url, {'itens': json.dumps([item])}).status_code, 403)
@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ponto import telemetria
+from ponto.models import LeituraTelemetria, TokenTelemetria, Veiculo
+
+
+class TelemetriaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Veiculo.objects.create(placa='ABC1D23', modelo='Fiorino', cor='Branco')
+
+    def _erros(self, **campos):
+        item = {'placa': 'abc-1d23', 'data_hora': '2026-10-01T08:00:00-03:00', 'km_odometro': 125000}
+        item.update(campos)
+        leituras, erros = telemetria.validar([item])
+        return [erro['erro'] for erro in erros], leituras
+
+    def test_leitura_valida(self):
+        erros, leituras = self._erros(nivel_combustivel='80')
+        self.assertEqual(erros, [])
+        self.assertEqual((leituras[0].km_odometro, leituras[0].nivel_combustivel), (125000, 80))
+
+    def test_rejeita_fora_da_faixa(self):
+        casos = {
+            'km negativo': {'km_odometro': -1},
+            'km acima do inteiro do banco': {'km_odometro': telemetria.KM_MAXIMO + 1},
+            'km não numérico': {'km_odometro': '12a'},
+            'combustível acima de 100': {'nivel_combustivel': 101},
+            'combustível negativo': {'nivel_combustivel': -5},
+            'placa desconhecida': {'placa': 'ZZZ9999'},
+            'data inválida': {'data_hora': '2026-13-01T08:00:00'},
+            'data no futuro': {'data_hora': (timezone.now() + timedelta(hours=1)).isoformat()},
+        }
+        for caso, campos in casos.items():
+            with self.subTest(caso):
+                erros, leituras = self._erros(**campos)
+                self.assertEqual(len(erros), 1)
+                self.assertEqual(leituras, [])
+
+    def test_erros_indicam_a_posicao(self):
+        itens = [
+            {'placa': 'ABC1D23', 'data_hora': '2026-10-01T08:00:00', 'km_odometro': 100},
+            {'placa': 'ABC1D23', 'data_hora': '2026-10-01T09:00:00', 'km_odometro': 2 ** 31},
+        ]
+        leituras, erros = telemetria.validar(itens)
+        self.assertEqual(len(leituras), 1)
+        self.assertEqual(erros, [{'item': 2, 'erro': 'km_odometro fora da faixa permitida'}])
+
+    def test_lote_mal_formado(self):
+        for conteudo in (b'{', b'{"leituras": 3}', b'[1, 2]'):
+            with self.subTest(conteudo=conteudo), self.assertRaises(telemetria.LoteInvalido):
+                telemetria.ler_json(conteudo)
+
+
+class ApiTelemetriaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.veiculo = Veiculo.objects.create(placa='ABC1D23', modelo='Fiorino', cor='Branco')
+        _, cls.chave = TokenTelemetria.gerar('rastreador')
+
+    def _enviar(self, corpo, content_type='application/json', chave=None):
+        return self.client.post(
+            reverse('api_telemetria'), corpo, content_type=content_type,
+            HTTP_AUTHORIZATION=f'Token {chave or self.chave}',
+        )
+
+    def test_token_obrigatorio(self):
+        self.assertEqual(self._enviar('[]', chave='errada').status_code, 401)
+
+    def test_lote_json_ignora_repetidas_e_atualiza_veiculo(self):
+        lote = json.dumps({'leituras': [
+            {'placa': 'ABC1D23', 'data_hora': '2026-10-01T08:00:00-03:00', 'km_odometro': 1000},
+            {'placa': 'ABC1D23', 'data_hora': '2026-10-01T09:00:00-03:00', 'km_odometro': 1050, 'nivel_combustivel': 70},
+            {'placa': 'ABC1D23', 'data_hora': '2026-10-01T10:00:00-03:00', 'km_odometro': -5},
+        ]})
+        dados = self._enviar(lote).json()
+        self.assertEqual((dados['recebidas'], dados['inseridas'], dados['total_erros']), (3, 2, 1))
+        self.assertEqual(dados['erros'], [{'item': 3, 'erro': 'km_odometro fora da faixa permitida'}])
+
+        self.assertEqual(self._enviar(lote).json()['repetidas'], 2)
+        self.assertEqual(LeituraTelemetria.objects.count(), 2)
+        self.veiculo.refresh_from_db()
+        self.assertEqual((self.veiculo.ultimo_km, self.veiculo.ultimo_nivel_combustivel), (1050, 70))
+
+    def test_lote_csv(self):
+        csv = 'placa,data_hora,km_odometro,nivel_combustivel\nABC1D23,2026-10-01T08:00:00,1000,\n'
+        dados = self._enviar(csv.encode(), content_type='text/csv').json()
+        self.assertEqual(dados['inseridas'], 1)
+        leitura = LeituraTelemetria.objects.get()
+        self.assertIsNone(leitura.nivel_combustivel)
+        self.assertEqual(timezone.localtime(leitura.data_hora).hour, 8)
+
+    def test_csv_sem_colunas(self):
+        resposta = self._enviar(b'placa,km_odometro\nABC1D23,10\n', content_type='text/csv')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('data_hora', resposta.json()['error'])
@@ -13,6 +13,13 @@ urlpatterns = [
     # Registro de ponto
     path('registrar/<str:tipo>/', views.registrar_ponto, name='registrar_ponto'),
     
+    # App offline do motorista (PWA)
+    path('motorista/sincronizar/', views.sincronizar_registros, name='sincronizar_registros'),
+    path('sw.js', views.service_worker, name='service_worker'),
+    
+    # Telemetria dos veículos (autenticada por token)
+    path('api/telemetria/', views.api_telemetria, name='api_telemetria'),
+    
     # Administração - Motoristas
     path('admin/motoristas/', views.listar_motoristas, name='listar_motoristas'),
     path('admin/motoristas/cadastrar/', views.cadastrar_motorista, name='cadastrar_motorista'),
@@ -32,14 +39,27 @@ urlpatterns = [
     path('admin/relatorios/', views.relatorio_ponto, name='relatorio_ponto'),
     path('admin/relatorios/gerar/', views.gerar_relatorio, name='gerar_relatorio'),
     path('admin/relatorio/exportar/', views.exportar_relatorio_excel, name='exportar_relatorio_excel'),
+    path('admin/relatorio/exportar/pacote/', views.exportar_relatorio_pacote, name='exportar_relatorio_pacote'),
+    path('admin/anomalias/', views.relatorio_anomalias, name='anomalias'),
+    path('admin/eficiencia/', views.eficiencia_combustivel, name='eficiencia_combustivel'),
+    path('admin/localizacao/', views.localizacao_registros, name='localizacao_registros'),
+    path('admin/busca/', views.busca_geral, name='busca'),
+    path('metrics', views.exportar_metricas, name='metricas'),
+    path('admin/perfis/', views.listar_perfis, name='listar_perfis'),
+    path('admin/perfis/<str:nome>/', views.baixar_perfil, name='baixar_perfil'),
     
     # Registros
     path('admin/registros/', views.listar_registros, name='listar_registros'),
+    path('admin/registros/fotos.zip', views.baixar_fotos_registros, name='baixar_fotos_registros'),
     path('admin/registros/<int:id>/', views.detalhe_registro_html, name='detalhe_registro_html'),
-    path('admin/registros/<int:id>/', views.detalhe_registro, name='detalhe_registro'),
     path('admin/registros/<int:id>/fotos/', views.api_registro_fotos, name='api_registro_fotos'),
 
     
+    # Fotos (acesso autenticado)
+    path('fotos/<int:id>/<str:campo>/', views.foto_registro, name='foto_registro'),
+    
     # APIs
     path('admin/api/status-motoristas-hoje/', views.api_status_motoristas_hoje, name='api_status_motoristas_hoje'),
+    path('admin/api/tendencias-mercados/', views.api_tendencias_mercados, name='api_tendencias_mercados'),
+    path('admin/api/registros/<int:id>/', views.detalhe_registro, name='detalhe_registro'),
 ]
\ No newline at end of file
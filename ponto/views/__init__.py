@@ -0,0 +1,43 @@
+"""
+Views da app ``ponto``, separadas por área (autenticação, motorista,
+administração, relatórios, exportação, APIs, arquivos e diagnóstico).
+
+Bibliotecas pesadas (Pillow, openpyxl, NumPy) são importadas dentro das views
+que as usam, para não pesar no boot de cada worker; confira com
+``python manage.py medir_importacao``.
+"""
+from .autenticacao import login_view, logout_view
+from .motorista import motorista_dashboard, registrar_ponto, sincronizar_registros, service_worker
+from .administracao import (
+    admin_dashboard,
+    listar_motoristas,
+    cadastrar_motorista,
+    editar_motorista,
+    listar_veiculos,
+    cadastrar_veiculo,
+    editar_veiculo,
+    listar_mercados,
+    cadastrar_mercado,
+    editar_mercado,
+    listar_registros,
+    baixar_fotos_registros,
+    detalhe_registro_html,
+    busca_geral,
+)
+from .relatorios import (
+    relatorio_ponto,
+    gerar_relatorio,
+    relatorio_anomalias,
+    eficiencia_combustivel,
+    localizacao_registros,
+)
+from .exportacao import exportar_relatorio, exportar_relatorio_excel, exportar_relatorio_pacote
+from .api import (
+    detalhe_registro,
+    api_status_motoristas_hoje,
+    api_tendencias_mercados,
+    api_registro_fotos,
+    api_telemetria,
+)
+from .arquivos import foto_registro, arquivo_estatico
+from .diagnostico import exportar_metricas, listar_perfis, baixar_perfil
@@ -0,0 +1,319 @@
+"""Painel administrativo: dashboard, cadastros, registros e busca"""
+import logging
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+
+from ..models import Motorista, Veiculo, Mercado, RegistroPonto
+from ..forms import MotoristaForm, VeiculoForm, MercadoForm
+from ..estatisticas import obter_estatisticas
+from .. import busca, pacote_fotos
+from ..roteamento import leitura_replica
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# DASHBOARD
+# =====================
+
+@login_required
+def admin_dashboard(request):
+    """Dashboard administrativo"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    # Estatísticas gerais (contadores em cache, mantidos por sinais)
+    context = obter_estatisticas()
+    
+    return render(request, 'ponto/admin/admin_dashboard.html', context)
+
+# =====================
+# CADASTROS
+# =====================
+
+@login_required
+def listar_motoristas(request):
+    """Lista todos os motoristas"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    motoristas = Motorista.objects.select_related(
+        'user', 'veiculo', 'mercado'
+    ).order_by('nome_completo')
+    
+    return render(request, 'ponto/admin/motoristas.html', {
+        'motoristas': motoristas
+    })
+
+@login_required
+def cadastrar_motorista(request):
+    """Cadastra novo motorista"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    if request.method == 'POST':
+        form = MotoristaForm(request.POST)
+        if form.is_valid():
+            # Criar usuário
+            user = User.objects.create_user(
+                username=form.cleaned_data['username'],
+                password=form.cleaned_data['password'],
+                first_name=form.cleaned_data['nome_completo'].split()[0],
+                last_name=' '.join(form.cleaned_data['nome_completo'].split()[1:])
+            )
+            
+            # Criar motorista
+            motorista = form.save(commit=False)
+            motorista.user = user
+            motorista.save()
+            
+            messages.success(request, 'Motorista cadastrado com sucesso!')
+            return redirect('listar_motoristas')
+    else:
+        form = MotoristaForm()
+    
+    return render(request, 'ponto/admin/cadastrar_motorista.html', {
+        'form': form
+    })
+
+@login_required
+def editar_motorista(request, id):
+    """Edita motorista existente"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    motorista = get_object_or_404(Motorista, id=id)
+    
+    if request.method == 'POST':
+        form = MotoristaForm(request.POST, instance=motorista)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Motorista atualizado com sucesso!')
+            return redirect('listar_motoristas')
+    else:
+        form = MotoristaForm(instance=motorista)
+    
+    return render(request, 'ponto/admin/editar_motorista.html', {
+        'form': form,
+        'motorista': motorista
+    })
+
+@login_required
+def listar_veiculos(request):
+    """Lista todos os veículos"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    veiculos = Veiculo.objects.order_by('placa')
+    
+    return render(request, 'ponto/admin/veiculos.html', {
+        'veiculos': veiculos
+    })
+
+@login_required
+def cadastrar_veiculo(request):
+    """Cadastra novo veículo"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    if request.method == 'POST':
+        form = VeiculoForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Veículo cadastrado com sucesso!')
+            return redirect('listar_veiculos')
+    else:
+        form = VeiculoForm()
+    
+    return render(request, 'ponto/admin/cadastrar_veiculo.html', {
+        'form': form
+    })
+
+@login_required
+def editar_veiculo(request, id):
+    """Edita veículo existente"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    veiculo = get_object_or_404(Veiculo, id=id)
+    
+    if request.method == 'POST':
+        form = VeiculoForm(request.POST, instance=veiculo)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Veículo atualizado com sucesso!')
+            return redirect('listar_veiculos')
+    else:
+        form = VeiculoForm(instance=veiculo)
+    
+    return render(request, 'ponto/admin/editar_veiculo.html', {
+        'form': form,
+        'veiculo': veiculo
+    })
+
+@login_required
+def listar_mercados(request):
+    """Lista todos os mercados"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    mercados = Mercado.objects.order_by('nome')
+    
+    return render(request, 'ponto/admin/mercados.html', {
+        'mercados': mercados
+    })
+
+@login_required
+def cadastrar_mercado(request):
+    """Cadastra novo mercado"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    if request.method == 'POST':
+        form = MercadoForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Mercado cadastrado com sucesso!')
+            return redirect('listar_mercados')
+    else:
+        form = MercadoForm()
+    
+    return render(request, 'ponto/admin/cadastrar_mercado.html', {
+        'form': form
+    })
+
+@login_required
+def editar_mercado(request, id):
+    """Edita mercado existente"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    mercado = get_object_or_404(Mercado, id=id)
+    
+    if request.method == 'POST':
+        form = MercadoForm(request.POST, instance=mercado)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Mercado atualizado com sucesso!')
+            return redirect('listar_mercados')
+    else:
+        form = MercadoForm(instance=mercado)
+    
+    return render(request, 'ponto/admin/editar_mercado.html', {
+        'form': form,
+        'mercado': mercado
+    })
+
+# =====================
+# REGISTROS E BUSCA
+# =====================
+
+def _filtrar_registros(request):
+    """Registros conforme os filtros da listagem (GET): motorista, mercado, período e tipo"""
+    filtros = {
+        'motorista_id': request.GET.get('motorista'),
+        'mercado_id': request.GET.get('mercado'),
+        'data_inicio': request.GET.get('data_inicio'),
+        'data_fim': request.GET.get('data_fim'),
+        'tipo': request.GET.get('tipo'),
+    }
+    registros = RegistroPonto.objects.all()
+    
+    if filtros['motorista_id']:
+        registros = registros.filter(motorista_id=filtros['motorista_id'])
+    
+    if filtros['mercado_id']:
+        registros = registros.filter(motorista__mercado_id=filtros['mercado_id'])
+    
+    registros = registros.no_periodo(filtros['data_inicio'], filtros['data_fim'])
+    
+    if filtros['tipo']:
+        registros = registros.filter(tipo=filtros['tipo'])
+    
+    return registros, filtros
+
+@login_required
+def listar_registros(request):
+    """Lista todos os registros com filtros"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    registros, filtros = _filtrar_registros(request)
+    registros = registros.select_related(
+        'motorista', 'motorista__veiculo', 'motorista__mercado'
+    ).order_by('-data_hora')
+    
+    # Paginação
+    from django.core.paginator import Paginator
+    paginator = Paginator(registros, 25)  # 25 registros por página
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    motoristas = Motorista.objects.filter(ativo=True).order_by('nome_completo')
+    mercados = Mercado.objects.filter(ativo=True).order_by('nome')
+    
+    return render(request, 'ponto/admin/registros.html', {
+        'page_obj': page_obj,
+        'motoristas': motoristas,
+        'mercados': mercados,
+        'filtros': filtros,
+    })
+
+@login_required
+@leitura_replica
+def baixar_fotos_registros(request):
+    """ZIP com as fotos dos registros filtrados (mesmos filtros da listagem) e um manifesto CSV"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        return HttpResponse('Acesso negado', status=403)
+    
+    registros, _ = _filtrar_registros(request)
+    logger.info('Pacote de fotos para auditoria', extra={
+        'filtros': request.GET.dict(),
+        'usuario': request.user.get_username(),
+    })
+    return pacote_fotos.resposta(registros)
+
+@login_required
+def detalhe_registro_html(request, id):
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+
+    registro = get_object_or_404(RegistroPonto, id=id)
+
+    return render(request, 'ponto/admin/detalhe_registro.html', {
+        'registro': registro
+    })
+
+@login_required
+@leitura_replica
+def busca_geral(request):
+    """Busca de motoristas, veículos e observações de registros (caixa de busca do painel)"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    termo = request.GET.get('q', '').strip()
+    resultados = busca.buscar(termo)
+    
+    return render(request, 'ponto/admin/busca.html', {
+        'termo': termo,
+        'resultados': resultados,
+        'total': sum(len(lista) for lista in resultados.values()),
+        'minimo': busca.TAMANHO_MINIMO,
+    })
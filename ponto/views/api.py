@@ -0,0 +1,157 @@
+"""APIs JSON do painel e ingestão de telemetria"""
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+
+from ..models import Motorista, RegistroPonto
+from .. import resumos, telemetria
+from ..roteamento import leitura_replica
+from ..permissoes import staff_api, token_telemetria
+
+
+@login_required
+@staff_api
+@leitura_replica
+async def detalhe_registro(request, id):
+    """API endpoint para detalhes do registro"""
+    try:
+        registro = await RegistroPonto.objects.select_related(
+            'motorista', 'motorista__veiculo'
+        ).aget(id=id)
+    except RegistroPonto.DoesNotExist:
+        return JsonResponse({'error': 'Registro não encontrado'}, status=404)
+    
+    km_rodados = horas_trabalhadas = 0
+    if registro.tipo == 'saida':
+        entrada = await registro.aget_registro_par()
+        if entrada:
+            km_rodados = registro.calcular_km_rodados(entrada)
+            horas_trabalhadas = round(registro.calcular_horas_trabalhadas(entrada), 2)
+    
+    data = {
+        'success': True,
+        'registro': {
+            'motorista': registro.motorista.nome_completo,
+            'tipo': registro.get_tipo_display(),
+            'data_hora': timezone.localtime(registro.data_hora).strftime('%d/%m/%Y %H:%M'),
+            'veiculo': str(registro.motorista.veiculo),
+            'km_odometro': registro.km_odometro,
+            'nivel_combustivel': registro.nivel_combustivel,
+            'observacoes': registro.observacoes or '',
+            'km_rodados': km_rodados,
+            'horas_trabalhadas': horas_trabalhadas
+        }
+    }
+    
+    return JsonResponse(data)
+
+@login_required
+@staff_api
+@leitura_replica
+async def api_status_motoristas_hoje(request):
+    """API endpoint para status dos motoristas hoje"""
+    hoje = timezone.localdate()
+    
+    # Registros de hoje de todos os motoristas em uma única consulta
+    entradas, saidas = {}, {}
+    async for motorista_id, tipo, data_hora in RegistroPonto.objects.do_dia(hoje).order_by(
+        'data_hora'
+    ).values_list('motorista_id', 'tipo', 'data_hora'):
+        registros = entradas if tipo == 'entrada' else saidas
+        registros.setdefault(motorista_id, timezone.localtime(data_hora).strftime('%H:%M'))
+    
+    dados_motoristas = []
+    
+    async for motorista in Motorista.objects.filter(ativo=True).select_related('veiculo', 'mercado'):
+        entrada_hoje = entradas.get(motorista.id)
+        saida_hoje = saidas.get(motorista.id)
+        
+        if entrada_hoje and saida_hoje:
+            status = 'finalizado'
+        elif entrada_hoje:
+            status = 'trabalhando'
+        else:
+            status = 'nao_iniciou'
+        
+        dados_motoristas.append({
+            'id': motorista.id,
+            'nome': motorista.nome_completo,
+            'veiculo': str(motorista.veiculo),
+            'mercado': motorista.mercado.nome,
+            'status': status,
+            'entrada_hoje': entrada_hoje,
+            'saida_hoje': saida_hoje,
+        })
+    
+    return JsonResponse({
+        'success': True,
+        'motoristas': dados_motoristas
+    })
+
+@login_required
+@staff_api
+@leitura_replica
+def api_tendencias_mercados(request):
+    """API endpoint com séries diárias por mercado (lidas do resumo diário)"""
+    try:
+        dias = min(max(int(request.GET.get('dias', 30)), 1), 366)
+    except ValueError:
+        return JsonResponse({'error': 'Parâmetro dias inválido'}, status=400)
+    
+    mercado_id = request.GET.get('mercado') or None
+    
+    return JsonResponse({
+        'success': True,
+        **resumos.tendencias(dias, mercado_id),
+    })
+
+@login_required
+@staff_api
+@leitura_replica
+async def api_registro_fotos(request, id):
+    """API endpoint para fotos do registro"""
+    try:
+        registro = await RegistroPonto.objects.aget(id=id)
+    except RegistroPonto.DoesNotExist:
+        return JsonResponse({'error': 'Registro não encontrado'}, status=404)
+    
+    data = {
+        'success': True,
+        'fotos': {
+            'odometro': registro.url_foto_odometro,
+            'combustivel': registro.url_foto_combustivel,
+        }
+    }
+    
+    return JsonResponse(data)
+
+@csrf_exempt
+@token_telemetria
+def api_telemetria(request):
+    """Recebe um lote de leituras de odômetro/combustível (JSON ou CSV)"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    
+    tamanho = int(request.META.get('CONTENT_LENGTH') or 0)
+    if tamanho > settings.TELEMETRIA_MAX_BYTES:
+        return JsonResponse({'error': 'Lote muito grande'}, status=413)
+    
+    # Lido direto do stream: o limite acima substitui DATA_UPLOAD_MAX_MEMORY_SIZE
+    try:
+        itens = telemetria.ler_lote(request.read(settings.TELEMETRIA_MAX_BYTES), request.content_type)
+    except telemetria.LoteInvalido as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    leituras, erros = telemetria.validar(itens)
+    inseridas = telemetria.inserir(leituras)
+    
+    return JsonResponse({
+        'success': True,
+        'recebidas': len(itens),
+        'inseridas': inseridas,
+        'repetidas': len(leituras) - inseridas,
+        'total_erros': len(erros),
+        'erros': erros[:telemetria.MAX_ERROS_RESPOSTA],
+    })
@@ -0,0 +1,127 @@
+"""Fotos protegidas dos registros e arquivos estáticos"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import HttpResponse, HttpResponseRedirect, FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from ..models import RegistroPonto
+from .. import arquivamento, estaticos
+
+
+# =====================
+# MÍDIA PROTEGIDA
+# =====================
+
+# Fotos não mudam depois de gravadas (o nome é único por upload)
+CACHE_FOTO = 'private, max-age=31536000, immutable'
+
+def _resposta_foto_em_disco(request, foto):
+    """Resposta para foto no storage: cabeçalho para o servidor web ou FileResponse"""
+    storage = foto.storage
+    modificado = storage.get_modified_time(foto.name)
+    tamanho = storage.size(foto.name)
+    etag = f'"{tamanho:x}-{int(modificado.timestamp()):x}"'
+    ultima_modificacao = http_date(modificado.timestamp())
+
+    # 304 sem abrir o arquivo quando o navegador já tem a foto
+    nao_modificado = get_conditional_response(
+        request, etag=etag, last_modified=modificado.timestamp()
+    )
+    if nao_modificado is not None:
+        response = nao_modificado
+    elif settings.MEDIA_SERVIDOR_ARQUIVOS == 'nginx':
+        response = HttpResponse(content_type='')
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIXO + quote(foto.name)
+    elif settings.MEDIA_SERVIDOR_ARQUIVOS == 'apache':
+        response = HttpResponse(content_type='')
+        response['X-Sendfile'] = storage.path(foto.name)
+    else:
+        response = FileResponse(storage.open(foto.name, 'rb'))
+
+    response['ETag'] = etag
+    response['Last-Modified'] = ultima_modificacao
+    response['Cache-Control'] = CACHE_FOTO
+    return response
+
+def _redirecionar_para_storage(foto):
+    """Redireciona para a URL assinada: o navegador baixa a foto direto do bucket"""
+    response = HttpResponseRedirect(foto.url)
+    # O redirecionamento só vale enquanto a assinatura vale
+    validade = max(foto.storage.expiracao_url - 60, 0)
+    response['Cache-Control'] = f'private, max-age={validade}'
+    return response
+
+@login_required
+def foto_registro(request, id, campo):
+    """Serve a foto de um registro para administradores ou para o próprio motorista"""
+    if campo not in arquivamento.CAMPOS_FOTO:
+        raise Http404
+
+    registro = get_object_or_404(
+        RegistroPonto.objects.select_related('motorista'), id=id
+    )
+    e_admin = request.user.is_superuser or request.user.is_staff
+    if not (e_admin or registro.motorista.user_id == request.user.id):
+        return HttpResponse('Acesso negado', status=403)
+
+    foto = getattr(registro, campo)
+    if not foto:
+        raise Http404
+
+    if registro.arquivado:
+        # Fotos arquivadas saem de dentro do pacote mensal
+        try:
+            response = FileResponse(arquivamento.ler_foto(registro, campo), content_type='image/jpeg')
+        except FileNotFoundError:
+            raise Http404
+        response['Cache-Control'] = CACHE_FOTO
+        return response
+
+    if getattr(foto.storage, 'entrega_direta', False):
+        return _redirecionar_para_storage(foto)
+
+    try:
+        return _resposta_foto_em_disco(request, foto)
+    except FileNotFoundError:
+        raise Http404
+
+# =====================
+# ARQUIVOS ESTÁTICOS
+# =====================
+
+def arquivo_estatico(request, caminho):
+    """
+    Arquivo de STATIC_ROOT na versão .br/.gz aceita pelo navegador, com cache
+    de um ano para os nomes com hash. Usado sem servidor web na frente (com
+    nginx, /static/ nem chega ao Django).
+    """
+    try:
+        arquivo = safe_join(settings.STATIC_ROOT, caminho)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(arquivo):
+        raise Http404
+
+    modificado = os.path.getmtime(arquivo)
+    nao_modificado = get_conditional_response(request, last_modified=modificado)
+    if nao_modificado is not None:
+        response = nao_modificado
+    else:
+        enviado, codificacao = estaticos.arquivo_para(arquivo, request.headers.get('Accept-Encoding', ''))
+        tipo = mimetypes.guess_type(arquivo)[0] or 'application/octet-stream'
+        response = FileResponse(open(enviado, 'rb'), content_type=tipo)
+        if codificacao:
+            response['Content-Encoding'] = codificacao
+
+    response['Last-Modified'] = http_date(modificado)
+    response['Cache-Control'] = estaticos.cache_control(caminho)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
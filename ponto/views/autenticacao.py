@@ -0,0 +1,31 @@
+"""Login e logout"""
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render, redirect
+
+
+def login_view(request):
+    if request.method == 'POST':
+        username = request.POST['username']
+        password = request.POST['password']
+        
+        user = authenticate(request, username=username, password=password)
+        if user:
+            login(request, user)
+            
+            # Redirecionar baseado no tipo de usuário
+            if user.is_superuser or user.is_staff:
+                return redirect('admin_dashboard')
+            else:
+                return redirect('motorista_dashboard')
+        else:
+            messages.error(request, 'Usuário ou senha inválidos!')
+    
+    return render(request, 'ponto/login.html')
+
+@login_required
+def logout_view(request):
+    logout(request)
+    messages.success(request, 'Logout realizado com sucesso!')
+    return redirect('login')
@@ -0,0 +1,58 @@
+"""Diagnóstico de desempenho: métricas do Prometheus e perfis de requisições"""
+import hmac
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import render, redirect
+
+from .. import metricas, perfil
+
+
+def exportar_metricas(request):
+    """Métricas no formato texto do Prometheus (token de METRICAS_TOKEN ou staff logado)"""
+    if settings.METRICAS_TOKEN:
+        recebido = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        autorizado = hmac.compare_digest(recebido.encode(), settings.METRICAS_TOKEN.encode())
+    else:
+        autorizado = request.user.is_authenticated and (request.user.is_superuser or request.user.is_staff)
+    if not autorizado:
+        return HttpResponse('Acesso negado', status=403)
+    
+    conteudo, tipo = metricas.coletar()
+    return HttpResponse(conteudo, content_type=tipo)
+
+@login_required
+def listar_perfis(request):
+    """Perfis gravados (mais recentes primeiro), com link para download"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    return render(request, 'ponto/admin/perfis.html', {
+        'perfis': perfil.listar(),
+        'ativo': settings.PERFIL_ATIVO,
+        'amostra': settings.PERFIL_AMOSTRA,
+        'urls': settings.PERFIL_URLS,
+        'min_ms': settings.PERFIL_MIN_MS,
+    })
+
+@login_required
+def baixar_perfil(request, nome):
+    """Arquivo .prof (pstats) ou, com ?formato=texto, as funções mais custosas"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        return HttpResponse('Acesso negado', status=403)
+    
+    arquivo = perfil.caminho(nome)
+    if arquivo is None:
+        raise Http404
+    
+    if request.GET.get('formato') == 'texto':
+        ordem = request.GET.get('ordem', 'cumulative')
+        if ordem not in ('cumulative', 'tottime', 'calls'):
+            ordem = 'cumulative'
+        return HttpResponse(perfil.resumo(nome, ordem=ordem), content_type='text/plain; charset=utf-8')
+    
+    return FileResponse(open(arquivo, 'rb'), as_attachment=True, filename=nome,
+                        content_type='application/octet-stream')
@@ -0,0 +1,206 @@
+"""Exportação de relatórios em Excel (openpyxl carregado só ao exportar)"""
+from datetime import datetime
+import json
+import logging
+import time
+from collections import defaultdict
+
+from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from ..models import RegistroPonto
+from .. import metricas, planilhas
+from ..roteamento import leitura_replica
+
+logger = logging.getLogger(__name__)
+
+
+@login_required
+def exportar_relatorio(request):
+    """Exporta relatório em Excel"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        return JsonResponse({'error': 'Acesso negado'}, status=403)
+    
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    
+    try:
+        import openpyxl
+        from django.http import HttpResponse
+        from openpyxl.styles import Font, PatternFill, Alignment
+        
+        data = json.loads(request.body)
+        
+        # Criar workbook
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Relatório de Ponto"
+        
+        # Cabeçalhos
+        headers = [
+            'Data', 'Motorista', 'CPF', 'Veículo', 'Mercado',
+            'Entrada', 'Saída', 'Horas Trabalhadas', 'KM Rodados', 'Valor Dia'
+        ]
+        
+        # Estilo do cabeçalho
+        header_font = Font(bold=True, color='FFFFFF')
+        header_fill = PatternFill(start_color='2563eb', end_color='2563eb', fill_type='solid')
+        
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=col, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = Alignment(horizontal='center')
+        
+        # Dados (implementar busca de dados conforme gerar_relatorio)
+        # ...
+        
+        # Preparar response
+        response = HttpResponse(
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+        response['Content-Disposition'] = f'attachment; filename=relatorio_ponto_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
+        
+        wb.save(response)
+        return response
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def _registros_filtrados(request):
+    """Registros do relatório conforme os filtros da requisição GET"""
+    data_inicio = request.GET.get('data_inicio', '').strip()
+    data_fim = request.GET.get('data_fim', '').strip()
+    motorista_id = request.GET.get('motorista')
+    veiculo_id = request.GET.get('veiculo')
+
+    registros_query = RegistroPonto.objects.all()
+
+    # Aplicar filtros de data somente se válidos
+    registros_query = registros_query.no_periodo(data_inicio, data_fim)
+
+    if motorista_id:
+        registros_query = registros_query.filter(motorista_id=motorista_id)
+    if veiculo_id:
+        registros_query = registros_query.filter(motorista__veiculo_id=veiculo_id)
+
+    return registros_query.select_related('motorista', 'motorista__veiculo', 'motorista__mercado').order_by('motorista', 'data_hora')
+
+
+def _linhas_relatorio(registros_query):
+    """(motorista, linha da planilha) por motorista e dia, com entrada e saída lado a lado"""
+    temp = defaultdict(lambda: {'entrada': None, 'saida': None, 'registro_entrada': None, 'registro_saida': None})
+
+    for reg in registros_query:
+        # Dia e horas no fuso local (o banco guarda em UTC)
+        data_hora = timezone.localtime(reg.data_hora)
+        chave = (reg.motorista.id, data_hora.date())
+        if reg.tipo == 'entrada':
+            temp[chave]['entrada'] = data_hora
+            temp[chave]['registro_entrada'] = reg
+        else:
+            temp[chave]['saida'] = data_hora
+            temp[chave]['registro_saida'] = reg
+
+    for reg in temp.values():
+        motor = reg['registro_entrada'].motorista if reg['registro_entrada'] else (reg['registro_saida'].motorista if reg['registro_saida'] else None)
+        data = reg['entrada'].date() if reg['entrada'] else (reg['saida'].date() if reg['saida'] else '')
+        entrada_hora = reg['entrada'].strftime('%H:%M') if reg['entrada'] else ''
+        saida_hora = reg['saida'].strftime('%H:%M') if reg['saida'] else ''
+        horas_trabalhadas = ''
+        km_rodados = ''
+        valor_dia = ''
+
+        if reg['registro_entrada'] and reg['registro_saida']:
+            # O par já está em memória: evita uma consulta por linha
+            par = reg['registro_entrada']
+            horas_trabalhadas = round(reg['registro_saida'].calcular_horas_trabalhadas(par), 2)
+            km_rodados = round(reg['registro_saida'].calcular_km_rodados(par), 2)
+            valor_dia = float(motor.valor_dia) if motor and motor.valor_dia else ''
+
+        yield motor, (
+            motor.nome_completo if motor else '',
+            motor.cpf if motor else '',
+            str(motor.veiculo) if motor and motor.veiculo else '',
+            motor.mercado.nome if motor and motor.mercado else '',
+            data,
+            entrada_hora,
+            saida_hora,
+            horas_trabalhadas,
+            km_rodados,
+            valor_dia,
+        )
+
+
+@login_required
+@leitura_replica
+def exportar_relatorio_excel(request):
+    if not (request.user.is_superuser or request.user.is_staff):
+        return HttpResponse('Acesso negado', status=403)
+
+    inicio = time.perf_counter()
+
+    linhas = [linha for _, linha in _linhas_relatorio(_registros_filtrados(request))]
+    conteudo = planilhas.montar_planilha(linhas)
+
+    response = HttpResponse(conteudo, content_type=planilhas.CONTENT_TYPE_XLSX)
+    filename = f"relatorio_ponto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    duracao = time.perf_counter() - inicio
+    metricas.EXPORTACAO_SEGUNDOS.labels('excel').observe(duracao)
+    metricas.EXPORTACAO_LINHAS.labels('excel').observe(len(linhas))
+    logger.info('Relatório Excel exportado', extra={
+        'linhas': len(linhas),
+        'bytes': len(conteudo),
+        'duracao_ms': round(duracao * 1000, 1),
+        'usuario': request.user.get_username(),
+    })
+    return response
+
+
+AGRUPAMENTOS = ('mercado', 'motorista')
+
+
+@login_required
+@leitura_replica
+def exportar_relatorio_pacote(request):
+    """ZIP com uma planilha por mercado ou por motorista, montadas em paralelo"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        return HttpResponse('Acesso negado', status=403)
+
+    agrupar = request.GET.get('agrupar', 'mercado')
+    if agrupar not in AGRUPAMENTOS:
+        return HttpResponse('Agrupamento inválido', status=400)
+
+    inicio = time.perf_counter()
+
+    # Consulta e agrupamento aqui (os processos do pool não acessam o banco)
+    grupos = defaultdict(list)
+    for motor, linha in _linhas_relatorio(_registros_filtrados(request)):
+        if agrupar == 'mercado':
+            nome = motor.mercado.nome if motor and motor.mercado else 'Sem mercado'
+        else:
+            nome = f'{motor.nome_completo} {motor.cpf}' if motor else 'Sem motorista'
+        grupos[nome].append(linha)
+    total_linhas = sum(len(linhas) for linhas in grupos.values())
+
+    def conteudo():
+        yield from planilhas.gerar_zip(grupos, settings.EXPORTACAO_PROCESSOS)
+        duracao = time.perf_counter() - inicio
+        metricas.EXPORTACAO_SEGUNDOS.labels('pacote').observe(duracao)
+        metricas.EXPORTACAO_LINHAS.labels('pacote').observe(total_linhas)
+        logger.info('Pacote de planilhas exportado', extra={
+            'agrupar': agrupar,
+            'planilhas': len(grupos),
+            'linhas': total_linhas,
+            'duracao_ms': round(duracao * 1000, 1),
+            'usuario': request.user.get_username(),
+        })
+
+    response = StreamingHttpResponse(conteudo(), content_type='application/zip')
+    filename = f"relatorio_ponto_por_{agrupar}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,366 @@
+"""Páginas do motorista: painel, registro de ponto e sincronização do app offline"""
+from datetime import timedelta
+import io
+import json
+import logging
+import time
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Motorista, RegistroPonto
+from ..forms import RegistroPontoForm
+from .. import metricas, odometro
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# PAINEL DO MOTORISTA
+# =====================
+
+@login_required
+def motorista_dashboard(request):
+    """Dashboard do motorista"""
+    try:
+        motorista = request.user.motorista
+    except Motorista.DoesNotExist:
+        messages.error(request, 'Usuário não está associado a um motorista!')
+        return redirect('login')
+    
+    # Registro de hoje
+    hoje = timezone.localdate()
+    entrada_hoje = RegistroPonto.objects.do_dia(hoje).filter(
+        motorista=motorista,
+        tipo='entrada'
+    ).first()
+    
+    saida_hoje = RegistroPonto.objects.do_dia(hoje).filter(
+        motorista=motorista,
+        tipo='saida'
+    ).first()
+    
+    # Últimos registros
+    ultimos_registros = RegistroPonto.objects.filter(
+        motorista=motorista
+    ).order_by('-data_hora')[:5]
+    
+    context = {
+        'motorista': motorista,
+        'entrada_hoje': entrada_hoje,
+        'saida_hoje': saida_hoje,
+        'ultimos_registros': ultimos_registros,
+        'pode_entrada': not entrada_hoje,
+        'pode_saida': entrada_hoje and not saida_hoje,
+    }
+    
+    return render(request, 'ponto/motorista_dashboard.html', context)
+
+# =====================
+# REGISTRO DE PONTO
+# =====================
+
+@login_required
+def registrar_ponto(request, tipo):
+    """Registra ponto de entrada ou saída"""
+    if tipo not in ['entrada', 'saida']:
+        messages.error(request, 'Tipo de registro inválido!')
+        return redirect('motorista_dashboard')
+    
+    try:
+        motorista = request.user.motorista
+    except Motorista.DoesNotExist:
+        messages.error(request, 'Usuário não está associado a um motorista!')
+        return redirect('login')
+    
+    # Validações
+    erro = validar_registro(motorista, tipo, timezone.localdate())
+    if erro:
+        messages.error(request, erro)
+        return redirect('motorista_dashboard')
+    
+    if request.method == 'POST':
+        form = RegistroPontoForm(
+            request.POST, request.FILES, veiculo=motorista.veiculo, mercado=motorista.mercado
+        )
+        if form.is_valid():
+            registro = form.save(commit=False)
+            registro.motorista = motorista
+            registro.tipo = tipo
+            
+            # Processar fotos com marca d'água
+            if 'foto_odometro' in request.FILES:
+                registro.foto_odometro = processar_foto_com_marca_dagua(
+                    request.FILES['foto_odometro']
+                )
+            
+            if 'foto_combustivel' in request.FILES:
+                registro.foto_combustivel = processar_foto_com_marca_dagua(
+                    request.FILES['foto_combustivel']
+                )
+            
+            registro.save()
+            
+            messages.success(
+                request, 
+                f'{tipo.capitalize()} registrada com sucesso!'
+            )
+            if registro.dentro_cerca is False:
+                messages.warning(
+                    request,
+                    f'Registro feito a {registro.distancia_mercado_metros} m do mercado, '
+                    f'fora do raio de {motorista.mercado.raio_metros} m.'
+                )
+            return redirect('motorista_dashboard')
+    else:
+        form = RegistroPontoForm(veiculo=motorista.veiculo, mercado=motorista.mercado)
+    
+    context = {
+        'form': form,
+        'tipo': tipo,
+        'motorista': motorista,
+        'titulo': f'Registrar {tipo.capitalize()}'
+    }
+    
+    return render(request, 'ponto/registrar_ponto.html', context)
+
+def validar_registro(motorista, tipo, dia):
+    """Retorna a mensagem de erro se o registro não puder ser feito no dia, ou None"""
+    registros_dia = RegistroPonto.objects.do_dia(dia).filter(motorista=motorista)
+    
+    if tipo == 'entrada':
+        # Verificar se já fez entrada no dia
+        if registros_dia.filter(tipo='entrada').exists():
+            return 'Entrada já registrada hoje!'
+    
+    elif tipo == 'saida':
+        # Verificar se já fez entrada
+        if not registros_dia.filter(tipo='entrada').exists():
+            return 'Registre primeiro a entrada!'
+        
+        # Verificar se já fez saída
+        if registros_dia.filter(tipo='saida').exists():
+            return 'Saída já registrada hoje!'
+    
+    return None
+
+def processar_foto_com_marca_dagua(foto, momento=None):
+    """Adiciona marca d'água com data/hora (padrão: agora) na foto"""
+    # Pillow só é carregado quando há foto a processar, não no boot do worker
+    from PIL import Image, ImageDraw, ImageFont
+    
+    inicio = time.perf_counter()
+    try:
+        # Abrir imagem (load() força a decodificação aqui, para a medição)
+        with metricas.cronometrar(metricas.FOTO_ETAPA_SEGUNDOS, etapa='decodificacao'):
+            img = Image.open(foto)
+            img.load()
+            
+            # Converter para RGB se necessário
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+        
+        with metricas.cronometrar(metricas.FOTO_ETAPA_SEGUNDOS, etapa='marca_dagua'):
+            # Criar objeto de desenho
+            draw = ImageDraw.Draw(img)
+            
+            # Data/hora da captura (ou atual), no fuso local
+            agora = timezone.localtime(momento).strftime('%d/%m/%Y %H:%M')
+            
+            # Configurar fonte (usar fonte padrão se não encontrar)
+            try:
+                font = ImageFont.truetype("arial.ttf", 36)
+            except OSError:
+                font = ImageFont.load_default()
+            
+            # Posição no canto inferior direito
+            largura, altura = img.size
+            texto_bbox = draw.textbbox((0, 0), agora, font=font)
+            texto_largura = texto_bbox[2] - texto_bbox[0]
+            texto_altura = texto_bbox[3] - texto_bbox[1]
+            
+            x = largura - texto_largura - 20
+            y = altura - texto_altura - 20
+            
+            # Adicionar sombra (fundo escuro para legibilidade)
+            draw.rectangle(
+                [x-10, y-5, x+texto_largura+10, y+texto_altura+5], 
+                fill=(0, 0, 0, 180)
+            )
+            
+            # Adicionar texto branco
+            draw.text((x, y), agora, fill=(255, 255, 255), font=font)
+        
+        # Salvar em memória
+        with metricas.cronometrar(metricas.FOTO_ETAPA_SEGUNDOS, etapa='codificacao'):
+            output = io.BytesIO()
+            img.save(output, format='JPEG', quality=95)
+            output.seek(0)
+        
+        logger.debug('Marca d\'água aplicada', extra={
+            'foto': foto.name,
+            'largura': largura,
+            'altura': altura,
+            'bytes': output.getbuffer().nbytes,
+            'duracao_ms': round((time.perf_counter() - inicio) * 1000, 1),
+        })
+        
+        # Retornar como ContentFile
+        return ContentFile(
+            output.read(),
+            name=f"marca_dagua_{foto.name}"
+        )
+        
+    except Exception:
+        # Em caso de erro, retornar foto original
+        metricas.FOTO_ERROS.inc()
+        logger.exception('Falha ao aplicar marca d\'água; foto gravada sem ela', extra={
+            'foto': getattr(foto, 'name', None),
+            'duracao_ms': round((time.perf_counter() - inicio) * 1000, 1),
+        })
+        return foto
+
+# =====================
+# APP OFFLINE (PWA)
+# =====================
+
+# Limites do lote enviado pelo app offline
+SINCRONIZACAO_MAX_ITENS = 20
+
+SINCRONIZACAO_MAX_DIAS = 7
+
+SINCRONIZACAO_TOLERANCIA_FUTURO = timedelta(minutes=5)
+
+def _momento_captura(item):
+    """Horário de captura do item (datetime com fuso) ou None se inválido"""
+    try:
+        capturado_em = parse_datetime(str(item.get('capturado_em', '')))
+    except ValueError:
+        return None
+    if capturado_em is None or timezone.is_naive(capturado_em):
+        return None
+    return capturado_em
+
+def _sincronizar_item(request, motorista, item):
+    """Valida e grava um registro capturado offline; retorna o resultado do item"""
+    item_id = str(item.get('id', ''))
+    tipo = item.get('tipo')
+    capturado_em = _momento_captura(item)
+    
+    def resultado(status, mensagem='', **extra):
+        return {'id': item_id, 'status': status, 'mensagem': mensagem, **extra}
+    
+    if tipo not in ['entrada', 'saida']:
+        return resultado('rejeitado', 'Tipo de registro inválido!')
+    if capturado_em is None:
+        return resultado('rejeitado', 'Horário de captura inválido!')
+    
+    agora = timezone.now()
+    if capturado_em > agora + SINCRONIZACAO_TOLERANCIA_FUTURO:
+        return resultado('rejeitado', 'Horário de captura no futuro!')
+    if capturado_em < agora - timedelta(days=SINCRONIZACAO_MAX_DIAS):
+        return resultado('rejeitado', 'Registro offline muito antigo para sincronizar!')
+    capturado_em = min(capturado_em, agora)
+    
+    # Reenvio de um item já gravado (ex.: resposta perdida na volta)
+    existente = RegistroPonto.objects.filter(
+        motorista=motorista, tipo=tipo, data_hora=capturado_em
+    ).first()
+    if existente:
+        return resultado('duplicado', registro_id=existente.id)
+    
+    erro = validar_registro(motorista, tipo, timezone.localtime(capturado_em).date())
+    if erro:
+        return resultado('rejeitado', erro)
+    
+    # Última leitura atual do veículo: o item anterior do lote pode tê-la mudado
+    motorista.veiculo.refresh_from_db(fields=odometro.CAMPOS)
+    form = RegistroPontoForm(
+        {
+            'km_odometro': item.get('km_odometro'),
+            'nivel_combustivel': item.get('nivel_combustivel'),
+            'observacoes': item.get('observacoes', ''),
+            'latitude': item.get('latitude'),
+            'longitude': item.get('longitude'),
+            'precisao_metros': item.get('precisao_metros'),
+            'confirmar_leitura': item.get('confirmar_leitura'),
+        },
+        {
+            'foto_odometro': request.FILES.get(f'foto_odometro_{item_id}'),
+            'foto_combustivel': request.FILES.get(f'foto_combustivel_{item_id}'),
+        },
+        veiculo=motorista.veiculo,
+        mercado=motorista.mercado,
+        momento=capturado_em,
+    )
+    if not form.is_valid():
+        erros = [erro for lista in form.errors.values() for erro in lista]
+        return resultado('rejeitado', ' '.join(erros))
+    
+    registro = form.save(commit=False)
+    registro.motorista = motorista
+    registro.tipo = tipo
+    registro.data_hora = capturado_em
+    registro.foto_odometro = processar_foto_com_marca_dagua(
+        form.cleaned_data['foto_odometro'], capturado_em
+    )
+    registro.foto_combustivel = processar_foto_com_marca_dagua(
+        form.cleaned_data['foto_combustivel'], capturado_em
+    )
+    
+    try:
+        # Transação por item, só para gravar: a marca d'água (acima) não
+        # segura travas, e uma falha não desfaz os demais itens do lote
+        with transaction.atomic():
+            registro.save()
+    except IntegrityError:
+        return resultado('duplicado')
+    
+    return resultado('ok', registro_id=registro.id)
+
+@login_required
+def sincronizar_registros(request):
+    """Recebe um lote de registros feitos offline e grava cada um em sua transação"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    
+    try:
+        motorista = request.user.motorista
+    except Motorista.DoesNotExist:
+        return JsonResponse({'error': 'Usuário não está associado a um motorista!'}, status=403)
+    
+    try:
+        itens = json.loads(request.POST.get('itens', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Lote inválido'}, status=400)
+    
+    if not isinstance(itens, list) or not all(isinstance(item, dict) for item in itens):
+        return JsonResponse({'error': 'Lote inválido'}, status=400)
+    if len(itens) > SINCRONIZACAO_MAX_ITENS:
+        return JsonResponse(
+            {'error': f'Envie no máximo {SINCRONIZACAO_MAX_ITENS} registros por lote'}, status=400
+        )
+    
+    # Entrada antes da saída: processa na ordem em que foram capturados (pelo
+    # instante, não pelo texto: os fusos podem diferir); inválidos por último
+    def ordem(item):
+        capturado_em = _momento_captura(item)
+        return (capturado_em is None, capturado_em.timestamp() if capturado_em else 0)
+    
+    itens.sort(key=ordem)
+    resultados = [_sincronizar_item(request, motorista, item) for item in itens]
+    
+    return JsonResponse({'success': True, 'resultados': resultados})
+
+def service_worker(request):
+    """Service worker do app do motorista, servido na raiz para cobrir todo o site"""
+    response = render(request, 'ponto/sw.js', content_type='application/javascript')
+    response['Service-Worker-Allowed'] = '/'
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,314 @@
+"""Relatórios do painel administrativo (ponto, anomalias e eficiência)"""
+from datetime import date, timedelta
+import json
+import math
+from collections import defaultdict
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q
+from django.db.models.functions import Left
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from django.utils import timezone
+
+from .. import geo
+from ..models import Motorista, Veiculo, Mercado, RegistroPonto
+from ..roteamento import leitura_replica
+
+
+@login_required
+@leitura_replica
+def relatorio_ponto(request):
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+
+    motoristas = Motorista.objects.filter(ativo=True).order_by('nome_completo')
+    veiculos = Veiculo.objects.order_by('placa')
+
+    registros = []
+    filtro_aplicado = False
+
+    if request.method == 'GET':
+        data_inicio = request.GET.get('data_inicio')
+        data_fim = request.GET.get('data_fim')
+        motorista_id = request.GET.get('motorista', '')
+        veiculo_id = request.GET.get('veiculo', '')
+
+        # Converte para string para facilitar comparação no template
+        motorista_id = str(motorista_id)
+        veiculo_id = str(veiculo_id)
+
+        if data_inicio and data_fim:
+            filtro_aplicado = True
+            registros_query = RegistroPonto.objects.no_periodo(data_inicio, data_fim)
+
+            if motorista_id:
+                registros_query = registros_query.filter(motorista_id=motorista_id)
+
+            if veiculo_id:
+                registros_query = registros_query.filter(motorista__veiculo_id=veiculo_id)
+
+            registros_query = registros_query.select_related(
+                'motorista', 'motorista__veiculo', 'motorista__mercado'
+            ).order_by('motorista', 'data_hora')
+
+            temp = defaultdict(
+                lambda: {'entrada': None, 'saida': None, 'registro_entrada': None, 'registro_saida': None}
+            )
+
+            for reg in registros_query:
+                chave = (reg.motorista.id, reg.data_hora.date())
+                if reg.tipo == 'entrada':
+                    temp[chave]['entrada'] = reg.data_hora
+                    temp[chave]['registro_entrada'] = reg
+                else:
+                    temp[chave]['saida'] = reg.data_hora
+                    temp[chave]['registro_saida'] = reg
+
+            registros = temp.values()
+
+    context = {
+        'motoristas': motoristas,
+        'veiculos': veiculos,
+        'registros': registros,
+        'filtro_aplicado': filtro_aplicado,
+        'data_inicio': request.GET.get('data_inicio', ''),
+        'data_fim': request.GET.get('data_fim', ''),
+        'motorista_id': motorista_id,
+        'veiculo_id': veiculo_id,
+    }
+
+    return render(request, 'ponto/admin/relatorio_ponto.html', context)
+
+@login_required
+@leitura_replica
+def gerar_relatorio(request):
+    """Gera relatório personalizado (API para AJAX ou POST)"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        return JsonResponse({'error': 'Acesso negado'}, status=403)
+    
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        # Filtros
+        data_inicio = data.get('data_inicio')
+        data_fim = data.get('data_fim')
+        motorista_id = data.get('motorista')
+        veiculo_id = data.get('veiculo')
+        
+        registros = RegistroPonto.objects.select_related(
+            'motorista', 'motorista__veiculo'
+        ).no_periodo(data_inicio, data_fim)
+        if motorista_id:
+            registros = registros.filter(motorista_id=motorista_id)
+        if veiculo_id:
+            registros = registros.filter(motorista__veiculo_id=veiculo_id)
+        
+        relatorio_data = []
+        for registro in registros:
+            relatorio_data.append({
+                'data': registro.data_hora.strftime('%d/%m/%Y'),
+                'motorista': registro.motorista.nome_completo,
+                'cpf': registro.motorista.cpf,
+                'veiculo': str(registro.motorista.veiculo),
+                'mercado': registro.motorista.mercado.nome if registro.motorista.mercado else '',
+                'entrada': registro.hora_formatada if registro.tipo == 'entrada' else '',
+                'saida': registro.hora_formatada if registro.tipo == 'saida' else '',
+                'horas_trabalhadas': registro.calcular_horas_trabalhadas() if registro.tipo == 'saida' else '',
+                'km_rodados': registro.calcular_km_rodados() if registro.tipo == 'saida' else '',
+                'valor_dia': float(registro.motorista.valor_dia),
+            })
+        
+        return JsonResponse({'success': True, 'data': relatorio_data})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+# Linhas exibidas na página de anomalias (o total aparece no resumo)
+ANOMALIAS_MAX_LINHAS = 500
+
+@login_required
+@leitura_replica
+def relatorio_anomalias(request):
+    """Anomalias de odômetro e combustível da frota no período"""
+    from .. import anomalias  # NumPy: carregado só quando a página é aberta
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    hoje = timezone.localdate()
+    try:
+        data_fim = date.fromisoformat(request.GET.get('data_fim') or hoje.isoformat())
+        data_inicio = date.fromisoformat(
+            request.GET.get('data_inicio') or (data_fim - timedelta(days=30)).isoformat()
+        )
+    except ValueError:
+        messages.error(request, 'Datas inválidas!')
+        data_fim, data_inicio = hoje, hoje - timedelta(days=30)
+    
+    regra = request.GET.get('regra', '')
+    if regra not in anomalias.REGRAS:
+        regra = ''
+    
+    encontradas = anomalias.relatorio(data_inicio, data_fim, regra or None)
+    por_regra = defaultdict(int)
+    for anomalia in encontradas:
+        por_regra[anomalia['regra']] += 1
+    
+    return render(request, 'ponto/admin/anomalias.html', {
+        'anomalias': encontradas[:ANOMALIAS_MAX_LINHAS],
+        'total': len(encontradas),
+        'limite': ANOMALIAS_MAX_LINHAS,
+        'resumo': [
+            {'regra': chave, 'descricao': descricao, 'total': por_regra.get(chave, 0)}
+            for chave, descricao in anomalias.REGRAS.items()
+        ],
+        'regras': anomalias.REGRAS,
+        'regra': regra,
+        'data_inicio': data_inicio.isoformat(),
+        'data_fim': data_fim.isoformat(),
+    })
+
+@login_required
+@leitura_replica
+def eficiencia_combustivel(request):
+    """Ranking e séries mensais de eficiência de combustível por veículo e motorista"""
+    from .. import eficiencia  # NumPy: carregado só quando a página é aberta
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    try:
+        meses = min(max(int(request.GET.get('meses', 12)), 1), 36)
+    except ValueError:
+        meses = 12
+    
+    analise = eficiencia.analisar(meses)
+    
+    return render(request, 'ponto/admin/eficiencia.html', {
+        'meses': meses,
+        'analise': analise,
+        # Gráfico: os 10 mais eficientes de cada grupo
+        'grafico': {
+            'meses': analise['meses'],
+            'veiculo': [{'nome': l['nome'], 'serie': l['serie']} for l in analise['veiculo'][:10]],
+            'motorista': [{'nome': l['nome'], 'serie': l['serie']} for l in analise['motorista'][:10]],
+        },
+    })
+
+# Grade do mapa: caracteres do geohash -> tamanho aproximado da célula
+LOCALIZACAO_GRADES = {5: '~5 km', 6: '~1 km', 7: '~150 m'}
+LOCALIZACAO_MAX_LINHAS = 500
+# Raio maior cai em prefixos curtos (células de dezenas de km) e em milhares
+# de candidatos conferidos um a um
+LOCALIZACAO_RAIO_MAX = 4_000
+LOCALIZACAO_MAX_CANDIDATOS = 20_000
+
+@login_required
+@leitura_replica
+def localizacao_registros(request):
+    """Onde os pontos foram registrados: grade de geohash e busca por raio"""
+    if not (request.user.is_superuser or request.user.is_staff):
+        messages.error(request, 'Acesso negado!')
+        return redirect('motorista_dashboard')
+    
+    hoje = timezone.localdate()
+    try:
+        data_fim = date.fromisoformat(request.GET.get('data_fim') or hoje.isoformat())
+        data_inicio = date.fromisoformat(
+            request.GET.get('data_inicio') or (data_fim - timedelta(days=7)).isoformat()
+        )
+    except ValueError:
+        messages.error(request, 'Datas inválidas!')
+        data_fim, data_inicio = hoje, hoje - timedelta(days=7)
+    
+    try:
+        grade = int(request.GET.get('grade', 6))
+    except ValueError:
+        grade = 6
+    if grade not in LOCALIZACAO_GRADES:
+        grade = 6
+    
+    registros = RegistroPonto.objects.no_periodo(data_inicio, data_fim).exclude(geohash='')
+    mercado_id = request.GET.get('mercado', '')
+    if mercado_id.isdigit():
+        registros = registros.filter(motorista__mercado_id=mercado_id)
+    if request.GET.get('fora_cerca'):
+        registros = registros.filter(dentro_cerca=False)
+    
+    # Busca por raio: prefixos da grade (índice em geohash) e, dos candidatos,
+    # a distância exata
+    area = None
+    try:
+        latitude = float(request.GET['latitude'])
+        longitude = float(request.GET['longitude'])
+        raio = float(request.GET.get('raio') or 500)
+    except (KeyError, ValueError):
+        pass
+    else:
+        # float() aceita 'nan' e 'inf', que escapariam das comparações abaixo
+        if (
+            all(map(math.isfinite, (latitude, longitude, raio)))
+            and -90 <= latitude <= 90 and -180 <= longitude <= 180
+        ):
+            raio = min(max(raio, 1), LOCALIZACAO_RAIO_MAX)
+            area = {'latitude': latitude, 'longitude': longitude, 'raio': raio}
+            prefixos = Q()
+            for prefixo in geo.prefixos_na_area(latitude, longitude, raio):
+                prefixos |= Q(geohash__startswith=prefixo)
+            # A faixa de latitude corta, ainda no banco, as sobras das células
+            margem = raio / geo.METROS_POR_GRAU
+            registros = registros.filter(prefixos, latitude__range=(latitude - margem, latitude + margem))
+        else:
+            messages.error(request, 'Coordenadas inválidas!')
+    
+    encontrados = []
+    if area:
+        candidatos = registros.select_related('motorista', 'motorista__mercado').order_by('-data_hora')
+        candidatos = candidatos[:LOCALIZACAO_MAX_CANDIDATOS + 1]
+        area['truncado'] = False
+        for posicao, registro in enumerate(candidatos.iterator(chunk_size=1000)):
+            if posicao == LOCALIZACAO_MAX_CANDIDATOS:
+                area['truncado'] = True
+                break
+            distancia = geo.distancia_metros(
+                area['latitude'], area['longitude'], float(registro.latitude), float(registro.longitude)
+            )
+            if distancia <= area['raio']:
+                registro.distancia_busca = round(distancia)
+                encontrados.append(registro)
+        area['total'] = len(encontrados)
+    
+    celulas = (
+        registros.annotate(celula=Left('geohash', grade))
+        .values('celula')
+        .annotate(total=Count('id'), fora=Count('id', filter=Q(dentro_cerca=False)))
+        .order_by('-total')[:LOCALIZACAO_MAX_LINHAS]
+    )
+    grade_celulas = []
+    for celula in celulas:
+        latitude_centro, longitude_centro = geo.decodificar(celula['celula'])
+        grade_celulas.append({
+            **celula,
+            'latitude': round(latitude_centro, 5),
+            'longitude': round(longitude_centro, 5),
+        })
+    
+    return render(request, 'ponto/admin/localizacao.html', {
+        'celulas': grade_celulas,
+        'registros': encontrados[:LOCALIZACAO_MAX_LINHAS],
+        'area': area,
+        'limite': LOCALIZACAO_MAX_LINHAS,
+        'raio_max': LOCALIZACAO_RAIO_MAX,
+        'max_candidatos': LOCALIZACAO_MAX_CANDIDATOS,
+        'grades': LOCALIZACAO_GRADES,
+        'grade': grade,
+        'mercados': Mercado.objects.filter(ativo=True).order_by('nome'),
+        'mercado_id': mercado_id,
+        'fora_cerca': bool(request.GET.get('fora_cerca')),
+        'data_inicio': data_inicio.isoformat(),
+        'data_fim': data_fim.isoformat(),
+    })
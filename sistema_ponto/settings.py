@@ -24,17 +24,22 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'ponto',  # Nossa app principal
 ]
 
 MIDDLEWARE = [
+    'ponto.metricas.MetricasMiddleware',  # primeiro: mede a requisição inteira
     'django.middleware.security.SecurityMiddleware',
+    'ponto.compressao.CompressaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'ponto.roteamento.EscritaRecenteMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'ponto.perfil.PerfilMiddleware',  # só ativo com PERFIL_ATIVO
 ]
 
 ROOT_URLCONF = 'sistema_ponto.urls'
@@ -69,6 +74,37 @@ DATABASES = {
     }
 }
 
+# Réplica de leitura opcional para relatórios, exportações e APIs
+# (ativada quando DATABASE_REPLICA_HOST está definido)
+if os.getenv('DATABASE_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('DATABASE_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DATABASE_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DATABASE_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DATABASE_REPLICA_HOST'),
+        'PORT': os.getenv('DATABASE_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['ponto.roteamento.ReplicaRouter']
+
+# Segundos em que as leituras de um usuário ficam no primário após uma escrita
+REPLICA_JANELA_PRIMARIO = int(os.getenv('REPLICA_JANELA_PRIMARIO', '10'))
+
+# Cache (estatísticas do dashboard)
+# Baseado em arquivos para ser compartilhado entre os workers e o comando
+# recalcular_estatisticas da mesma máquina.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+
+# Tempo (segundos) até o recálculo completo das estatísticas do dashboard
+DASHBOARD_STATS_TIMEOUT = int(os.getenv('DASHBOARD_STATS_TIMEOUT', '300'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,10 +134,116 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Nomes com hash do conteúdo + cópias .gz/.br geradas no collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'ponto.estaticos.ManifestComprimido',
+    },
+}
+
 # Media files (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Fotos num bucket compatível com S3 (ponto/armazenamento.py) em vez do
+# MEDIA_ROOT local: MEDIA_ARMAZENAMENTO=s3 e as variáveis S3_*. S3_ENDPOINT_URL
+# vazio = AWS; S3_ENDPOINT_PUBLICO: endereço usado nas URLs assinadas, se o
+# navegador acessa o bucket por outro host
+MEDIA_ARMAZENAMENTO = os.getenv('MEDIA_ARMAZENAMENTO', 'local')
+if MEDIA_ARMAZENAMENTO == 's3':
+    STORAGES['default'] = {
+        'BACKEND': 'ponto.armazenamento.ArmazenamentoS3',
+        'OPTIONS': {
+            'bucket': os.getenv('S3_BUCKET', ''),
+            'endpoint_url': os.getenv('S3_ENDPOINT_URL', ''),
+            'endpoint_publico': os.getenv('S3_ENDPOINT_PUBLICO', ''),
+            'regiao': os.getenv('S3_REGIAO', ''),
+            'chave_acesso': os.getenv('S3_CHAVE_ACESSO', ''),
+            'chave_secreta': os.getenv('S3_CHAVE_SECRETA', ''),
+            'prefixo': os.getenv('S3_PREFIXO', ''),
+            'expiracao_url': int(os.getenv('S3_URL_EXPIRACAO', '3600')),
+            'conexoes': int(os.getenv('S3_CONEXOES', '20')),
+            'parte_mb': int(os.getenv('S3_PARTE_MB', '8')),
+            'envios_paralelos': int(os.getenv('S3_ENVIOS_PARALELOS', '4')),
+        },
+    }
+
+# Entrega das fotos protegidas: '' (Django, FileResponse), 'nginx' (X-Accel-Redirect)
+# ou 'apache' (X-Sendfile). No nginx, MEDIA_ACCEL_PREFIXO deve ser um location
+# "internal" apontando para MEDIA_ROOT.
+MEDIA_SERVIDOR_ARQUIVOS = os.getenv('MEDIA_SERVIDOR_ARQUIVOS', '')
+MEDIA_ACCEL_PREFIXO = os.getenv('MEDIA_ACCEL_PREFIXO', '/protected-media/')
+
+# Arquivamento de registros antigos (pacotes mensais com dados e fotos)
+ARQUIVO_ROOT = Path(os.getenv('ARQUIVO_ROOT', str(BASE_DIR / 'arquivo')))
+ARQUIVO_RETENCAO_DIAS = int(os.getenv('ARQUIVO_RETENCAO_DIAS', str(5 * 365)))
+
+# Ingestão de telemetria (api/telemetria/): limites por requisição
+TELEMETRIA_MAX_LEITURAS = int(os.getenv('TELEMETRIA_MAX_LEITURAS', '10000'))
+TELEMETRIA_MAX_BYTES = int(os.getenv('TELEMETRIA_MAX_BYTES', str(4 * 1024 * 1024)))
+
+# Pacote ZIP de planilhas (ponto/planilhas.py): processos que montam as
+# planilhas em paralelo, por worker do servidor (0 = número de CPUs); lido
+# quando o pool é criado, na primeira exportação do worker
+EXPORTACAO_PROCESSOS = int(os.getenv('EXPORTACAO_PROCESSOS', '0'))
+
+# Cerca dos mercados (ponto/geo.py): por padrão o registro fora do raio é
+# aceito e só marcado; com GEOCERCA_BLOQUEAR ele é recusado
+GEOCERCA_BLOQUEAR = os.getenv('GEOCERCA_BLOQUEAR', 'False').lower() in ('1', 'true', 'sim')
+
+# Saída de eventos dos registros (ponto/eventos.py, comando despachar_eventos).
+# Sem destino configurado nenhum evento é gravado
+EVENTOS_DESTINOS = []
+if os.getenv('EVENTOS_WEBHOOK_URL'):
+    EVENTOS_DESTINOS.append({
+        'tipo': 'webhook',
+        'url': os.getenv('EVENTOS_WEBHOOK_URL'),
+        'segredo': os.getenv('EVENTOS_WEBHOOK_SEGREDO', ''),
+        'timeout': float(os.getenv('EVENTOS_WEBHOOK_TIMEOUT', '10')),
+    })
+if os.getenv('EVENTOS_ARQUIVO'):
+    EVENTOS_DESTINOS.append({'tipo': 'arquivo', 'caminho': os.getenv('EVENTOS_ARQUIVO')})
+if os.getenv('EVENTOS_FILA_DIR'):
+    EVENTOS_DESTINOS.append({'tipo': 'fila', 'diretorio': os.getenv('EVENTOS_FILA_DIR')})
+EVENTOS_LOTE = int(os.getenv('EVENTOS_LOTE', '100'))
+# Idade mínima (s) do evento para sair: o pk vem do INSERT e uma transação
+# ainda aberta pode ter um pk menor que o de eventos já visíveis
+EVENTOS_ESPERA_COMMIT = float(os.getenv('EVENTOS_ESPERA_COMMIT', '5'))
+EVENTOS_RETENCAO_DIAS = int(os.getenv('EVENTOS_RETENCAO_DIAS', '7'))
+
+# Perfilamento de requisições (ponto/perfil.py). Desligado, o middleware nem é
+# carregado. PERFIL_AMOSTRA: fração das requisições (0 a 1); PERFIL_URLS: nomes
+# de URL perfilados sempre (separados por vírgula)
+PERFIL_ATIVO = os.getenv('PERFIL_ATIVO', 'False').lower() in ('1', 'true', 'sim')
+PERFIL_AMOSTRA = float(os.getenv('PERFIL_AMOSTRA', '0.01'))
+PERFIL_URLS = [nome.strip() for nome in os.getenv('PERFIL_URLS', '').split(',') if nome.strip()]
+PERFIL_MIN_MS = int(os.getenv('PERFIL_MIN_MS', '0'))
+PERFIL_DIR = Path(os.getenv('PERFIL_DIR', str(BASE_DIR / 'perfis')))
+PERFIL_MAX_ARQUIVOS = int(os.getenv('PERFIL_MAX_ARQUIVOS', '200'))
+
+# /metrics (Prometheus): com METRICAS_TOKEN, exige "Authorization: Bearer <token>";
+# sem ele, só usuários staff logados. Com vários workers, defina também a
+# variável de ambiente PROMETHEUS_MULTIPROC_DIR (ver ponto/metricas.py)
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+
+# Logs da app em JSON (uma linha por evento) no stderr
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'ponto.logs.FormatoJSON'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        'ponto': {'handlers': ['console'], 'level': os.getenv('LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -1,20 +1,30 @@
 """
 URL configuration for sistema_ponto project.
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from ponto import views as ponto_views
+
 urlpatterns = [
     path('django-admin/', admin.site.urls),  # Django admin renomeado
     path('', include('ponto.urls')),  # URLs da nossa app
 ]
 
-# Servir arquivos de media durante desenvolvimento
+# Servir arquivos estáticos durante desenvolvimento.
+# As fotos (MEDIA) não são públicas: passam por ponto.views.foto_registro.
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+elif settings.STATIC_URL.startswith('/'):
+    # Produção sem servidor web na frente: arquivos do collectstatic,
+    # pré-comprimidos e com cache longo (ver ponto/estaticos.py)
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<caminho>.*)$', ponto_views.arquivo_estatico),
+    ]
 
 # Configurações do Django Admin
 admin.site.site_header = "Sistema de Ponto - Administração"
@@ -0,0 +1,13 @@
+// Comportamento comum a todas as páginas (ponto/base.html)
+
+// Aplicar máscaras nos inputs
+$(document).ready(function() {
+    $('input[data-mask]').each(function() {
+        $(this).mask($(this).data('mask'));
+    });
+
+    // Auto dismiss alerts
+    setTimeout(function() {
+        $('.alert').fadeOut('slow');
+    }, 5000);
+});
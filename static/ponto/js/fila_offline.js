@@ -0,0 +1,139 @@
+// Fila de registros de ponto feitos sem conexão (IndexedDB).
+//
+// Cada item guarda o horário de captura, os valores digitados e as duas fotos
+// (Blob). Quando a conexão volta, os itens são enviados em lote para
+// /motorista/sincronizar/ após um atraso aleatório, para que vários motoristas
+// recuperando o sinal ao mesmo tempo não cheguem todos juntos ao servidor.
+(function(window) {
+    'use strict';
+
+    const BANCO = 'ponto-offline';
+    const LOJA = 'registros';
+    const MAX_POR_LOTE = 20;
+    const ATRASO_MAXIMO_MS = 30000;
+
+    let sincronizando = false;
+
+    function abrir() {
+        return new Promise(function(resolve, reject) {
+            const pedido = indexedDB.open(BANCO, 1);
+            pedido.onupgradeneeded = function() {
+                pedido.result.createObjectStore(LOJA, {keyPath: 'id'});
+            };
+            pedido.onsuccess = function() { resolve(pedido.result); };
+            pedido.onerror = function() { reject(pedido.error); };
+        });
+    }
+
+    function transacao(modo, operacao) {
+        return abrir().then(function(db) {
+            return new Promise(function(resolve, reject) {
+                const tx = db.transaction(LOJA, modo);
+                const resultado = operacao(tx.objectStore(LOJA));
+                tx.oncomplete = function() { resolve(resultado && resultado.result); };
+                tx.onerror = function() { reject(tx.error); };
+            });
+        });
+    }
+
+    function novoId() {
+        if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+        return Date.now().toString(36) + Math.random().toString(36).slice(2);
+    }
+
+    function cookie(nome) {
+        const valor = document.cookie.split('; ').find(function(item) {
+            return item.startsWith(nome + '=');
+        });
+        return valor ? decodeURIComponent(valor.split('=')[1]) : '';
+    }
+
+    const FilaOffline = {
+        adicionar: function(dados) {
+            const item = Object.assign({
+                id: novoId(),
+                capturado_em: new Date().toISOString(),
+            }, dados);
+            return transacao('readwrite', function(loja) { return loja.put(item); })
+                .then(function() {
+                    // Background Sync, onde existir, acorda a página quando houver rede
+                    if ('serviceWorker' in navigator && 'SyncManager' in window) {
+                        navigator.serviceWorker.ready.then(function(registro) {
+                            return registro.sync.register('sincronizar-registros');
+                        }).catch(function() {});
+                    }
+                    return item;
+                });
+        },
+
+        listar: function() {
+            return transacao('readonly', function(loja) { return loja.getAll(); });
+        },
+
+        remover: function(ids) {
+            return transacao('readwrite', function(loja) {
+                ids.forEach(function(id) { loja.delete(id); });
+            });
+        },
+
+        sincronizar: function(url) {
+            if (sincronizando || !navigator.onLine) return Promise.resolve(null);
+            sincronizando = true;
+
+            return FilaOffline.listar().then(function(itens) {
+                itens = (itens || []).slice(0, MAX_POR_LOTE);
+                if (!itens.length) return null;
+
+                const formulario = new FormData();
+                formulario.append('itens', JSON.stringify(itens.map(function(item) {
+                    return {
+                        id: item.id,
+                        tipo: item.tipo,
+                        capturado_em: item.capturado_em,
+                        km_odometro: item.km_odometro,
+                        nivel_combustivel: item.nivel_combustivel,
+                        observacoes: item.observacoes || '',
+                        latitude: item.latitude || '',
+                        longitude: item.longitude || '',
+                        precisao_metros: item.precisao_metros || '',
+                        confirmar_leitura: !!item.confirmar_leitura,
+                    };
+                })));
+                itens.forEach(function(item) {
+                    formulario.append('foto_odometro_' + item.id, item.foto_odometro, 'odometro.jpg');
+                    formulario.append('foto_combustivel_' + item.id, item.foto_combustivel, 'combustivel.jpg');
+                });
+
+                return fetch(url, {
+                    method: 'POST',
+                    body: formulario,
+                    credentials: 'same-origin',
+                    headers: {'X-CSRFToken': cookie('csrftoken')},
+                }).then(function(resposta) {
+                    if (!resposta.ok) throw new Error('HTTP ' + resposta.status);
+                    return resposta.json();
+                }).then(function(json) {
+                    // Gravados, duplicados e rejeitados saem da fila; o servidor já decidiu
+                    const concluidos = json.resultados.map(function(resultado) { return resultado.id; });
+                    return FilaOffline.remover(concluidos).then(function() { return json.resultados; });
+                });
+            }).finally(function() {
+                sincronizando = false;
+            });
+        },
+
+        // Sincroniza depois de um atraso aleatório (espalha a carga no servidor);
+        // em caso de falha tenta de novo com espera dobrada a cada tentativa
+        agendar: function(url, aoConcluir, tentativa) {
+            tentativa = tentativa || 0;
+            const atraso = Math.random() * ATRASO_MAXIMO_MS * Math.pow(2, Math.min(tentativa, 5));
+            setTimeout(function() {
+                FilaOffline.sincronizar(url).then(aoConcluir).catch(function() {
+                    FilaOffline.agendar(url, aoConcluir, tentativa + 1);
+                });
+            }, atraso);
+        },
+    };
+
+    window.FilaOffline = FilaOffline;
+})(window);
@@ -0,0 +1,64 @@
+// Painel do motorista: fila de registros offline, sincronização e relógio.
+// Configuração nos data-* da tag <script>.
+const config = document.currentScript.dataset;
+const URL_SINCRONIZAR = config.urlSincronizar;
+
+function atualizarFilaOffline() {
+    return FilaOffline.listar().then(function(itens) {
+        $('#fila-offline-total').text(itens.length);
+        $('#fila-offline').attr('style', itens.length ? '' : 'display: none !important;');
+    });
+}
+
+function aposSincronizar(resultados) {
+    if (!resultados) return;
+    resultados.filter(function(r) { return r.status === 'rejeitado'; }).forEach(function(r) {
+        alert('Registro offline recusado: ' + r.mensagem);
+    });
+    // Recarrega para mostrar os horários gravados
+    if (resultados.some(function(r) { return r.status === 'ok'; })) location.reload();
+    else atualizarFilaOffline();
+}
+
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register(config.urlServiceWorker);
+    navigator.serviceWorker.addEventListener('message', function(event) {
+        if (event.data === 'sincronizar-registros') {
+            FilaOffline.sincronizar(URL_SINCRONIZAR).then(aposSincronizar).catch(atualizarFilaOffline);
+        }
+    });
+}
+
+$(document).ready(function() {
+    atualizarFilaOffline().then(function() {
+        FilaOffline.agendar(URL_SINCRONIZAR, aposSincronizar);
+    });
+    window.addEventListener('online', function() {
+        FilaOffline.agendar(URL_SINCRONIZAR, aposSincronizar);
+    });
+    $('#sincronizar-agora').on('click', function() {
+        FilaOffline.sincronizar(URL_SINCRONIZAR).then(aposSincronizar).catch(function() {
+            alert('Sem conexão com o servidor. Tente novamente em instantes.');
+        });
+    });
+    
+    // Auto refresh página a cada 5 minutos para atualizar status
+    setTimeout(function() {
+        location.reload();
+    }, 300000); // 5 minutos
+    
+    // Mostrar horário atual
+    function updateTime() {
+        const now = new Date();
+        const timeString = now.toLocaleTimeString('pt-BR');
+        $('#current-time').text(timeString);
+    }
+    
+    // Adicionar relógio se não existir
+    if (!$('#current-time').length) {
+        $('.badge:contains("' + config.hoje + '")').append(' <span id="current-time"></span>');
+    }
+    
+    updateTime();
+    setInterval(updateTime, 1000);
+});
@@ -0,0 +1,167 @@
+// Página de registro de ponto: captura das fotos, validação dos campos e
+// envio (ou fila offline, sem sinal). Configuração nos data-* da tag <script>.
+const config = document.currentScript.dataset;
+
+let currentPhotoType = null;
+let photosRequired = ['odometro', 'combustivel'];
+let photosTaken = [];
+
+function openCamera(tipo) {
+    currentPhotoType = tipo;
+    document.getElementById('id_foto_' + tipo).click();
+}
+
+function handlePhotoCapture(input, tipo) {
+    const file = input.files[0];
+    if (!file) return;
+    
+    const reader = new FileReader();
+    reader.onload = function(e) {
+        const preview = document.getElementById(tipo + '-preview');
+        const img = document.createElement('img');
+        img.src = e.target.result;
+        img.className = 'img-fluid';
+        img.style.width = '100%';
+        img.style.height = '250px';
+        img.style.objectFit = 'cover';
+        img.style.borderRadius = '0.5rem';
+        img.style.cursor = 'pointer';
+        
+        // Adicionar marca de sucesso
+        preview.innerHTML = '';
+        preview.appendChild(img);
+        preview.classList.add('photo-taken');
+        
+        // Adicionar badge de sucesso
+        const badge = document.createElement('div');
+        badge.className = 'position-absolute top-0 end-0 m-2';
+        badge.innerHTML = '<span class="badge bg-success"><i class="fas fa-check"></i> Foto Capturada</span>';
+        preview.style.position = 'relative';
+        preview.appendChild(badge);
+        
+        // Adicionar à lista de fotos tiradas
+        if (!photosTaken.includes(tipo)) {
+            photosTaken.push(tipo);
+        }
+        
+        // Verificar se pode habilitar o botão submit
+        checkFormCompletion();
+        
+        // Click para visualizar
+        img.onclick = function() {
+            document.getElementById('modalImage').src = e.target.result;
+            document.getElementById('retakePhoto').onclick = function() {
+                openCamera(tipo);
+                bootstrap.Modal.getInstance(document.getElementById('photoModal')).hide();
+            };
+            new bootstrap.Modal(document.getElementById('photoModal')).show();
+        };
+    };
+    reader.readAsDataURL(file);
+}
+
+function checkFormCompletion() {
+    const submitBtn = document.getElementById('submitBtn');
+    const allPhotosRequired = photosRequired.every(photo => photosTaken.includes(photo));
+    const kmFilled = document.getElementById('id_km_odometro').value.trim() !== '';
+    const combustivelFilled = document.getElementById('id_nivel_combustivel').value.trim() !== '';
+    
+    if (allPhotosRequired && kmFilled && combustivelFilled) {
+        submitBtn.disabled = false;
+        submitBtn.classList.remove('btn-secondary');
+        submitBtn.classList.add(config.tipo === 'entrada' ? 'btn-primary' : 'btn-warning');
+    } else {
+        submitBtn.disabled = true;
+        submitBtn.classList.add('btn-secondary');
+        submitBtn.classList.remove('btn-primary', 'btn-warning');
+    }
+}
+
+// Localização (opcional): sem permissão ou sem GPS o registro segue sem ela
+function capturarLocalizacao() {
+    if (!('geolocation' in navigator)) return;
+    navigator.geolocation.getCurrentPosition(function(posicao) {
+        document.getElementById('id_latitude').value = posicao.coords.latitude.toFixed(6);
+        document.getElementById('id_longitude').value = posicao.coords.longitude.toFixed(6);
+        document.getElementById('id_precisao_metros').value = Math.round(posicao.coords.accuracy);
+    }, function() {}, {enableHighAccuracy: true, timeout: 15000, maximumAge: 60000});
+}
+
+// Event listeners
+document.getElementById('id_foto_odometro').addEventListener('change', function() {
+    handlePhotoCapture(this, 'odometro');
+});
+
+document.getElementById('id_foto_combustivel').addEventListener('change', function() {
+    handlePhotoCapture(this, 'combustivel');
+});
+
+document.getElementById('id_km_odometro').addEventListener('input', checkFormCompletion);
+document.getElementById('id_nivel_combustivel').addEventListener('input', checkFormCompletion);
+
+// Form submission
+document.getElementById('registroForm').addEventListener('submit', function(e) {
+    const submitBtn = document.getElementById('submitBtn');
+    const submitText = document.getElementById('submitText');
+    const submitSpinner = document.getElementById('submitSpinner');
+    
+    submitBtn.disabled = true;
+    submitText.textContent = 'Processando...';
+    submitSpinner.style.display = 'inline-block';
+    
+    // Sem sinal: guarda o registro na fila do aparelho com o horário da captura
+    if (!navigator.onLine && window.FilaOffline) {
+        e.preventDefault();
+        FilaOffline.adicionar({
+            tipo: config.tipo,
+            capturado_em: new Date().toISOString(),
+            km_odometro: document.getElementById('id_km_odometro').value,
+            nivel_combustivel: document.getElementById('id_nivel_combustivel').value,
+            observacoes: document.getElementById('id_observacoes').value,
+            latitude: document.getElementById('id_latitude').value,
+            longitude: document.getElementById('id_longitude').value,
+            precisao_metros: document.getElementById('id_precisao_metros').value,
+            confirmar_leitura: (document.getElementById('id_confirmar_leitura') || {}).checked || false,
+            foto_odometro: document.getElementById('id_foto_odometro').files[0],
+            foto_combustivel: document.getElementById('id_foto_combustivel').files[0],
+        }).then(function() {
+            alert('Sem conexão: registro salvo no aparelho e será enviado quando o sinal voltar.');
+            window.location.href = config.urlDashboard;
+        }).catch(function() {
+            alert('Não foi possível salvar o registro offline. Tente novamente.');
+            submitBtn.disabled = false;
+            submitText.textContent = 'Registrar ' + config.titulo;
+            submitSpinner.style.display = 'none';
+        });
+    }
+});
+
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register(config.urlServiceWorker);
+}
+
+// Validação de combustível
+document.getElementById('id_nivel_combustivel').addEventListener('input', function() {
+    const value = parseInt(this.value);
+    if (value > 100) this.value = 100;
+    if (value < 0) this.value = 0;
+});
+
+// Validação de KM
+document.getElementById('id_km_odometro').addEventListener('input', function() {
+    const value = parseInt(this.value);
+    if (value < 0) this.value = 0;
+});
+
+// Inicializar verificação
+$(document).ready(function() {
+    checkFormCompletion();
+    capturarLocalizacao();
+    
+    // Prevent form submission on Enter key in number inputs
+    $('input[type="number"]').on('keypress', function(e) {
+        if (e.which === 13) {
+            e.preventDefault();
+        }
+    });
+});
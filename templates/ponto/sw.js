@@ -0,0 +1,88 @@
+{% load static %}// Service worker do app do motorista: mantém as páginas em cache para
+// abrirem sem sinal. Os registros feitos offline ficam na fila do IndexedDB
+// (fila_offline.js) e são enviados pela página quando a conexão volta.
+const VERSAO = 'ponto-v3';
+
+const PAGINAS = [
+    '{% url "motorista_dashboard" %}',
+    '{% url "registrar_ponto" "entrada" %}',
+    '{% url "registrar_ponto" "saida" %}',
+];
+
+const ARQUIVOS = [
+    '{% static "ponto/css/base.css" %}',
+    '{% static "ponto/js/base.js" %}',
+    '{% static "ponto/js/fila_offline.js" %}',
+    '{% static "ponto/js/registrar_ponto.js" %}',
+    '{% static "ponto/js/motorista_dashboard.js" %}',
+    '{% static "ponto/manifest.webmanifest" %}',
+    '{% static "ponto/icons/icone-192.png" %}',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+    'https://cdnjs.cloudflare.com/ajax/libs/jquery/3.6.0/jquery.min.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/jquery.mask/1.14.16/jquery.mask.min.js',
+];
+
+self.addEventListener('install', function(event) {
+    event.waitUntil(
+        caches.open(VERSAO).then(function(cache) {
+            // Uma falha individual (ex.: página que redireciona) não impede a instalação
+            return Promise.all(PAGINAS.concat(ARQUIVOS).map(function(url) {
+                return fetch(url, {credentials: 'same-origin', mode: url.startsWith('http') ? 'no-cors' : 'same-origin'})
+                    .then(function(resposta) { return cache.put(url, resposta); })
+                    .catch(function() {});
+            }));
+        }).then(function() { return self.skipWaiting(); })
+    );
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil(
+        caches.keys().then(function(chaves) {
+            return Promise.all(chaves.filter(function(chave) { return chave !== VERSAO; })
+                .map(function(chave) { return caches.delete(chave); }));
+        }).then(function() { return self.clients.claim(); })
+    );
+});
+
+self.addEventListener('fetch', function(event) {
+    const requisicao = event.request;
+    if (requisicao.method !== 'GET') return;
+
+    const url = new URL(requisicao.url);
+    const pagina = requisicao.mode === 'navigate' && PAGINAS.includes(url.pathname);
+
+    if (pagina) {
+        // Páginas: rede primeiro (dados do dia atualizados), cache sem sinal
+        event.respondWith(
+            fetch(requisicao).then(function(resposta) {
+                if (resposta.ok && !resposta.redirected) {
+                    const copia = resposta.clone();
+                    caches.open(VERSAO).then(function(cache) { cache.put(url.pathname, copia); });
+                }
+                return resposta;
+            }).catch(function() {
+                return caches.match(url.pathname);
+            })
+        );
+    } else if (ARQUIVOS.includes(url.pathname) || ARQUIVOS.includes(requisicao.url)) {
+        // Arquivos estáticos: cache primeiro
+        event.respondWith(
+            caches.match(requisicao.url).then(function(resposta) {
+                return resposta || fetch(requisicao);
+            })
+        );
+    }
+});
+
+// Background Sync: pede às páginas abertas que enviem a fila
+self.addEventListener('sync', function(event) {
+    if (event.tag === 'sincronizar-registros') {
+        event.waitUntil(
+            self.clients.matchAll({type: 'window'}).then(function(janelas) {
+                janelas.forEach(function(janela) { janela.postMessage('sincronizar-registros'); });
+            })
+        );
+    }
+});